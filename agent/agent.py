@@ -1,4 +1,3 @@
-import json
 import os
 import time
 from decimal import Decimal
@@ -7,7 +6,11 @@ from pathlib import Path
 from dotenv import load_dotenv
 from transformers import pipeline
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
+
+from agent_client import connect, load_abi
+from block_cursor import BlockCursor
+from chain_events import EventPoller
+from gas import GasStrategy
 
 # Load env
 load_dotenv()
@@ -20,19 +23,15 @@ MODERATOR_ADDR = Web3.to_checksum_address(os.getenv("MODERATOR_ADDRESS", "0x0000
 AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY", "")
 MODEL_NAME = os.getenv("MODEL_NAME", "unitary/toxic-bert")
 THRESHOLD_BP = int(os.getenv("TOXICITY_THRESHOLD_BP", "5000"))
+FLAG_CONFIRMATIONS = int(os.getenv("FLAG_CONFIRMATIONS", "0"))  # Blocks a post must be buried before it's flagged
+REORG_HISTORY_BLOCKS = int(os.getenv("REORG_HISTORY_BLOCKS", "128"))
 
 # Read ABIs from app/contracts/abis
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-with open(ABI_DIR / "SocialPosts.json", "r", encoding="utf-8") as f:
-    SOCIAL_ABI = json.load(f)
-with open(ABI_DIR / "Moderator.json", "r", encoding="utf-8") as f:
-    MOD_ABI = json.load(f)
-
-# Web3 setup (HTTP for txs; WSS optional for future streaming)
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL))
-# If Somnia uses PoA, enable middleware
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+SOCIAL_ABI = load_abi("SocialPosts.json")
+MOD_ABI = load_abi("Moderator.json")
+
+# Web3 setup (HTTP for txs, PoA middleware; WSS optional for future streaming)
+w3 = connect(SOMNIA_RPC_URL)
 
 acct = w3.eth.account.from_key(bytes.fromhex(AGENT_PRIV)) if AGENT_PRIV else None
 if acct is None:
@@ -40,6 +39,7 @@ if acct is None:
 
 social = w3.eth.contract(address=SOCIAL_ADDR, abi=SOCIAL_ABI)
 moderator = w3.eth.contract(address=MODERATOR_ADDR, abi=MOD_ABI)
+gas_strategy = GasStrategy(w3, chain_id=CHAIN_ID or None, max_fee_gwei=float(os.getenv("MAX_FEE_GWEI", "0")) or None)
 
 print("Agent address:", acct.address)
 print("SocialPosts:", SOCIAL_ADDR)
@@ -48,17 +48,16 @@ print("Moderator:", MODERATOR_ADDR)
 # HF pipeline (CPU)
 clf = pipeline("text-classification", model=MODEL_NAME, truncation=True, framework="pt")
 
-# Simple polling loop for new PostCreated events
+# Polling loop for new PostCreated events. The cursor (last block + recent block
+# hashes) is saved to .last_block after every poll; on a reorg it rewinds to the
+# fork point and the new canonical logs are replayed.
 LAST_BLOCK_FILE = Path(".last_block")
-if LAST_BLOCK_FILE.exists():
-    try:
-        last_block = int(LAST_BLOCK_FILE.read_text().strip())
-    except Exception:
-        last_block = w3.eth.block_number
-else:
-    last_block = w3.eth.block_number
+cursor = BlockCursor(w3, path=LAST_BLOCK_FILE, history=REORG_HISTORY_BLOCKS)
+if cursor.last_block is None:
+    cursor.advance(max(w3.eth.block_number - FLAG_CONFIRMATIONS, 0))
+poller = EventPoller(w3, cursor=cursor, confirmations=FLAG_CONFIRMATIONS)
 
-print("Starting from block:", last_block)
+print("Starting from block:", cursor.last_block)
 
 
 def score_toxicity(text: str) -> int:
@@ -79,16 +78,11 @@ def handle_event(ev):
         score_bp = score_toxicity(content)
         print(f"Toxicity score_bp={score_bp} threshold_bp={THRESHOLD_BP}")
         if score_bp >= THRESHOLD_BP:
-            # Build tx to flag
-            # Estimate gas and build transaction
-            gas_estimate = moderator.functions.flagPost(post_id, score_bp, MODEL_NAME).estimate_gas({'from': acct.address})
-            tx = moderator.functions.flagPost(post_id, score_bp, MODEL_NAME).build_transaction({
-                "from": acct.address,
-                "nonce": w3.eth.get_transaction_count(acct.address),
-                "chainId": CHAIN_ID or w3.eth.chain_id,
-                "gas": int(gas_estimate * 1.2),  # 20% buffer
-                "gasPrice": w3.to_wei("100", "gwei"),
-            })
+            # Build tx to flag (cached gas limit, fees from recent blocks)
+            flag_fn = moderator.functions.flagPost(post_id, score_bp, MODEL_NAME)
+            tx = flag_fn.build_transaction(
+                gas_strategy.tx_params(flag_fn, acct.address, w3.eth.get_transaction_count(acct.address))
+            )
             signed = acct.sign_transaction(tx)
             tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
             print("Submitted flagPost tx:", tx_hash.hex())
@@ -100,71 +94,27 @@ def handle_event(ev):
         print("Error handling post:", e)
 
 
+def handle_reorg(fork_block, removed):
+    print(f"Reorg: rewound to block {fork_block}, {len(removed)} PostCreated events dropped; replaying")
+
+
+poller.subscribe(social, "PostCreated", handle_event)
+poller.on_reorg(handle_reorg)
+
 try:
     print("Agent monitoring for new posts...")
-    last_checked_post_id = 0
-    
+
     while True:
         try:
-            # Get total posts from contract with retry logic
-            total_posts = None
-            for retry in range(3):
-                try:
-                    total_posts = social.functions.totalPosts().call()
-                    break
-                except Exception as e:
-                    if retry == 2:
-                        raise e
-                    print(f"RPC error (retry {retry + 1}/3): {e}")
-                    time.sleep(2)
-            
-            if total_posts is None:
-                continue
-                
-            # Check if there are new posts
-            if total_posts > last_checked_post_id:
-                print(f"Found {total_posts - last_checked_post_id} new posts")
-                
-                # Process each new post
-                for post_id in range(last_checked_post_id + 1, total_posts + 1):
-                    try:
-                        # Get post with retry logic
-                        post = None
-                        for retry in range(3):
-                            try:
-                                post = social.functions.getPost(post_id).call()
-                                break
-                            except Exception as e:
-                                if retry == 2:
-                                    raise e
-                                print(f"Error getting post {post_id} (retry {retry + 1}/3): {e}")
-                                time.sleep(2)
-                        
-                        if post is None:
-                            continue
-                            
-                        print(f"Processing post {post_id}: {post[2][:50]}...")  # post[2] is content
-                        
-                        # Create a mock event object for handle_event
-                        class MockEvent:
-                            def __init__(self, post_id, author, content):
-                                self.args = {"id": post_id, "author": author, "content": content}
-                        
-                        mock_event = MockEvent(post[0], post[1], post[2])  # id, author, content
-                        handle_event(mock_event)
-                        
-                    except Exception as e:
-                        print(f"Error processing post {post_id}: {e}")
-                
-                last_checked_post_id = total_posts
-            else:
-                print(f"No new posts. Total: {total_posts}")
-                
+            handled = poller.poll()
+            cursor.save()
+            if not handled:
+                print(f"No new posts. Block: {cursor.last_block}")
         except Exception as e:
             print(f"Error checking for posts: {e}")
             time.sleep(5)  # Wait longer on error
-        
+
         time.sleep(15)  # Check every 15 seconds to reduce RPC load
-        
+
 except KeyboardInterrupt:
     print("Agent stopped by user.")
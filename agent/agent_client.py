@@ -0,0 +1,243 @@
+"""
+Shared chain client for the agent and the scripts in this directory.
+
+- ABIs are read from app/contracts/abis once per process and kept in a
+  pickled cache (data/abi_cache.pickle, keyed by file mtime and size), so
+  later runs skip JSON parsing of the Hardhat artifacts.
+- One pooled requests.Session carries every JSON-RPC and inference request,
+  so connections are reused instead of re-handshaking per call.
+- connect() returns one Web3 per RPC URL with PoA support for whichever
+  web3.py version is installed, and with eth_chainId / net_version answered
+  from a cache: web3 validates the chain id before every call and
+  transaction, which otherwise costs an extra round-trip each time.
+- AgentClient builds contracts and agent accounts only when first used.
+"""
+
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
+ABI_CACHE_PATH = Path(os.getenv("ABI_CACHE_PATH") or Path(__file__).resolve().parent / "data" / "abi_cache.pickle")
+
+# name -> (address env vars, ABI file)
+CONTRACTS = {
+    "social": (("SOCIAL_POSTS_ADDRESS", "SOCIAL_POSTS_CONTRACT_ADDRESS"), "SocialPosts.json"),
+    "moderator": (("MODERATOR_ADDRESS", "MODERATOR_CONTRACT_ADDRESS"), "Moderator.json"),
+    "reputation": (("REPUTATION_SYSTEM_ADDRESS",), "ReputationSystem.json"),
+    "incentive": (("INCENTIVE_SYSTEM_ADDRESS",), "IncentiveSystem.json"),
+    "governance": (("GOVERNANCE_SYSTEM_ADDRESS",), "GovernanceSystem.json"),
+}
+
+CACHED_RPC_METHODS = {"eth_chainId", "net_version"}
+
+_lock = threading.Lock()
+_abis = {}          # ABI file path -> parsed ABI
+_disk_cache = None  # ABI file path -> (mtime_ns, size, abi) as loaded from ABI_CACHE_PATH
+_session = None
+_connections = {}   # (rpc_url, poa) -> Web3
+
+
+# --- ABIs ---------------------------------------------------------------------
+
+def _read_disk_cache():
+    global _disk_cache
+    if _disk_cache is None:
+        try:
+            with open(ABI_CACHE_PATH, "rb") as f:
+                _disk_cache = pickle.load(f)
+        except Exception:
+            _disk_cache = {}
+    return _disk_cache
+
+
+def _write_disk_cache():
+    try:
+        ABI_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ABI_CACHE_PATH.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(_disk_cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, ABI_CACHE_PATH)
+    except Exception as e:
+        print(f"Warning: Could not write ABI cache {ABI_CACHE_PATH}: {e}")
+
+
+def load_abi(filename, abi_dir=ABI_DIR):
+    """ABI list from a bare ABI or Hardhat artifact JSON; [] if it can't be read"""
+    path = str(Path(abi_dir) / filename)
+    with _lock:
+        if path in _abis:
+            return _abis[path]
+        try:
+            stat = os.stat(path)
+            cached = _read_disk_cache().get(path)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                abi = cached[2]
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    artifact = json.load(f)
+                # Extract ABI from Hardhat artifact format
+                if isinstance(artifact, dict) and 'abi' in artifact:
+                    abi = artifact['abi']
+                elif isinstance(artifact, list):
+                    abi = artifact
+                else:
+                    print(f"Warning: Unexpected format in {filename}")
+                    abi = []
+                _disk_cache[path] = (stat.st_mtime_ns, stat.st_size, abi)
+                _write_disk_cache()
+        except Exception as e:
+            print(f"Warning: Could not load {filename}: {e}")
+            return []
+        _abis[path] = abi
+        return abi
+
+
+# --- HTTP and Web3 ------------------------------------------------------------
+
+def http_session():
+    """Process-wide pooled session for RPC and inference requests"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def poa_middleware():
+    """The extraData PoA middleware for the installed web3.py version, or None"""
+    try:
+        from web3.middleware import ExtraDataToPOAMiddleware  # web3 >= 7
+        return ExtraDataToPOAMiddleware
+    except ImportError:
+        pass
+    try:
+        from web3.middleware import geth_poa_middleware  # web3 5/6
+        return geth_poa_middleware
+    except ImportError:
+        return None
+
+
+def _provider(rpc_url, timeout):
+    request_kwargs = {"timeout": timeout}
+    try:
+        # web3 >= 7 caches allowed requests in the provider
+        return Web3.HTTPProvider(
+            rpc_url, request_kwargs=request_kwargs, session=http_session(),
+            cache_allowed_requests=True, cacheable_requests=CACHED_RPC_METHODS
+        ), False
+    except TypeError:
+        return Web3.HTTPProvider(rpc_url, request_kwargs=request_kwargs, session=http_session()), True
+
+
+def connect(rpc_url=None, poa=True, timeout=30):
+    """Shared Web3 for rpc_url (default SOMNIA_RPC_URL); None without a URL"""
+    rpc_url = rpc_url or os.getenv("SOMNIA_RPC_URL", "")
+    if not rpc_url:
+        return None
+    key = (rpc_url, poa)
+    with _lock:
+        w3 = _connections.get(key)
+    if w3 is not None:
+        return w3
+    provider, needs_cache_middleware = _provider(rpc_url, timeout)
+    w3 = Web3(provider)
+    if needs_cache_middleware:
+        try:
+            from web3.middleware import construct_simple_cache_middleware
+            w3.middleware_onion.add(construct_simple_cache_middleware(rpc_whitelist=CACHED_RPC_METHODS))
+        except Exception as e:
+            print(f"Warning: Could not add RPC cache middleware: {e}")
+    middleware = poa_middleware() if poa else None
+    if middleware:
+        try:
+            w3.middleware_onion.inject(middleware, layer=0)
+        except Exception as e:
+            print(f"Warning: Could not inject PoA middleware: {e}")
+    with _lock:
+        return _connections.setdefault(key, w3)
+
+
+def contract_address(name):
+    """Checksum address of a known contract from the environment, or None"""
+    env_names, _ = CONTRACTS[name]
+    for env_name in env_names:
+        value = os.getenv(env_name)
+        if value:
+            return Web3.to_checksum_address(value)
+    return None
+
+
+# --- client -------------------------------------------------------------------
+
+class AgentClient:
+    """Web3 connection, contracts and agent accounts, each created on first use"""
+
+    def __init__(self, rpc_url=None, poa=True):
+        self.rpc_url = rpc_url or os.getenv("SOMNIA_RPC_URL", "")
+        self.poa = poa
+        self._w3 = None
+        self._contracts = {}
+        self._accounts = None
+
+    @property
+    def w3(self):
+        if self._w3 is None:
+            self._w3 = connect(self.rpc_url, self.poa)
+        return self._w3
+
+    @property
+    def session(self):
+        return http_session()
+
+    def _build(self, name, address):
+        abi = load_abi(CONTRACTS[name][1])
+        if not (self.w3 and address and abi):
+            return None
+        return self.w3.eth.contract(address=Web3.to_checksum_address(address), abi=abi)
+
+    def contract(self, name, address=None):
+        """Contract by name ("social", "moderator", ...); None without a connection, address or ABI"""
+        if address:
+            return self._build(name, address)
+        if name not in self._contracts:
+            self._contracts[name] = self._build(name, contract_address(name))
+        return self._contracts[name]
+
+    @property
+    def accounts(self):
+        """Agent accounts from AGENT_PRIVATE_KEY / AGENT_PRIVATE_KEYS"""
+        if self._accounts is None:
+            from signer_pool import parse_private_keys
+            from eth_account import Account
+            self._accounts = [
+                Account.from_key(bytes.fromhex(key))
+                for key in parse_private_keys(os.getenv("AGENT_PRIVATE_KEY", ""), os.getenv("AGENT_PRIVATE_KEYS", ""))
+            ]
+        return self._accounts
+
+    @property
+    def account(self):
+        return self.accounts[0] if self.accounts else None
+
+
+_default_client = None
+
+
+def get_client():
+    """Process-wide AgentClient configured from the environment"""
+    global _default_client
+    if _default_client is None:
+        _default_client = AgentClient()
+    return _default_client
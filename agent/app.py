@@ -1,13 +1,55 @@
-import json
+import gzip
+import hmac
+import logging
 import os
 import time
 import threading
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from pathlib import Path
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
+from post_bitmap import PostDecisionCache
+from chain_events import EventPoller
+from block_cursor import BlockCursor
+from flag_sync import FlagSync
+from governance_index import GovernanceIndex
+from appeal_scheduler import AppealScheduler
+from incentive_mirror import IncentiveMirror
+from multicall import Multicall
+from reputation_cache import ReputationCache
+from reputation_sim import ReputationSimulator
+from reputation_scheduler import ReputationScheduler
+from feed_ranking import FeedIndex
+from post_store import PostStore
+from post_reader import PostReader
+from tx_outbox import TxOutbox, OutboxSender
+from gas import GasStrategy
+from tracing import Tracer, timed_iter
+from profiler import ProfilerBusy, SamplingProfiler
+from signer_pool import SignerPool, parse_private_keys
+from structured_log import get_logger, setup_logging, stats as log_stats
+from toxicity import InferenceError, keyword_score, model_score
+
+# Startup timing breakdown (phase -> seconds). Network probes run in the
+# background so gunicorn can bind immediately; see run_startup_probes().
+_startup_t0 = time.perf_counter()
+_startup_last_mark = _startup_t0
+startup_state = {
+    "started_at": time.time(),
+    "ready": False,
+    "ready_at": None,
+    "timings": {},
+    "probes": {}
+}
+
+def mark_startup_phase(phase):
+    """Record how long the startup phase that just finished took"""
+    global _startup_last_mark
+    now = time.perf_counter()
+    startup_state["timings"][phase] = round(now - _startup_last_mark, 4)
+    _startup_last_mark = now
 
 print('=== ENHANCED SOL AI AGENT STARTUP ===')
 print(f'ENV: SOMNIA_RPC_URL={os.getenv("SOMNIA_RPC_URL")}')
@@ -24,28 +66,17 @@ print('=== ENHANCED AGENT STARTUP END ===')
 
 # Hugging Face API setup
 HF_TOKEN = os.getenv("HF_TOKEN", "")
-HF_API_URL = "https://router.huggingface.co/hf-inference/models/unitary/toxic-bert"
+HF_API_URL = os.getenv("HF_API_URL") or "https://router.huggingface.co/hf-inference/models/unitary/toxic-bert"
 HF_HEADERS = {
     "Authorization": f"Bearer {HF_TOKEN}",
 } if HF_TOKEN else {}
 from web3 import Web3
-# Handle different Web3.py versions
-geth_poa_middleware = None
-try:
-    from web3.middleware import geth_poa_middleware
-except ImportError:
-    try:
-        from web3.middleware.geth_poa import geth_poa_middleware
-    except ImportError:
-        try:
-            from web3 import middleware
-            geth_poa_middleware = middleware.geth_poa_middleware
-        except (ImportError, AttributeError):
-            print("Warning: Could not import geth_poa_middleware, continuing without it")
-            geth_poa_middleware = None
+from web3.logs import DISCARD
+from agent_client import connect, http_session, load_abi
 
 # Load env
 load_dotenv()
+mark_startup_phase("imports")
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
@@ -60,66 +91,103 @@ REPUTATION_ADDR = Web3.to_checksum_address(os.getenv("REPUTATION_SYSTEM_ADDRESS"
 INCENTIVE_ADDR = Web3.to_checksum_address(os.getenv("INCENTIVE_SYSTEM_ADDRESS", "0x0000000000000000000000000000000000000000"))
 GOVERNANCE_ADDR = Web3.to_checksum_address(os.getenv("GOVERNANCE_SYSTEM_ADDRESS", "0x0000000000000000000000000000000000000000"))
 AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY", "")
+AGENT_PRIVATE_KEYS = os.getenv("AGENT_PRIVATE_KEYS", "")  # Extra authorized agent keys, comma separated
+AGENT_LOW_BALANCE = os.getenv("AGENT_LOW_BALANCE", "0.05")  # Warn when an agent key drops below this (native token)
 MODEL_NAME = "unitary/toxic-bert"  # Hugging Face toxic-bert model
 THRESHOLD_BP = int(os.getenv("TOXICITY_THRESHOLD_BP", "2500"))  # Lowered to 25%
+AGENT_DATA_DIR = Path(os.getenv("AGENT_DATA_DIR") or Path(__file__).resolve().parent / "data")
+DECISION_CACHE_PATH = Path(os.getenv("DECISION_CACHE_PATH") or AGENT_DATA_DIR / "post_decisions.bin")
+EVENT_START_BLOCK = int(os.getenv("EVENT_START_BLOCK", "0") or 0)  # 0 = follow from current head
+FLAG_SYNC_START_BLOCK = int(os.getenv("FLAG_SYNC_START_BLOCK", "0") or EVENT_START_BLOCK)  # First boot: replay PostFlagged logs from here
+FLAG_SYNC_STATE_PATH = Path(os.getenv("FLAG_SYNC_STATE_PATH") or AGENT_DATA_DIR / "flag_sync.json")
+REORG_HISTORY_BLOCKS = int(os.getenv("REORG_HISTORY_BLOCKS", "128"))  # Recent block hashes kept to find a fork point
+FLAG_CONFIRMATIONS = int(os.getenv("FLAG_CONFIRMATIONS", "0"))  # Only score/flag posts this many blocks deep
+REPUTATION_CACHE_TTL = int(os.getenv("REPUTATION_CACHE_TTL", "300"))
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "")
+TRACE_BUFFER_POSTS = int(os.getenv("TRACE_BUFFER_POSTS", "1000"))  # Posts whose spans stay in memory; 0 disables tracing
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # Share of posts traced
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")  # Optional OTLP/JSON lines file for finished spans
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")  # Enables /debug/* endpoints; send as X-Debug-Token
+PROFILE_SAMPLE_HZ = float(os.getenv("PROFILE_SAMPLE_HZ", "100"))  # Default /debug/profile sampling rate
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "25"))  # Stay under gunicorn's 30s worker timeout
+MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", "15"))  # Seconds between monitoring passes
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # DEBUG adds per-post detail (content, keyword hits, raw model output)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json (one object per line) or text
+setup_logging(LOG_LEVEL, LOG_FORMAT)
+log = get_logger("agent")
+MAX_BULK_ADDRESSES = 500
+MAX_APPEALS_PAGE_SIZE = 500
+AUTO_RESOLVE_APPEALS = os.getenv("AUTO_RESOLVE_APPEALS", "true").lower() == "true"  # Call resolveAppeal once voting ends
+APPEAL_RESOLVE_GRACE = int(os.getenv("APPEAL_RESOLVE_GRACE", "15"))  # Seconds after votingEnds before resolving
+APPEAL_RESOLVE_BATCH_SIZE = int(os.getenv("APPEAL_RESOLVE_BATCH_SIZE", "20"))  # Appeals per resolveAppeals tx
+REWARD_BATCH_SIZE = int(os.getenv("REWARD_BATCH_SIZE", "25"))  # Users per distributePostRewards tx; 0 disables
+FLAG_BATCH_SIZE = int(os.getenv("FLAG_BATCH_SIZE", "1"))  # >1 uses Moderator.flagPosts; 1 keeps one flagPost tx per post
+FLAG_BATCH_WAIT = int(os.getenv("FLAG_BATCH_WAIT", "15"))  # Seconds a partial flag batch waits to fill up
+TX_OUTBOX_PATH = Path(os.getenv("TX_OUTBOX_PATH") or AGENT_DATA_DIR / "tx_outbox.sqlite3")
+GAS_ESTIMATE_TTL = int(os.getenv("GAS_ESTIMATE_TTL", "600"))  # Seconds a cached per-function gas estimate is reused
+MAX_FEE_GWEI = float(os.getenv("MAX_FEE_GWEI", "0") or 0)  # Optional cap on gas price / max fee
+OUTBOX_STUCK_SECONDS = int(os.getenv("OUTBOX_STUCK_SECONDS", "120"))  # Unmined this long -> rebroadcast with a fee bump
+REPUTATION_BATCH_SIZE = int(os.getenv("REPUTATION_BATCH_SIZE", "1"))  # >1 uses ReputationSystem.updateReputationBatch
+REPUTATION_UPDATE_WINDOW = int(os.getenv("REPUTATION_UPDATE_WINDOW", "60"))  # Max one updateReputation per author per window
+REPUTATION_MAX_STALENESS = int(os.getenv("REPUTATION_MAX_STALENESS", "21600"))  # Seconds before an unchanged score is refreshed anyway
+FEED_TOP_K = int(os.getenv("FEED_TOP_K", "1000"))
+FEED_CANDIDATE_MARGIN = int(os.getenv("FEED_CANDIDATE_MARGIN", "250"))  # Ranked posts kept beyond the top K
+FEED_BACKFILL_POSTS = int(os.getenv("FEED_BACKFILL_POSTS", "500"))  # Recent posts loaded into the feed at startup
+MAX_FEED_PAGE_SIZE = 100
+POST_STORE_PATH = Path(os.getenv("POST_STORE_PATH") or AGENT_DATA_DIR / "posts.sqlite3")
+POST_READ_PAGE_SIZE = int(os.getenv("POST_READ_PAGE_SIZE", "200"))  # Posts per getPostsRange call
+MAX_POSTS_PAGE_SIZE = 200
+MAX_SEARCH_RESULTS = 100
+GZIP_MIN_BYTES = 1024
 
 # Global variables for monitoring
 monitoring_active = False
 last_checked_post_id = 0
-flagged_posts_cache = set()  # Track posts we've already flagged
+# Bitmaps of posts we've flagged / already scored (one bit per post id)
+decision_cache = PostDecisionCache(DECISION_CACHE_PATH)
+try:
+    if decision_cache.load():
+        print(f"Restored post decision cache: {decision_cache.stats()}")
+except Exception as e:
+    print(f"Warning: Could not restore post decision cache: {e}")
+flagged_posts_cache = decision_cache.flagged  # Read-only view; mutate via decision_cache
 agent_stats = {
     "posts_processed": 0,
     "posts_flagged": 0,
     "reputation_updates": 0,
+    "reputation_updates_skipped": 0,
     "incentives_distributed": 0,
     "last_check": None,
     "status": "stopped"
 }
 
-# Read ABIs from contracts/abis
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-def load_abi(filename):
-    try:
-        with open(ABI_DIR / filename, "r", encoding="utf-8") as f:
-            artifact = json.load(f)
-            # Extract ABI from Hardhat artifact format
-            if isinstance(artifact, dict) and 'abi' in artifact:
-                return artifact['abi']
-            elif isinstance(artifact, list):
-                return artifact
-            else:
-                print(f"Warning: Unexpected format in {filename}")
-                return []
-    except Exception as e:
-        print(f"Warning: Could not load {filename}: {e}")
-        return []
-
+# Read ABIs from contracts/abis (parsed once, cached across restarts)
 SOCIAL_ABI = load_abi("SocialPosts.json")
 MOD_ABI = load_abi("Moderator.json")
 # Enhanced contract ABIs
 REPUTATION_ABI = load_abi("ReputationSystem.json")
 INCENTIVE_ABI = load_abi("IncentiveSystem.json")
 GOVERNANCE_ABI = load_abi("GovernanceSystem.json")
+mark_startup_phase("load_abis")
 
-# Web3 setup
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL)) if SOMNIA_RPC_URL else None
-if w3 and geth_poa_middleware:
-    try:
-        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        print("PoA middleware injected successfully")
-    except Exception as e:
-        print(f"Warning: Could not inject PoA middleware: {e}")
-elif w3:
-    print("Warning: PoA middleware not available, continuing without it")
+# Web3 setup: pooled HTTP session, PoA middleware, cached chain id
+w3 = connect(SOMNIA_RPC_URL)
 
 acct = None
-if AGENT_PRIV and w3:
-    try:
-        acct = w3.eth.account.from_key(bytes.fromhex(AGENT_PRIV))
-    except Exception as e:
-        print(f"Warning: Could not load agent account: {e}")
+agent_accounts = []
+if w3:
+    for key in parse_private_keys(AGENT_PRIV, AGENT_PRIVATE_KEYS):
+        try:
+            agent_accounts.append(w3.eth.account.from_key(bytes.fromhex(key)))
+        except Exception as e:
+            print(f"Warning: Could not load agent account: {e}")
+    acct = agent_accounts[0] if agent_accounts else None
+
+# One nonce lane per agent key; flags are sharded across lanes by post id
+signer_pool = SignerPool(
+    w3, agent_accounts,
+    low_balance_wei=Web3.to_wei(Decimal(AGENT_LOW_BALANCE), "ether")
+)
 
 # Initialize contracts
 contracts = {}
@@ -141,22 +209,171 @@ if w3:
         
         if social and moderator:
             print("Core contracts initialized successfully")
-        
-        # Test agent authorization
-        if acct:
-            try:
-                # Try to estimate gas for flagPost to verify authorization
-                test_gas = moderator.functions.flagPost(999999, 5000, "auth-test").estimate_gas({'from': acct.address})
-                print(f"✅ Agent authorized to flag posts (test gas: {test_gas})")
-            except Exception as auth_error:
-                if "already flagged" in str(auth_error).lower():
-                    print("✅ Agent authorized (test post already flagged)")
-                else:
-                    print(f"⚠️ Agent authorization test failed: {auth_error}")
                     
     except Exception as e:
         print(f"Warning: Could not initialize contracts: {e}")
 
+# Contract event polling + bulk reputation cache (invalidated by ReputationUpdated)
+event_poller = EventPoller(
+    w3, cursor=BlockCursor(w3, EVENT_START_BLOCK or None, history=REORG_HISTORY_BLOCKS)
+) if w3 else None
+multicall = Multicall(w3, MULTICALL3_ADDRESS or None) if w3 else None
+reputation_cache = None
+reputation_sim = None
+post_reader = PostReader(contracts['social'], multicall, page_size=POST_READ_PAGE_SIZE) if contracts.get('social') else None
+if w3 and contracts.get('reputation'):
+    try:
+        reputation_cache = ReputationCache(
+            w3, contracts['reputation'],
+            ttl_seconds=REPUTATION_CACHE_TTL,
+            multicall=multicall
+        )
+        event_poller.subscribe(contracts['reputation'], "ReputationUpdated", reputation_cache.on_reputation_updated)
+    except Exception as e:
+        print(f"Warning: Could not initialize reputation cache: {e}")
+    
+    # Off-chain reputation mirror: skip updateReputation txs that wouldn't change anything
+    if contracts.get('social'):
+        reputation_sim = ReputationSimulator(
+            w3, contracts['social'], contracts['reputation'], multicall,
+            max_staleness=REPUTATION_MAX_STALENESS
+        )
+
+# Server-side ranked feed, kept current from ingestion and contract events
+# (load_feed_candidates is attached below, once the post store is open)
+feed_index = FeedIndex(top_k=FEED_TOP_K, margin=FEED_CANDIDATE_MARGIN)
+
+# Local indexed mirror of every post the agent has read
+post_store = None
+try:
+    post_store = PostStore(POST_STORE_PATH)
+except Exception as e:
+    print(f"Warning: Could not open post store {POST_STORE_PATH}: {e}")
+
+def load_feed_candidates(limit, authors):
+    """Store posts that could rank in the feed, with their authors' reputation loaded"""
+    posts = post_store.feed_candidates(limit, authors)
+    load_feed_reputations(post[1] for post in posts)
+    return posts
+
+if post_store:
+    feed_index.load_candidates = load_feed_candidates
+
+def _on_post_liked(event):
+    feed_index.add_like(event["args"]["id"])
+    if post_store:
+        post_store.add_like(event["args"]["id"])
+
+def _on_post_flagged(event):
+    post_id = event["args"]["id"]
+    if governance_index and governance_index.is_unflagged(post_id):
+        return  # Replayed flag of a post a governance appeal has since unflagged
+    feed_index.set_flagged(post_id, True)
+    if post_store:
+        post_store.set_flagged(post_id, True)
+        post = post_store.get(post_id)
+        if reputation_sim and post:
+            reputation_sim.record_flag(post["author"], post_id, event["blockNumber"])
+
+def _on_agent_set(event):
+    lane = signer_pool.lane_by_address(event["args"]["agent"])
+    if lane:
+        lane.authorized = bool(event["args"]["allowed"])
+        print(f"🔑 Agent key {lane.address} {'authorized' if lane.authorized else 'deauthorized'} in Moderator")
+
+def _on_reputation_stored(event):
+    if reputation_sim:
+        reputation_sim.record_stored(event["args"]["user"], event["args"]["newScore"], event["args"]["newTier"])
+
+def _on_reputation_changed(event):
+    feed_index.set_reputation(event["args"]["user"], event["args"]["newScore"])
+
+def _on_events_reorged(fork_block, removed):
+    """Undo the effects of events from blocks a reorg dropped; the new logs are replayed next"""
+    for event in removed:
+        if event["event"] == "PostLiked":
+            feed_index.add_like(event["args"]["id"], -1)
+            if post_store:
+                post_store.add_like(event["args"]["id"], -1)
+        elif event["event"] == "ReputationUpdated":
+            if reputation_cache:
+                reputation_cache.invalidate(event["args"]["user"])
+            if reputation_sim:
+                reputation_sim.forget(event["args"]["user"])
+    if contracts.get('moderator') and any(event["event"] == "AgentSet" for event in removed):
+        signer_pool.refresh_authorization(contracts['moderator'])
+
+def _on_flags_reorged(fork_block, removed):
+    for event in removed:
+        if event["event"] != "PostFlagged" or "moderator" not in event["args"]:
+            continue  # Moderator.PostFlagged carries an agent, SocialPosts.PostFlagged a moderator
+        post_id = event["args"]["id"]
+        feed_index.set_flagged(post_id, False)
+        if post_store:
+            post_store.set_flagged(post_id, False)
+            post = post_store.get(post_id)
+            if reputation_sim and post:
+                reputation_sim.forget(post["author"])
+
+if event_poller:
+    event_poller.subscribe(contracts.get('social'), "PostLiked", _on_post_liked)
+    event_poller.subscribe(contracts.get('moderator'), "AgentSet", _on_agent_set)
+    event_poller.on_reorg(_on_events_reorged)
+    event_poller.subscribe(contracts.get('reputation'), "ReputationUpdated", _on_reputation_changed)
+    event_poller.subscribe(contracts.get('reputation'), "ReputationUpdated", _on_reputation_stored)
+
+def apply_unflag(post_id, unflagged=True):
+    """Apply an upheld appeal (or undo a reorged-out one) to every local flagged view"""
+    if unflagged:
+        decision_cache.unmark_flagged(post_id)
+    else:
+        decision_cache.mark_flagged(post_id)
+    feed_index.set_flagged(post_id, not unflagged)
+    if post_store:
+        post_store.set_flagged(post_id, not unflagged)
+
+def _on_appeal_changed(appeal_id, appeal):
+    if not appeal_scheduler:
+        return
+    if appeal is None or appeal["resolved"]:
+        appeal_scheduler.cancel(appeal_id)
+    else:
+        appeal_scheduler.schedule(appeal_id, appeal["voting_ends"])
+
+# Appeals mirrored from GovernanceSystem events; upheld appeals unflag posts locally
+governance_index = None
+if event_poller and contracts.get('governance'):
+    governance_index = GovernanceIndex(
+        contracts['governance'], multicall, on_unflag=apply_unflag, on_appeal=_on_appeal_changed
+    )
+    governance_index.subscribe(event_poller)
+
+# Flagged set from Moderator/SocialPosts PostFlagged logs, checked before any flag tx work
+flag_sync = None
+if w3 and (contracts.get('moderator') or contracts.get('social')):
+    flag_sync = FlagSync(
+        w3, decision_cache, FLAG_SYNC_STATE_PATH,
+        start_block=FLAG_SYNC_START_BLOCK or None, reorg_history=REORG_HISTORY_BLOCKS,
+        exclude=governance_index.is_unflagged if governance_index else None
+    )
+    flag_sync.watch(contracts.get('moderator'))
+    flag_sync.watch(contracts.get('social'), _on_post_flagged)
+    flag_sync.on_reorg(_on_flags_reorged)
+mark_startup_phase("init_contracts")
+
+def test_agent_authorization():
+    """Read Moderator.agents for every agent key (runs in the background at startup)"""
+    moderator_contract = contracts.get('moderator')
+    if not moderator_contract or not acct:
+        return False
+    
+    authorized = signer_pool.refresh_authorization(moderator_contract)
+    if authorized.get(acct.address):
+        print(f"✅ Agent authorized to flag posts ({sum(1 for ok in authorized.values() if ok)}/{len(authorized)} keys)")
+        return True
+    print(f"⚠️ Agent {acct.address} is not authorized in Moderator (agents() = {authorized.get(acct.address)})")
+    return False
+
 # Initialize Hugging Face API
 def test_huggingface_api():
     """Test Hugging Face API connection"""
@@ -166,7 +383,7 @@ def test_huggingface_api():
     
     try:
         # Test with a simple non-toxic message
-        test_response = requests.post(
+        test_response = http_session().post(
             HF_API_URL, 
             headers=HF_HEADERS, 
             json={"inputs": "Hello, how are you?"},
@@ -185,297 +402,504 @@ def test_huggingface_api():
         print(f"❌ Hugging Face API test error: {e}")
         return False
 
-# Test the API on startup
-HF_API_AVAILABLE = test_huggingface_api()
+# Assume the API is usable until the background probe says otherwise;
+# score_toxicity() falls back to keywords on any request failure anyway.
+HF_API_AVAILABLE = bool(HF_TOKEN)
 
+def _run_probe(name, probe):
+    started = time.perf_counter()
+    try:
+        result = probe()
+    except Exception as e:
+        print(f"⚠️ Startup probe {name} failed: {e}")
+        result = False
+    startup_state["probes"][name] = {
+        "ok": bool(result),
+        "seconds": round(time.perf_counter() - started, 4)
+    }
+    return result
 
-def score_toxicity(text: str) -> int:
-    """Score toxicity of text using Hugging Face toxic-bert model, return basis points (0-10000)"""
+def run_startup_probes():
+    """Run the slow network probes in parallel, then mark the agent ready"""
+    global HF_API_AVAILABLE
     
-    # Try Hugging Face toxic-bert API first
-    if HF_API_AVAILABLE and HF_TOKEN:
-        try:
-            print(f"🔍 Analyzing with toxic-bert: '{text[:50]}...'")
-            
-            response = requests.post(
-                HF_API_URL,
-                headers=HF_HEADERS,
-                json={"inputs": text},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                # toxic-bert returns a list of classifications
-                # Format: [{'label': 'toxic', 'score': 0.xxx}, {'label': 'obscene', 'score': 0.xxx}, ...]
-                if isinstance(result, list) and len(result) > 0:
-                    # Find the toxic score
-                    toxic_score = 0.0
-                    for classification in result[0]:  # First element contains the classifications
-                        if classification.get('label') == 'toxic':
-                            toxic_score = classification.get('score', 0.0)
-                            break
-                    
-                    # Convert to basis points (0-10000)
-                    toxicity_bp = int(toxic_score * 10000)
-                    toxicity_percentage = round(toxic_score * 100, 2)
-                    
-                    print(f"✅ toxic-bert result: {toxicity_percentage}% ({toxicity_bp} BP)")
-                    print(f"📊 Full classification: {result[0]}")
-                    
-                    return toxicity_bp
-                else:
-                    print(f"⚠️ Unexpected API response format: {result}")
-                    
-            elif response.status_code == 503:
-                print("⚠️ Model is loading, falling back to keyword detection...")
-            else:
-                print(f"❌ API request failed: {response.status_code} - {response.text}")
-                
-        except requests.exceptions.Timeout:
-            print("⚠️ API request timed out, falling back to keyword detection...")
-        except Exception as e:
-            print(f"❌ Hugging Face API error: {e}")
-    
-    # Fallback to enhanced keyword-based detection
-    print("🔄 Using keyword-based detection as fallback")
-    
-    # Enhanced keyword-based detection with more comprehensive lists
-    toxic_keywords = {
-        'high': ['kill', 'die', 'murder', 'suicide', 'terrorist', 'bomb', 'weapon', 'fuck', 'shit', 'bitch', 'asshole', 'cunt'],
-        'medium': ['hate', 'stupid', 'idiot', 'moron', 'loser', 'pathetic', 'disgusting', 'bastard', 'bloody', 'damn', 'retard'],
-        'low': ['hell', 'crap', 'sucks', 'annoying', 'boring', 'lame', 'dumb', 'weird']
-    }
+    probes_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup-probe") as pool:
+        hf_future = pool.submit(_run_probe, "huggingface", test_huggingface_api)
+        pool.submit(_run_probe, "agent_authorization", test_agent_authorization)
     
-    lower_text = text.lower()
-    score = 300  # Base score (3%)
+    HF_API_AVAILABLE = bool(hf_future.result())
+    startup_state["timings"]["probes"] = round(time.perf_counter() - probes_started, 4)
+    startup_state["ready"] = True
+    startup_state["ready_at"] = time.time()
     
-    # Check for high toxicity keywords
-    for keyword in toxic_keywords['high']:
-        if keyword in lower_text:
-            score += 3000  # Add 30% per high-toxicity word
-            print(f"🚨 High toxicity keyword detected: '{keyword}'")
+    print("=== STARTUP TIMING ===")
+    for phase, seconds in startup_state["timings"].items():
+        print(f"  {phase}: {seconds * 1000:.1f} ms")
+    for name, probe in startup_state["probes"].items():
+        print(f"  probe {name}: {probe['seconds'] * 1000:.1f} ms ({'ok' if probe['ok'] else 'failed'})")
+    print(f"  ready after: {startup_state['ready_at'] - startup_state['started_at']:.2f} s")
+
+
+def classify_toxicity(text: str):
+    """Score toxicity of text in basis points (0-10000); returns (score_bp, scorer)"""
     
-    # Check for medium toxicity keywords  
-    for keyword in toxic_keywords['medium']:
-        if keyword in lower_text:
-            score += 1500  # Add 15% per medium-toxicity word
-            print(f"⚠️ Medium toxicity keyword detected: '{keyword}'")
-            
-    # Check for low toxicity keywords
-    for keyword in toxic_keywords['low']:
-        if keyword in lower_text:
-            score += 800   # Add 8% per low-toxicity word
-            print(f"💭 Low toxicity keyword detected: '{keyword}'")
-    
-    # Cap at 9500 (95%)
-    final_score = min(score, 9500)
-    print(f"📊 Keyword-based score: {final_score/100}% ({final_score} BP)")
-    
-    return final_score
-
-def update_user_reputation(user_address, is_flagged=False):
-    """Update user reputation based on post outcome"""
-    if not contracts.get('reputation') or not acct:
-        print("⚠️ Reputation system not available")
-        return False
+    # Try Hugging Face toxic-bert API first
+    if HF_API_AVAILABLE and HF_TOKEN:
+        try:
+            toxicity_bp, classification = model_score(text, HF_API_URL, HF_HEADERS, http_session())
+            log.debug("toxic-bert classification", extra={"score_bp": toxicity_bp, "classification": classification})
+            return toxicity_bp, "toxic-bert"
+        except InferenceError as e:
+            log.warning(str(e), extra=e.fields)
     
+    # Fallback to keyword-based detection
+    final_score, hits = keyword_score(text)
+    if hits:
+        log.debug("Toxicity keywords detected", extra={"keywords": hits, "score_bp": final_score})
+    return final_score, "keyword-based"
+
+def score_toxicity(text: str) -> int:
+    """Score toxicity of text using Hugging Face toxic-bert model, return basis points (0-10000)"""
+    return classify_toxicity(text)[0]
+
+# Per-post spans (fetch, ingest, score, decide, prepare, sign, broadcast, confirm)
+tracer = Tracer(TRACE_BUFFER_POSTS, TRACE_SAMPLE_RATE, TRACE_EXPORT_PATH or None)
+# Stack sampler behind /debug/profile; idle unless a profile is requested
+profiler = SamplingProfiler(PROFILE_SAMPLE_HZ, PROFILE_MAX_SECONDS)
+
+# Cached gas estimates, chain id and fees from recent blocks for every transaction
+gas_strategy = GasStrategy(
+    w3, chain_id=CHAIN_ID or None, estimate_ttl=GAS_ESTIMATE_TTL, max_fee_gwei=MAX_FEE_GWEI or None
+) if w3 else None
+
+def check_signer_balances():
+    """Warn about agent keys that can only afford a few more transactions (rate limited)"""
+    if not gas_strategy or not len(signer_pool):
+        return
     try:
-        print(f"🏆 Updating reputation for {user_address}")
-        
-        # Call updateReputation function
-        tx = contracts['reputation'].functions.updateReputation(user_address).build_transaction({
-            "from": acct.address,
-            "nonce": w3.eth.get_transaction_count(acct.address),
-            "chainId": CHAIN_ID or w3.eth.chain_id,
-            "gas": 200000,
-            "gasPrice": w3.to_wei("10", "gwei"),
-        })
-        
-        signed = acct.sign_transaction(tx)
-        # Support both Web3.py v5 and v6+ attribute names
-        raw_tx = getattr(signed, 'rawTransaction', None) or getattr(signed, 'raw_transaction', None)
-        tx_hash = w3.eth.send_raw_transaction(raw_tx)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        
-        agent_stats["reputation_updates"] += 1
-        print(f"✅ Reputation updated! TX: {tx_hash.hex()}")
-        return True
-        
+        fees = gas_strategy.fees()
+        cost_per_tx = 150000 * fees.get("maxFeePerGas", fees.get("gasPrice", 0))  # ~ one flagPost
+        signer_pool.check_balances(cost_per_tx or None)
     except Exception as e:
-        print(f"❌ Failed to update reputation: {e}")
-        return False
+        print(f"Warning: Could not check agent balances: {e}")
 
-def trigger_incentive_distribution(user_address):
-    """Trigger incentive distribution for safe posts"""
-    if not contracts.get('incentive') or not acct:
-        print("⚠️ Incentive system not available")
-        return False
-    
+def apply_flag(post_id, author, block_number):
+    """Record a confirmed on-chain flag in every local index"""
+    decision_cache.mark_flagged(post_id)
+    feed_index.set_flagged(post_id, True)
+    if post_store:
+        post_store.set_flagged(post_id, True)
+    if reputation_sim:
+        reputation_sim.record_flag(author, post_id, block_number)
+    agent_stats["posts_flagged"] += 1
+    # Update reputation (penalty for flagged post) - flushed immediately
+    if reputation_scheduler:
+        reputation_scheduler.mark_dirty(author, urgent=True)
+
+def _flag_call(entries):
+    """flagPost for one decision, flagPosts for a batch (batches are grouped by model, see _flag_model)"""
+    moderator_contract = contracts['moderator']
+    if len(entries) == 1:
+        entry = entries[0]
+        return moderator_contract.functions.flagPost(int(entry["key"]), entry["payload"]["score_bp"], entry["payload"]["model"])
+    return moderator_contract.functions.flagPosts(
+        [int(entry["key"]) for entry in entries],
+        [entry["payload"]["score_bp"] for entry in entries],
+        entries[0]["payload"]["model"]
+    )
+
+def _on_flag_receipt(entries, receipt):
+    """Apply the flags a mined flagPost/flagPosts tx actually made"""
+    moderator_contract = contracts['moderator']
+    authors = {int(entry["key"]): entry["payload"]["author"] for entry in entries}
+    for event in moderator_contract.events.PostFlagged().process_receipt(receipt, errors=DISCARD):
+        post_id = event["args"]["id"]
+        if post_id in authors:
+            apply_flag(post_id, authors[post_id], receipt.blockNumber)
+            log.info("Post flagged", extra={"post_id": post_id, "block": receipt.blockNumber})
+    for event in moderator_contract.events.FlagFailed().process_receipt(receipt, errors=DISCARD):
+        post_id, reason = event["args"]["id"], event["args"]["reason"]
+        log.warning("Post not flagged", extra={"post_id": post_id, "reason": reason or "reverted"})
+        if "already flagged" in reason.lower():
+            decision_cache.mark_flagged(post_id)
+            if reputation_sim and post_id in authors:
+                reputation_sim.forget(authors[post_id])
+
+def _skip_flag(entry):
+    """Posts the PostFlagged logs already show as flagged never reach the tx path"""
+    if int(entry["key"]) in flagged_posts_cache:
+        return "already flagged on-chain (event log)"
+    return None
+
+def _flag_model(entry):
+    """flagPosts records one model name for the whole batch, so only same-model decisions share one"""
+    return entry["payload"]["model"]
+
+def _is_final_flag_error(entries, error):
+    """Already-flagged and invalid posts will never succeed; everything else is retried"""
+    error_msg = str(error).lower()
+    if "already flagged" in error_msg:
+        for entry in entries:
+            log.info("Post already flagged on-chain, dropping from outbox", extra={"post_id": int(entry["key"])})
+            decision_cache.mark_flagged(int(entry["key"]))
+            if reputation_sim:
+                reputation_sim.forget(entry["payload"]["author"])  # Flag time unknown; re-read counters on next use
+        return True
+    return "invalid post id" in error_msg or "not authorized agent" in error_msg
+
+# Durable queue of flag transactions, drained by a single sender thread
+tx_outbox = TxOutbox(TX_OUTBOX_PATH)
+outbox_sender = OutboxSender(w3, signer_pool, tx_outbox, gas_strategy, stuck_after=OUTBOX_STUCK_SECONDS, tracer=tracer)
+outbox_sender.register(
+    "flag", _flag_call, _on_flag_receipt, _is_final_flag_error,
+    batch_size=FLAG_BATCH_SIZE, batch_wait=FLAG_BATCH_WAIT, skip=_skip_flag, trace=True, batch_key=_flag_model
+)
+
+def _reputation_call(entries):
+    """updateReputation for one author, updateReputationBatch for several"""
+    users = [entry["payload"]["user"] for entry in entries]
+    if len(users) == 1:
+        return contracts['reputation'].functions.updateReputation(users[0])
+    return contracts['reputation'].functions.updateReputationBatch(users)
+
+def _on_reputation_receipt(entries, receipt):
+    users = [entry["payload"]["user"] for entry in entries]
+    agent_stats["reputation_updates"] += len(users)
+    for user_address in users:
+        if reputation_cache:
+            reputation_cache.invalidate(user_address)
+        if reputation_sim:
+            reputation_sim.mark_submitted(user_address)
+    log.info("Reputation updated", extra={"users": users, "block": receipt.blockNumber})
+
+def _skip_reputation(entry):
+    """Checked at send time: the mirror knows whether the stored reputation would change"""
+    if not reputation_sim:
+        return None
+    user_address = entry["payload"]["user"]
     try:
-        print(f"💰 Triggering incentive distribution for {user_address}")
-        
-        # This would call claimPostRewards or similar function
-        # Implementation depends on the specific incentive contract design
-        
+        if not reputation_sim.needs_update(user_address):
+            agent_stats["reputation_updates_skipped"] += 1
+            return "reputation unchanged"
+    except Exception as e:
+        log.warning("Reputation simulation failed, updating anyway", extra={"user": user_address, "error": str(e)})
+    return None
+
+# Coalesces per-post reputation updates into one outbox entry per author:
+# flagged authors are due at once, others once per window
+reputation_scheduler = None
+if contracts.get('reputation') and acct:
+    # Same lanes, nonces and fee bumps as flags, so a dropped reputation tx can't leave a nonce gap
+    outbox_sender.register(
+        "reputation", _reputation_call, _on_reputation_receipt,
+        batch_size=REPUTATION_BATCH_SIZE, skip=_skip_reputation
+    )
+    reputation_scheduler = ReputationScheduler(
+        tx_outbox, "reputation", window_seconds=REPUTATION_UPDATE_WINDOW, wake=outbox_sender.wake
+    )
+
+def _resolve_call(entries):
+    """resolveAppeal for one appeal, resolveAppeals for every appeal that came due together"""
+    governance_contract = contracts['governance']
+    if len(entries) == 1:
+        return governance_contract.functions.resolveAppeal(int(entries[0]["key"]))
+    return governance_contract.functions.resolveAppeals([int(entry["key"]) for entry in entries])
+
+def _on_resolve_receipt(entries, receipt):
+    # The governance index picks the outcome up from the same events on its next poll
+    for event in contracts['governance'].events.AppealResolved().process_receipt(receipt, errors=DISCARD):
+        outcome = "upheld" if event["args"]["upheld"] else "rejected"
+        log.info("Appeal resolved", extra={"appeal_id": event["args"]["appealId"], "outcome": outcome, "block": receipt.blockNumber})
+
+def _skip_resolve(entry):
+    appeal = governance_index.get(int(entry["key"])) if governance_index else None
+    if appeal is None:
+        return "unknown appeal"
+    if appeal["resolved"]:
+        return "already resolved"
+    return None
+
+def _is_final_resolve_error(entries, error):
+    # "Voting period not ended" (clock skew) is retried with backoff
+    return "already resolved" in str(error).lower()
+
+if contracts.get('governance'):
+    outbox_sender.register(
+        "resolve_appeal", _resolve_call, _on_resolve_receipt, _is_final_resolve_error,
+        batch_size=APPEAL_RESOLVE_BATCH_SIZE, skip=_skip_resolve
+    )
+
+def queue_appeal_resolutions(appeal_ids):
+    """Persist resolveAppeal work for appeals whose voting has ended"""
+    for appeal_id in appeal_ids:
+        tx_outbox.enqueue("resolve_appeal", appeal_id, {})
+    log.info("Voting ended, appeals queued for resolution", extra={"appeal_ids": appeal_ids})
+    outbox_sender.wake()
+
+# Sleeps until the next votingEnds instead of polling every open appeal
+appeal_scheduler = None
+if governance_index and acct and AUTO_RESOLVE_APPEALS:
+    appeal_scheduler = AppealScheduler(queue_appeal_resolutions, grace_seconds=APPEAL_RESOLVE_GRACE)
+
+def _projected_tier(user):
+    """getUserTier as the reputation mirror projects it (None for authors it hasn't seen)"""
+    snapshot = reputation_sim.snapshot(user)
+    return snapshot["projected_tier"] if snapshot else None
+
+# Reward eligibility mirrored locally; distributions are batched into quiet periods
+incentive_mirror = None
+if multicall and all(contracts.get(name) for name in ('incentive', 'social', 'reputation')):
+    incentive_mirror = IncentiveMirror(
+        contracts['incentive'], contracts['social'], contracts['reputation'], multicall,
+        # On-chain flag state: posts overturned by an appeal are still flagged in SocialPosts
+        is_flagged=lambda post_id: post_id in flagged_posts_cache or bool(governance_index and governance_index.is_unflagged(post_id)),
+        # calculatePostReward calls getUserTier, which recomputes the tier from the live counters;
+        # the reputation mirror projects the same, ahead of any skipped or debounced updateReputation
+        tier_of=_projected_tier if reputation_sim else None
+    )
+    event_poller.subscribe(contracts['incentive'], "RewardClaimed", incentive_mirror.on_reward_event)
+    event_poller.subscribe(contracts['incentive'], "EngagementReward", incentive_mirror.on_reward_event)
+distributor_authorized = None  # IncentiveSystem.distributors(agent), read once
+
+def _reward_call(entries):
+    return contracts['incentive'].functions.distributePostRewards([entry["payload"]["user"] for entry in entries])
+
+def _on_reward_receipt(entries, receipt):
+    for event in contracts['incentive'].events.RewardClaimed().process_receipt(receipt, errors=DISCARD):
         agent_stats["incentives_distributed"] += 1
-        print(f"✅ Incentive distribution triggered!")
+        log.info("Post rewards paid", extra={"user": event["args"]["user"], "amount_wei": str(event["args"]["amount"])})
+    for entry in entries:
+        # Re-read everyone; anyone the mirror misjudged is reconsidered after the reload
+        incentive_mirror.mark_stale(entry["payload"]["user"])
+        incentive_mirror.mark_candidate(entry["payload"]["user"])
+
+def _skip_reward(entry):
+    result = incentive_mirror.evaluate(entry["payload"]["user"])
+    if result is None or not result["eligible"]:
+        incentive_mirror.release([entry["payload"]["user"]])
+        return "no longer eligible"
+    return None
+
+def _is_final_reward_error(entries, error):
+    global distributor_authorized
+    incentive_mirror.release([entry["payload"]["user"] for entry in entries])
+    if "not authorized distributor" in str(error).lower():
+        distributor_authorized = False
         return True
-        
-    except Exception as e:
-        print(f"❌ Failed to trigger incentives: {e}")
+    return False
+
+if incentive_mirror:
+    outbox_sender.register(
+        "distribute_rewards", _reward_call, _on_reward_receipt, _is_final_reward_error,
+        batch_size=max(REWARD_BATCH_SIZE, 1), skip=_skip_reward
+    )
+
+def trigger_incentive_distribution(user_address):
+    """Mark an author with a new safe post for the next batched reward distribution"""
+    if not incentive_mirror:
         return False
+    incentive_mirror.mark_candidate(user_address)
+    return True
+
+def distribute_rewards():
+    """Queue distributePostRewards for authors the mirror finds eligible (call in quiet periods)"""
+    global distributor_authorized
+    if not incentive_mirror or not acct or REWARD_BATCH_SIZE <= 0:
+        return 0
+    if distributor_authorized is None:
+        try:
+            distributor_authorized = contracts['incentive'].functions.distributors(acct.address).call()
+        except Exception as e:
+            print(f"⚠️ Could not check IncentiveSystem distributor status: {e}")
+            return 0
+        if not distributor_authorized:
+            print(f"⚠️ {acct.address} is not an IncentiveSystem distributor, reward distribution disabled")
+    if not distributor_authorized:
+        return 0
+    
+    users = incentive_mirror.take_eligible(REWARD_BATCH_SIZE)
+    for user in users:
+        tx_outbox.enqueue("distribute_rewards", f"{user.lower()}:{int(time.time())}", {"user": user})
+    if users:
+        log.info("Queued post rewards", extra={"users": users})
+        outbox_sender.wake()
+    return len(users)
 
 def handle_post(post_id, author, content):
-    """Handle a single post for moderation"""
+    """Handle a single post for moderation; logs one summary record per decision"""
     global agent_stats
     
-    print(f"\n{'='*60}")
-    print(f"🔍 ANALYZING NEW POST #{post_id}")
-    print(f"{'='*60}")
-    print(f"📝 Author: {author}")
-    print(f"📄 Content: '{content}'")
-    print(f"📏 Length: {len(content)} characters")
-    print(f"⏰ Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())}")
+    started = time.perf_counter()
+    decision = {"post_id": post_id, "author": author, "content_length": len(content), "threshold_bp": THRESHOLD_BP}
+    log.debug("Analyzing post", extra={"post_id": post_id, "content": content})
+    
+    def decided(outcome, result, level=logging.INFO, **fields):
+        decision.update(fields, decision=outcome, duration_ms=round((time.perf_counter() - started) * 1000, 2))
+        log.log(level, "Post decided", extra=decision)
+        return result
     
     try:
-        print(f"\n🤖 Starting AI Analysis...")
-        score_bp = score_toxicity(content)
+        with tracer.span(post_id, "score") as span:
+            score_bp, scorer = classify_toxicity(content)
+            span["score_bp"] = score_bp
+            span["scorer"] = scorer
+        decision.update(score_bp=score_bp, scorer=scorer)
         agent_stats["posts_processed"] += 1
-        
-        score_percentage = score_bp / 100
-        threshold_percentage = THRESHOLD_BP / 100
-        
-        print(f"\n📊 ANALYSIS RESULTS:")
-        print(f"   Toxicity Score: {score_percentage:.2f}% ({score_bp} BP)")
-        print(f"   Threshold: {threshold_percentage:.2f}% ({THRESHOLD_BP} BP)")
-        print(f"   Model Used: {'toxic-bert' if HF_API_AVAILABLE else 'keyword-based'}")
+        decision_cache.mark_scored(post_id)
+        if post_store:
+            post_store.set_score(post_id, score_bp)
+        if reputation_sim:
+            try:
+                reputation_sim.record_post(author, post_id)
+            except Exception as e:
+                log.warning("Could not mirror reputation counters", extra={"author": author, "error": str(e)})
+        if incentive_mirror:
+            incentive_mirror.record_post(author, post_id)
         
         if score_bp >= THRESHOLD_BP:
-            print(f"\n🚨 TOXIC CONTENT DETECTED!")
-            print(f"   ⚠️ Post {post_id} exceeds toxicity threshold")
-            print(f"   📊 Score: {score_percentage:.2f}% > Threshold: {threshold_percentage:.2f}%")
-            print(f"   📝 Content Preview: '{content[:100]}{'...' if len(content) > 100 else ''}'")
-            
             moderator_contract = contracts.get('moderator')
             if moderator_contract and acct:
                 # Check if we've already flagged this post in our session
                 if post_id in flagged_posts_cache:
-                    print(f"   ⚠️ Post {post_id} already flagged by this agent, skipping blockchain transaction")
-                    print(f"{'='*60}")
-                    return {"flagged": False, "score": score_bp, "already_flagged": True}
-                
-                print(f"\n🏴 INITIATING BLOCKCHAIN FLAGGING PROCESS...")
+                    return decided("already_flagged", {"flagged": False, "score": score_bp, "already_flagged": True})
                 
-                # Flag the post
-                try:
-                    # Use appropriate model name
-                    model_name_for_tx = "toxic-bert" if HF_API_AVAILABLE else "keyword-based"
-                    print(f"   🔧 Model for transaction: {model_name_for_tx}")
-                    
-                    print(f"   ⛽ Estimating gas for flagPost transaction...")
-                    gas_estimate = moderator_contract.functions.flagPost(post_id, score_bp, model_name_for_tx).estimate_gas({'from': acct.address})
-                    print(f"   ⛽ Gas estimate: {gas_estimate}")
-                    
-                    print(f"   📝 Building transaction...")
-                    nonce = w3.eth.get_transaction_count(acct.address)
-                    print(f"   🔢 Account nonce: {nonce}")
-                    
-                    tx = moderator_contract.functions.flagPost(post_id, score_bp, model_name_for_tx).build_transaction({
-                        "from": acct.address,
-                        "nonce": nonce,
-                        "chainId": CHAIN_ID or w3.eth.chain_id,
-                        "gas": int(gas_estimate * 1.2),
-                        "gasPrice": w3.to_wei("10", "gwei"),
-                    })
-                    
-                    print(f"   ✍️ Signing transaction...")
-                    signed = acct.sign_transaction(tx)
-                    
-                    print(f"   📤 Sending transaction to blockchain...")
-                    # Support both Web3.py v5 and v6+ attribute names
-                    raw_tx = getattr(signed, 'rawTransaction', None) or getattr(signed, 'raw_transaction', None)
-                    tx_hash = w3.eth.send_raw_transaction(raw_tx)
-                    print(f"   🔗 Transaction hash: {tx_hash.hex()}")
-                    
-                    print(f"   ⏳ Waiting for transaction confirmation...")
-                    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-                    print(f"   ✅ Transaction confirmed! Block: {receipt.blockNumber}")
-                    
-                    # Add to our cache and update stats
-                    flagged_posts_cache.add(post_id)
-                    agent_stats["posts_flagged"] += 1
-                    
-                    print(f"\n🎉 POST SUCCESSFULLY FLAGGED!")
-                    print(f"   📊 Total posts processed: {agent_stats['posts_processed']}")
-                    print(f"   🚩 Total posts flagged: {agent_stats['posts_flagged']}")
-                    print(f"   🔗 Transaction: {tx_hash.hex()}")
-                    
-                    # Update reputation (penalty for flagged post)
-                    update_user_reputation(author, is_flagged=True)
-                    
-                    print(f"{'='*60}")
-                    
-                    return {"flagged": True, "tx_hash": tx_hash.hex(), "score": score_bp}
-                    
-                except Exception as flag_error:
-                    error_msg = str(flag_error).lower()
-                    print(f"\n❌ FLAGGING FAILED!")
-                    print(f"   🚨 Error: {flag_error}")
-                    
-                    if "already flagged" in error_msg:
-                        print(f"   ℹ️ Reason: Post {post_id} already flagged on blockchain")
-                        flagged_posts_cache.add(post_id)  # Add to cache to prevent future attempts
-                        print(f"   ✅ Added to local cache to prevent future attempts")
-                        print(f"{'='*60}")
-                        return {"flagged": False, "score": score_bp, "already_flagged": True}
-                    else:
-                        print(f"   ❌ Unexpected error during blockchain transaction")
-                        print(f"   📝 Error details: {flag_error}")
-                        print(f"{'='*60}")
-                        return {"flagged": False, "score": score_bp, "error": str(flag_error)}
+                # Persist the decision first; the outbox sender owns the transaction from here
+                queued = tx_outbox.enqueue("flag", post_id, {
+                    "author": author, "score_bp": score_bp, "model": scorer
+                })
+                outbox_sender.wake()
+                return decided("flag_queued", {"flagged": False, "queued": True, "score": score_bp}, newly_queued=queued)
             else:
-                print(f"\n❌ CANNOT FLAG POST!")
-                print(f"   ⚠️ Missing moderator contract or agent account")
-                print(f"   🔧 Contract available: {moderator is not None}")
-                print(f"   🔑 Account available: {acct is not None}")
-                print(f"{'='*60}")
-                return {"flagged": False, "score": score_bp, "error": "Missing contract/account"}
+                return decided(
+                    "cannot_flag", {"flagged": False, "score": score_bp, "error": "Missing contract/account"},
+                    logging.WARNING, moderator_available=moderator_contract is not None, account_available=acct is not None
+                )
         else:
-            print(f"\n✅ POST DEEMED SAFE")
-            print(f"   📊 Score: {score_percentage:.2f}% < Threshold: {threshold_percentage:.2f}%")
-            print(f"   ✅ No action required - content is within acceptable limits")
-            print(f"   📊 Total posts processed: {agent_stats['posts_processed']}")
-            
-            # Update reputation (bonus for safe post)
-            update_user_reputation(author, is_flagged=False)
+            # Update reputation (bonus for safe post) - coalesced per author
+            if reputation_scheduler:
+                reputation_scheduler.mark_dirty(author)
             
             # Trigger incentive distribution for safe posts
             trigger_incentive_distribution(author)
             
-            print(f"{'='*60}")
-            return {"flagged": False, "score": score_bp}
+            return decided("safe", {"flagged": False, "score": score_bp})
             
     except Exception as e:
-        print(f"\n💥 CRITICAL ERROR HANDLING POST!")
-        print(f"   🚨 Post ID: {post_id}")
-        print(f"   ❌ Error: {e}")
-        print(f"   📝 Content: '{content[:50]}{'...' if len(content) > 50 else ''}'")
-        print(f"{'='*60}")
-        return {"error": str(e)}
+        return decided("error", {"error": str(e)}, logging.ERROR, error=str(e))
+
+def load_feed_reputations(authors):
+    """Load unknown authors' reputation into the feed in one read"""
+    unknown = feed_index.unknown_authors(authors)
+    if unknown and reputation_cache:
+        try:
+            for address, reputation in reputation_cache.get_many(unknown).items():
+                feed_index.set_reputation(address, reputation["current_score"])
+        except Exception as e:
+            print(f"Warning: Could not load author reputation for feed: {e}")
+
+def index_posts_for_feed(posts):
+    """Add getPost() tuples to the ranked feed, scored with their authors' reputation"""
+    # Reputation first, so a post isn't evicted on a zero-reputation score
+    load_feed_reputations(post[1] for post in posts)
+    for post in posts:
+        # id, author, content, flagged, timestamp, likes, replies
+        feed_index.upsert_post(post[0], post[1], post[3], post[4], post[5], post[6], content=post[2])
+
+def backfill_feed(total_posts):
+    """Load the most recent existing posts into the ranked feed"""
+    if FEED_BACKFILL_POSTS <= 0:
+        return 0
+    
+    if post_store and post_store.count() > 0:
+        # The rebuild pulls the store's ranking candidates itself
+        feed_index.refresh(force_rebuild=True)
+        indexed = feed_index.stats()["posts_indexed"]
+        print(f"📰 Feed rebuilt with {indexed} candidate posts from the store")
+        return indexed
+    if post_reader:
+        posts = []
+        try:
+            for page in post_reader.iter_pages(max(1, total_posts - FEED_BACKFILL_POSTS + 1), total_posts):
+                posts.extend(page)
+        except Exception as e:
+            print(f"Warning: Could not backfill posts into feed: {e}")
+    else:
+        return 0
+    index_posts_for_feed(posts)
+    feed_index.refresh(force_rebuild=True)
+    print(f"📰 Feed backfilled with {len(posts)} recent posts")
+    return len(posts)
+
+def backfill_post_store(start_id, total_posts):
+    """Mirror existing posts the store hasn't seen yet, then load the feed from it"""
+    if post_store and post_reader and start_id <= total_posts:
+        print(f"🗄️ Mirroring posts {start_id} to {total_posts} into local store...")
+        try:
+            for page in post_reader.iter_pages(start_id, total_posts):
+                post_store.upsert_posts(page)
+        except Exception as e:
+            print(f"Warning: Could not mirror posts: {e}")
+        print(f"🗄️ Post store now holds {post_store.count()} posts")
+    sync_flagged_posts(total_posts)
+    backfill_feed(total_posts)
+
+def sync_flagged_posts(total_posts, words_per_call=32):
+    """Pull on-chain flagged bits as well, covering flags older than the synced PostFlagged logs"""
+    if not post_reader or total_posts <= 0:
+        return 0
+    span = 256 * words_per_call
+    found = 0
+    try:
+        for start_id in range(1, total_posts + 1, span):
+            flagged = post_reader.read_flagged(start_id, min(span, total_posts - start_id + 1), fallback=False)
+            if flagged is None:
+                return 0  # Older SocialPosts without getPostsFlagged
+            for post_id in flagged:
+                if governance_index and governance_index.is_unflagged(post_id):
+                    continue  # Still flagged on-chain, but overturned by an appeal
+                if post_id not in flagged_posts_cache:
+                    decision_cache.mark_flagged(post_id)
+                    if post_store:
+                        post_store.set_flagged(post_id, True)
+                    found += 1
+    except Exception as e:
+        print(f"Warning: Could not sync flagged posts: {e}")
+    if found:
+        print(f"🚩 Synced {found} posts flagged on-chain into the decision cache")
+    return found
+
+def confirmed_total_posts(social_contract):
+    """totalPosts as of FLAG_CONFIRMATIONS blocks behind the head, so only settled posts are decided on"""
+    if FLAG_CONFIRMATIONS <= 0:
+        return social_contract.functions.totalPosts().call()
+    confirmed_block = max(w3.eth.block_number - FLAG_CONFIRMATIONS, 0)
+    return social_contract.functions.totalPosts().call(block_identifier=confirmed_block)
 
 def monitoring_loop():
     """Background monitoring loop"""
     global monitoring_active, last_checked_post_id, agent_stats
     
     # Initialize last_checked_post_id to current total on first run
+    if flag_sync:
+        # Catch up on PostFlagged logs before deciding on (and flagging) anything
+        try:
+            synced = flag_sync.sync()
+            print(f"🚩 Flag sync at block {flag_sync.synced_block}: {synced} PostFlagged events, {len(flagged_posts_cache)} posts flagged")
+        except Exception as e:
+            print(f"Warning: Could not sync PostFlagged logs: {e}")
+    
     social_contract = contracts.get('social')
     if last_checked_post_id == 0 and social_contract:
         try:
-            current_total = social_contract.functions.totalPosts().call()
+            current_total = confirmed_total_posts(social_contract)
             last_checked_post_id = current_total
             print(f"🔄 Starting monitoring from post {current_total + 1} (skipping existing {current_total} posts)")
+            store_start = post_store.max_id() + 1 if post_store else current_total + 1
+            threading.Thread(
+                target=backfill_post_store, args=(store_start, current_total),
+                name="post-backfill", daemon=True
+            ).start()
         except Exception as e:
             print(f"Could not get initial post count: {e}")
     
@@ -486,43 +910,97 @@ def monitoring_loop():
                 time.sleep(30)
                 continue
                 
-            total_posts = social_contract.functions.totalPosts().call()
+            total_posts = confirmed_total_posts(social_contract)
             agent_stats["last_check"] = time.time()
             
+            if event_poller:
+                try:
+                    event_poller.poll()
+                except Exception as e:
+                    log.error("Error polling contract events", extra={"error": str(e)})
+                if governance_index and governance_index.seeded_block is None and event_poller.last_block is not None:
+                    try:
+                        governance_index.seed(event_poller.last_block)
+                    except Exception as e:
+                        print(f"Warning: Could not seed governance index: {e}")
+            if flag_sync:
+                try:
+                    flag_sync.sync()
+                except Exception as e:
+                    log.error("Error syncing PostFlagged logs", extra={"error": str(e)})
+            feed_index.refresh()
+            check_signer_balances()
+            
             if total_posts > last_checked_post_id:
-                new_posts_count = total_posts - last_checked_post_id
-                print(f"\n🆕 NEW POSTS DETECTED!")
-                print(f"   📊 Found {new_posts_count} new post(s)")
-                print(f"   🔄 Processing posts {last_checked_post_id + 1} to {total_posts}")
-                print(f"   ⏰ Check time: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())}")
+                log.info("New posts detected", extra={"first_post_id": last_checked_post_id + 1, "last_post_id": total_posts})
                 
-                for post_id in range(last_checked_post_id + 1, total_posts + 1):
+                fetched_posts = []
+                for page, read_start, read_end in timed_iter(post_reader.iter_pages(last_checked_post_id + 1, total_posts)):
                     if not monitoring_active:
                         break
+                    for post in page:
+                        post_id = post[0]
+                        if post_id in decision_cache.scored:
+                            # Already decided on (e.g. before a restart); don't score it twice
+                            continue
                         
-                    try:
-                        post = social.functions.getPost(post_id).call()
-                        print(f"\n📥 FETCHED POST #{post_id} FROM BLOCKCHAIN")
-                        handle_post(post[0], post[1], post[2])  # id, author, content
-                    except Exception as e:
-                        print(f"\n❌ ERROR FETCHING POST #{post_id}")
-                        print(f"   🚨 Error: {e}")
-                        print(f"{'='*60}")
+                        try:
+                            tracer.record(post_id, "fetch", read_start, read_end, page_size=len(page))
+                            fetched_posts.append(post)
+                            with tracer.span(post_id, "ingest"):
+                                feed_index.upsert_post(post[0], post[1], post[3], post[4], post[5], post[6], content=post[2])
+                                if post_store:
+                                    post_store.upsert_posts([post])
+                            with tracer.span(post_id, "decide") as span:
+                                result = handle_post(post[0], post[1], post[2])  # id, author, content
+                                span["outcome"] = "queued" if result.get("queued") else "error" if "error" in result else "safe"
+                        except Exception as e:
+                            log.error("Error processing post", extra={"post_id": post_id, "error": str(e)})
                 
                 last_checked_post_id = total_posts
-                print(f"\n✅ MONITORING UPDATE: Now watching for posts after #{total_posts}")
+                index_posts_for_feed(fetched_posts)
+                try:
+                    decision_cache.save_if_dirty()
+                except Exception as e:
+                    log.warning("Could not snapshot decision cache", extra={"error": str(e)})
+                log.info("Monitoring caught up", extra={"last_post_id": total_posts})
             else:
                 # No new posts, just update last check time
-                current_time = time.strftime('%H:%M:%S', time.gmtime())
-                print(f"🔍 [{current_time}] Monitoring active - No new posts (total: {total_posts})")
-                pass
+                log.debug("No new posts", extra={"total_posts": total_posts})
+                
+                # Quiet period: nothing new to score and no transactions waiting, pay out rewards
+                outbox_counts = tx_outbox.counts()
+                if not any(outbox_counts.get(status) for status in ("pending", "signed", "sent")):
+                    try:
+                        distribute_rewards()
+                    except Exception as e:
+                        log.warning("Could not distribute rewards", extra={"error": str(e)})
             
         except Exception as e:
-            print(f"Error in monitoring loop: {e}")
+            log.error("Error in monitoring loop", extra={"error": str(e)})
         
-        time.sleep(15)  # Check every 15 seconds
+        time.sleep(MONITOR_INTERVAL)
 
 # Flask Routes
+@app.after_request
+def gzip_response(response):
+    """Gzip larger JSON responses for clients that accept it"""
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Content-Length'] = str(len(response.get_data()))
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def home():
     """Health check endpoint"""
@@ -537,9 +1015,12 @@ def home():
 
 @app.route('/health')
 def health():
-    """Detailed health check"""
+    """Detailed health check (liveness; readiness is reported separately)"""
     return jsonify({
         "status": "healthy",
+        "live": True,
+        "ready": startup_state["ready"],
+        "startup": startup_state,
         "web3_connected": w3 is not None,
         "contracts": {
             "social": contracts.get('social') is not None,
@@ -557,6 +1038,16 @@ def health():
         "stats": agent_stats
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness check: 503 until the background startup probes have finished"""
+    body = {
+        "ready": startup_state["ready"],
+        "uptime_seconds": round(time.time() - startup_state["started_at"], 2),
+        "probes": startup_state["probes"]
+    }
+    return jsonify(body), (200 if startup_state["ready"] else 503)
+
 @app.route('/diagnostics')
 def diagnostics():
     """Return all key config/env values for debugging"""
@@ -607,7 +1098,7 @@ def start_monitoring():
     print(f"{'='*60}")
     
     # Start monitoring in background thread
-    monitor_thread = threading.Thread(target=monitoring_loop, daemon=True)
+    monitor_thread = threading.Thread(target=monitoring_loop, name="monitor", daemon=True)
     monitor_thread.start()
     
     return jsonify({"message": "Monitoring started", "status": "running"})
@@ -629,6 +1120,28 @@ def get_stats():
         **agent_stats,
         "last_checked_post_id": last_checked_post_id,
         "flagged_posts_cache_size": len(flagged_posts_cache),
+        "decision_cache": decision_cache.stats(),
+        "flag_sync": flag_sync.snapshot() if flag_sync else None,
+        "event_cursor": event_poller.cursor.snapshot() if event_poller else None,
+        "governance": governance_index.snapshot() if governance_index else None,
+        "tracing": tracer.snapshot(),
+        "profiler": profiler.snapshot(),
+        "logging": log_stats(),
+        "incentives": incentive_mirror.snapshot() if incentive_mirror else None,
+        "appeal_scheduler": {
+            **appeal_scheduler.stats,
+            "pending": appeal_scheduler.pending(),
+            "next_deadline": appeal_scheduler.next_deadline()
+        } if appeal_scheduler else None,
+        "reputation_sim": reputation_sim.stats if reputation_sim else None,
+        "tx_outbox": {**tx_outbox.counts(), **outbox_sender.stats},
+        "gas": gas_strategy.snapshot() if gas_strategy else None,
+        "signers": signer_pool.stats(),
+        "post_reader": post_reader.stats if post_reader else None,
+        "reputation_scheduler": {
+            **reputation_scheduler.stats, "pending": reputation_scheduler.pending()
+        } if reputation_scheduler else None,
+        "post_store": post_store.stats() if post_store else None,
         "contracts_available": {
             "social": contracts.get('social') is not None,
             "moderator": contracts.get('moderator') is not None,
@@ -640,10 +1153,13 @@ def get_stats():
 
 @app.route('/reset-cache', methods=['POST'])
 def reset_cache():
-    """Reset the flagged posts cache"""
-    global flagged_posts_cache
+    """Reset the flagged/scored post caches"""
     old_size = len(flagged_posts_cache)
-    flagged_posts_cache.clear()
+    decision_cache.clear()
+    try:
+        decision_cache.save()
+    except Exception as e:
+        print(f"Warning: Could not persist cleared decision cache: {e}")
     return jsonify({
         "message": f"Cache cleared ({old_size} entries removed)",
         "cache_size": len(flagged_posts_cache)
@@ -703,43 +1219,264 @@ def moderate_text():
 @app.route('/reputation/<address>')
 def get_reputation(address):
     """Get reputation for a specific address"""
-    if not contracts.get('reputation'):
+    if not reputation_cache:
         return jsonify({"error": "Reputation system not available"}), 400
+    if not Web3.is_address(address):
+        return jsonify({"error": f"Invalid address: {address}"}), 400
     
     try:
-        reputation_data = contracts['reputation'].functions.getUserReputation(address).call()
-        current_score = contracts['reputation'].functions.getReputationScore(address).call()
-        tier = contracts['reputation'].functions.getUserTier(address).call()
-        
+        result = reputation_cache.get(address)
+        return jsonify({**result, "address": address})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/reputation/bulk', methods=['POST'])
+def get_reputation_bulk():
+    """Get reputation for many addresses with one batched read"""
+    if not reputation_cache:
+        return jsonify({"error": "Reputation system not available"}), 400
+    
+    data = request.get_json(silent=True) or {}
+    addresses = data.get('addresses')
+    if not isinstance(addresses, list) or not addresses:
+        return jsonify({"error": "Missing 'addresses' list"}), 400
+    if len(addresses) > MAX_BULK_ADDRESSES:
+        return jsonify({"error": f"At most {MAX_BULK_ADDRESSES} addresses per request"}), 400
+    invalid = [a for a in addresses if not isinstance(a, str) or not Web3.is_address(a)]
+    if invalid:
+        return jsonify({"error": "Invalid addresses", "invalid": invalid[:10]}), 400
+    
+    try:
+        results = reputation_cache.get_many(addresses)
         return jsonify({
-            "address": address,
-            "current_score": current_score,
-            "tier": tier,
-            "reputation_data": {
-                "score": reputation_data[0],
-                "totalPosts": reputation_data[1],
-                "safePosts": reputation_data[2],
-                "flaggedPosts": reputation_data[3],
-                "lastUpdated": reputation_data[4],
-                "tier": reputation_data[5]
-            }
+            "reputations": results,
+            "count": len(results),
+            "cache": reputation_cache.stats
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/rewards/eligible', methods=['GET', 'POST'])
+def get_rewards_eligible():
+    """Reward eligibility for many addresses, evaluated from the local incentive mirror"""
+    if not incentive_mirror:
+        return jsonify({"error": "Incentive system not available"}), 400
+    
+    if request.method == 'POST':
+        addresses = (request.get_json(silent=True) or {}).get('addresses')
+    else:
+        addresses = [a for a in request.args.get('addresses', '').split(',') if a]
+    if not isinstance(addresses, list) or not addresses:
+        return jsonify({"error": "Missing 'addresses' list"}), 400
+    if len(addresses) > MAX_BULK_ADDRESSES:
+        return jsonify({"error": f"At most {MAX_BULK_ADDRESSES} addresses per request"}), 400
+    invalid = [a for a in addresses if not isinstance(a, str) or not Web3.is_address(a)]
+    if invalid:
+        return jsonify({"error": "Invalid addresses", "invalid": invalid[:10]}), 400
+    
+    try:
+        results = incentive_mirror.evaluate_many(addresses)
+        return jsonify({
+            "rewards": results,
+            "eligible": [address for address, result in results.items() if result["eligible"]],
+            "count": len(results)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/feed')
+def get_feed():
+    """Get a page of the server-side ranked feed"""
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), MAX_FEED_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "Invalid 'limit'"}), 400
+    
+    try:
+        posts, next_cursor = feed_index.page(limit=limit, cursor=request.args.get('cursor'))
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid 'cursor'"}), 400
+    
+    return jsonify({
+        "posts": posts,
+        "next_cursor": next_cursor,
+        "feed": feed_index.stats()
+    })
+
+def _posts_page(**filters):
+    """Shared cursor pagination for the post mirror endpoints"""
+    if not post_store:
+        return jsonify({"error": "Post store not available"}), 503
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_POSTS_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        before_id = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "Invalid 'limit' or 'cursor'"}), 400
+    
+    posts = post_store.list_posts(limit=limit, before_id=before_id, **filters)
+    return jsonify({
+        "posts": posts,
+        "next_cursor": str(posts[-1]["id"]) if len(posts) == limit else None
+    })
+
+@app.route('/posts')
+def list_posts():
+    """List mirrored posts, newest first (filters: flagged, since, until)"""
+    filters = {}
+    flagged = request.args.get('flagged')
+    if flagged is not None:
+        filters['flagged'] = flagged.lower() in ('1', 'true', 'yes')
+    try:
+        for name in ('since', 'until'):
+            if request.args.get(name):
+                filters[name] = int(request.args[name])
+    except ValueError:
+        return jsonify({"error": "'since' and 'until' must be unix timestamps"}), 400
+    return _posts_page(**filters)
+
+@app.route('/posts/<int:post_id>')
+def get_post(post_id):
+    """Get a single mirrored post"""
+    if not post_store:
+        return jsonify({"error": "Post store not available"}), 503
+    post = post_store.get(post_id)
+    if not post:
+        return jsonify({"error": f"Post {post_id} not found"}), 404
+    return jsonify(post)
+
+@app.route('/users/<address>/posts')
+def list_user_posts(address):
+    """List a user's mirrored posts, newest first"""
+    if not Web3.is_address(address):
+        return jsonify({"error": f"Invalid address: {address}"}), 400
+    return _posts_page(author=Web3.to_checksum_address(address))
+
+@app.route('/search')
+def search_posts():
+    """Full-text search over mirrored posts (FTS5 syntax: "phrase", prefix*, AND/OR/NOT)"""
+    if not post_store or not post_store.search_available:
+        return jsonify({"error": "Post search not available"}), 503
+    
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({"error": "Missing 'q' parameter"}), 400
+    sort = request.args.get('sort', 'recent')
+    if sort not in ('recent', 'relevance'):
+        return jsonify({"error": "'sort' must be 'recent' or 'relevance'"}), 400
+    
+    filters = {}
+    author = request.args.get('author')
+    if author:
+        if not Web3.is_address(author):
+            return jsonify({"error": f"Invalid address: {author}"}), 400
+        filters['author'] = Web3.to_checksum_address(author)
+    flagged = request.args.get('flagged')
+    if flagged is not None:
+        filters['flagged'] = flagged.lower() in ('1', 'true', 'yes')
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), MAX_SEARCH_RESULTS)
+        for name in ('min_score', 'max_score'):
+            if request.args.get(name):
+                filters[name] = int(request.args[name])
+    except ValueError:
+        return jsonify({"error": "'limit', 'min_score' and 'max_score' must be integers"}), 400
+    
+    started = time.perf_counter()
+    try:
+        results, next_cursor = post_store.search(
+            query, limit=limit, sort=sort, cursor=request.args.get('cursor'), **filters
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "query": query,
+        "results": results,
+        "next_cursor": next_cursor,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+
 @app.route('/governance/appeals')
 def get_appeals():
-    """Get active appeals"""
-    if not contracts.get('governance'):
+    """Appeals with live vote tallies, served from the event-fed governance index"""
+    if not governance_index:
         return jsonify({"error": "Governance system not available"}), 400
     
-    # This would need to be implemented based on the governance contract's event logs
-    # For now, return a placeholder
+    status = request.args.get('status')  # active, awaiting_resolution, upheld, rejected
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), MAX_APPEALS_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    
+    appeals = governance_index.list_appeals(status=status, limit=limit)
     return jsonify({
-        "active_appeals": [],
-        "message": "Governance integration pending contract deployment"
+        "appeals": appeals,
+        "active_appeals": [a for a in appeals if a["status"] == "active"],
+        "counts": governance_index.counts(),
+        "synced_block": event_poller.last_block if event_poller else None,
+        "seeded": governance_index.seeded_block is not None
     })
 
+@app.route('/governance/appeals/<int:appeal_id>')
+def get_appeal(appeal_id):
+    """One appeal with its vote tally"""
+    if not governance_index:
+        return jsonify({"error": "Governance system not available"}), 400
+    appeal = governance_index.get(appeal_id)
+    if appeal is None:
+        return jsonify({"error": "Appeal not found"}), 404
+    return jsonify(appeal)
+
+def _debug_denied():
+    """None if the request may use /debug endpoints, else the error response"""
+    if not DEBUG_TOKEN:
+        return jsonify({"error": "Debug endpoints are disabled (set DEBUG_TOKEN)"}), 404
+    supplied = request.headers.get('X-Debug-Token') or request.args.get('token', '')
+    if not hmac.compare_digest(supplied.encode(), DEBUG_TOKEN.encode()):
+        return jsonify({"error": "Invalid debug token"}), 403
+    return None
+
+@app.route('/debug/traces')
+def list_traces():
+    """Most recently traced posts with time per stage"""
+    denied = _debug_denied()
+    if denied:
+        return denied
+    limit = min(max(request.args.get('limit', 50, type=int), 1), TRACE_BUFFER_POSTS or 1)
+    return jsonify({"traces": tracer.recent(limit), "tracing": tracer.snapshot()})
+
+@app.route('/debug/traces/<int:post_id>')
+def get_trace(post_id):
+    """Every recorded span for one post: fetch, ingest, score, decide, prepare, sign, broadcast, confirm"""
+    denied = _debug_denied()
+    if denied:
+        return denied
+    trace = tracer.get(post_id)
+    if trace is None:
+        return jsonify({"error": "No trace for this post (not sampled, evicted or not seen yet)"}), 404
+    return jsonify(trace)
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Sample every thread's stack for ?seconds=N at ?hz=R; collapsed stacks (or ?format=json)"""
+    denied = _debug_denied()
+    if denied:
+        return denied
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        hz = float(request.args.get('hz', PROFILE_SAMPLE_HZ))
+    except ValueError:
+        return jsonify({"error": "seconds and hz must be numbers"}), 400
+    try:
+        stacks, summary = profiler.profile(seconds, hz)
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    if request.args.get('format') == 'json':
+        return jsonify({**summary, "stacks": dict(stacks.most_common())})
+    headers = {f"X-Profile-{key.replace('_', '-').title()}": str(value) for key, value in summary.items()}
+    return Response(profiler.collapsed(stacks), mimetype="text/plain", headers=headers)
+
 # Removed old Gemini routes - now using toxic-bert exclusively
 
 # --- Monitoring thread startup for all environments (including WSGI/Gunicorn) ---
@@ -747,6 +1484,9 @@ def get_appeals():
 _monitoring_started = False
 try:
     if not _monitoring_started:
+        threading.Thread(target=run_startup_probes, name="startup-probes", daemon=True).start()
+        if w3 and acct and contracts.get("moderator"):
+            outbox_sender.start()  # Also resumes transactions left in flight by a previous run
         print('=== AGENT UNIVERSAL STARTUP ===')
         print(f'w3: {w3}')
         print(f'social: {contracts.get("social")}')
@@ -757,13 +1497,15 @@ try:
         if all([w3, contracts.get("social"), contracts.get("moderator"), acct]):
             monitoring_active = True
             agent_stats["status"] = "running"
-            monitor_thread = threading.Thread(target=monitoring_loop, daemon=True)
+            monitor_thread = threading.Thread(target=monitoring_loop, name="monitor", daemon=True)
             monitor_thread.start()
             print("Auto-started monitoring (universal)")
         else:
             print("Warning: Not all components available, monitoring not auto-started (universal)")
             print(f"Components status: w3={w3 is not None}, social={contracts.get('social') is not None}, moderator={contracts.get('moderator') is not None}, acct={acct is not None}")
         _monitoring_started = True
+        mark_startup_phase("start_threads")
+        print(f"Import finished in {time.perf_counter() - _startup_t0:.2f}s; startup probes running in background")
 except Exception as e:
     print(f'FATAL ERROR in universal monitoring startup: {e}')
     import traceback
@@ -782,7 +1524,7 @@ if __name__ == '__main__':
         if all([w3, contracts.get("social"), contracts.get("moderator"), acct]):
             monitoring_active = True
             agent_stats["status"] = "running"
-            monitor_thread = threading.Thread(target=monitoring_loop, daemon=True)
+            monitor_thread = threading.Thread(target=monitoring_loop, name="monitor", daemon=True)
             monitor_thread.start()
             print("Auto-started monitoring")
         else:
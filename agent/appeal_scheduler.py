@@ -0,0 +1,129 @@
+"""
+Deadline scheduling for governance appeals.
+
+resolveAppeal only succeeds once block.timestamp is past an appeal's
+votingEnds, and nothing on-chain calls it. Appeals from the governance index
+go into a heap keyed by votingEnds; a worker thread sleeps until the earliest
+deadline (plus a small grace period for block time skew), then hands every
+appeal that has come due together to the tx path in one call, so appeals
+expiring in the same block share a resolveAppeals transaction. If handing
+them over fails, they go back into the heap with an exponential backoff.
+"""
+
+import heapq
+import threading
+import time
+
+
+class AppealScheduler:
+    """Heap of (votingEnds, appeal id) drained by a single worker thread"""
+
+    def __init__(self, submit, grace_seconds=15, retry_seconds=30, max_retry_seconds=900):
+        self.submit = submit                  # callable([appeal_id, ...]) - queues the resolve tx(s)
+        self.grace_seconds = grace_seconds
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._failures = {}                   # appeal id -> consecutive failed submits
+        self._heap = []
+        self._scheduled = {}                  # appeal id -> votingEnds currently in the heap
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.stats = {"scheduled": 0, "submitted": 0, "failed": 0, "retried": 0}
+
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="appeal-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def schedule(self, appeal_id, voting_ends):
+        """Resolve appeal_id once voting_ends (unix seconds) has passed"""
+        with self._cond:
+            if self._scheduled.get(appeal_id) == voting_ends:
+                return
+            self._scheduled[appeal_id] = voting_ends
+            heapq.heappush(self._heap, (voting_ends, appeal_id))
+            self.stats["scheduled"] += 1
+            self._cond.notify_all()
+        if not (self._thread and self._thread.is_alive()):
+            self.start()
+
+    def cancel(self, appeal_id):
+        """Drop appeal_id (resolved elsewhere); its heap entry is skipped lazily"""
+        with self._cond:
+            self._scheduled.pop(appeal_id, None)
+            self._failures.pop(appeal_id, None)
+
+    def pending(self):
+        with self._cond:
+            return len(self._scheduled)
+
+    def next_deadline(self):
+        with self._cond:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self):
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        """Pop every appeal whose deadline has passed; return (due ids, seconds until the next one)"""
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap:
+                return due, None
+            voting_ends, appeal_id = self._heap[0]
+            wait = voting_ends + self.grace_seconds - now
+            if wait > 0:
+                return due, wait
+            heapq.heappop(self._heap)
+            del self._scheduled[appeal_id]
+            due.append(appeal_id)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                due, wait = self._pop_due(time.time())
+                if not due:
+                    self._cond.wait(timeout=wait)
+                    continue
+            try:
+                self.submit(due)
+            except Exception as e:
+                self.stats["failed"] += len(due)
+                print(f"⚠️ Could not queue resolution of appeals {due}, retrying: {e}")
+                self._retry_later(due)
+                continue
+            with self._cond:
+                self.stats["submitted"] += len(due)
+                for appeal_id in due:
+                    self._failures.pop(appeal_id, None)
+
+    def _retry_later(self, appeal_ids):
+        """Put appeals whose submit failed back into the heap, due again after a backoff"""
+        now = time.time()
+        with self._cond:
+            for appeal_id in appeal_ids:
+                if appeal_id in self._scheduled:
+                    continue  # Rescheduled while the submit was running
+                failures = self._failures.get(appeal_id, 0) + 1
+                self._failures[appeal_id] = failures
+                delay = min(self.retry_seconds * 2 ** (failures - 1), self.max_retry_seconds)
+                # The heap is keyed by votingEnds; pick one that comes due `delay` from now
+                retry_at = now + delay - self.grace_seconds
+                self._scheduled[appeal_id] = retry_at
+                heapq.heappush(self._heap, (retry_at, appeal_id))
+                self.stats["retried"] += 1
+            self._cond.notify_all()
@@ -4,11 +4,11 @@ Authorize the AI agent in the Moderator contract
 """
 
 import os
-import json
-from pathlib import Path
-from web3 import Web3
 from dotenv import load_dotenv
 
+from agent_client import connect, load_abi
+from signer_pool import parse_private_keys
+
 # Load environment variables
 load_dotenv()
 
@@ -16,25 +16,14 @@ load_dotenv()
 SOMNIA_RPC_URL = os.getenv("SOMNIA_RPC_URL")
 MODERATOR_ADDR = os.getenv("MODERATOR_ADDRESS")
 AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY")
-
-# Load ABI
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-def load_abi(filename):
-    try:
-        with open(ABI_DIR / filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading {filename}: {e}")
-        return None
+AGENT_PRIVATE_KEYS = os.getenv("AGENT_PRIVATE_KEYS", "")  # Extra agent keys for the signer pool
 
 def main():
     print("🔧 Authorizing AI Agent in Moderator Contract...")
     
     # Setup Web3
-    w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL))
-    if not w3.is_connected():
+    w3 = connect(SOMNIA_RPC_URL)
+    if not w3 or not w3.is_connected():
         print("❌ Failed to connect to Somnia network")
         return
     
@@ -44,7 +33,7 @@ def main():
         return
         
     account = w3.eth.account.from_key(bytes.fromhex(AGENT_PRIV))
-    print(f"📋 Agent Address: {account.address}")
+    print(f"📋 Signing Address: {account.address}")
     
     # Load Moderator contract
     moderator_abi = load_abi("Moderator.json")
@@ -54,9 +43,19 @@ def main():
     
     moderator = w3.eth.contract(address=MODERATOR_ADDR, abi=moderator_abi)
     
+    # Every key in the agent's signer pool needs its own authorization
+    agent_addresses = [
+        w3.eth.account.from_key(bytes.fromhex(key)).address
+        for key in parse_private_keys(AGENT_PRIV, AGENT_PRIVATE_KEYS)
+    ]
+    for agent_address in agent_addresses:
+        authorize(w3, moderator, account, agent_address)
+
+def authorize(w3, moderator, account, agent_address):
+    print(f"\n📋 Agent Address: {agent_address}")
     try:
         # Check current authorization status
-        is_authorized = moderator.functions.agents(account.address).call()
+        is_authorized = moderator.functions.agents(agent_address).call()
         print(f"📊 Current authorization status: {is_authorized}")
         
         if is_authorized:
@@ -68,7 +67,7 @@ def main():
         print(f"📋 Contract Owner: {owner}")
         
         if owner.lower() != account.address.lower():
-            print(f"⚠️ Warning: Agent address ({account.address}) is not the contract owner ({owner})")
+            print(f"⚠️ Warning: Signing address ({account.address}) is not the contract owner ({owner})")
             print("Only the contract owner can authorize agents.")
             print("You may need to use the deployer account to authorize this agent.")
             return
@@ -77,7 +76,7 @@ def main():
         print("🔄 Authorizing agent...")
         
         # Build transaction
-        tx = moderator.functions.setAgent(account.address, True).build_transaction({
+        tx = moderator.functions.setAgent(agent_address, True).build_transaction({
             'from': account.address,
             'nonce': w3.eth.get_transaction_count(account.address),
             'gas': 100000,
@@ -97,7 +96,7 @@ def main():
             print("✅ Agent authorized successfully!")
             
             # Verify authorization
-            is_authorized = moderator.functions.agents(account.address).call()
+            is_authorized = moderator.functions.agents(agent_address).call()
             print(f"📊 New authorization status: {is_authorized}")
         else:
             print("❌ Transaction failed")
@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for the moderation agent.
+
+Runs everything locally: an EVM (eth-tester in-process, or any JSON-RPC node
+such as `npx hardhat node` / anvil via --rpc-url) with freshly deployed
+contracts, and a stand-in for the Hugging Face inference endpoint with
+configurable latency and error rate. app.py is imported against them
+unchanged, N synthetic posts are created, and the real monitoring_loop /
+handle_post path scores and flags them. Reports posts/sec, detection and flag
+latency percentiles, agent RPC calls per post and gas used, and writes the
+result as JSON so runs can be compared (--baseline).
+
+Usage:
+    python benchmark.py --posts 200 --toxic-ratio 0.3 --hf-latency-ms 80
+    python benchmark.py --posts 200 --env FLAG_BATCH_SIZE=10 --baseline data/benchmarks/bench-old.json
+
+eth-tester is a dev-only dependency: pip install "web3[tester]".
+Contracts are deployed from contracts/contracts as compiled by Hardhat
+(contracts/artifacts after `npx hardhat compile`, or --artifacts DIR). When
+those artifacts are missing or older than their sources, the harness compiles
+the sources itself with py-solc-x (pip install py-solc-x; needs `npm install`
+in contracts/ for OpenZeppelin). If neither works the run stops: the ABI-only
+app/contracts/abis can't be deployed.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from web3 import Web3
+from eth_account import Account
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CONTRACTS_DIR = REPO_ROOT / "contracts"
+HARDHAT_ARTIFACTS = CONTRACTS_DIR / "artifacts" / "contracts"
+SOLC_VERSION = "0.8.20"  # Same compiler and optimizer settings as contracts/hardhat.config.js
+SOLC_OPTIMIZE_RUNS = 200
+CONTRACT_SOURCES = {"SOLToken": "IncentiveSystem.sol"}  # Contracts not in a file of their own name
+DEPLOYED_CONTRACTS = ["SocialPosts", "Moderator", "ReputationSystem", "SOLToken", "IncentiveSystem", "GovernanceSystem"]
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent / "data" / "benchmarks"
+
+SAFE_WORDS = ["sunset", "coffee", "weekend", "garden", "music", "coding", "hiking", "recipe", "podcast", "sketch"]
+TOXIC_WORDS = ["idiot", "hate", "stupid", "loser", "pathetic"]
+
+
+# --- local chain ------------------------------------------------------------------
+
+def _to_json_rpc(value):
+    """web3-formatted result -> JSON-RPC wire format (quantities back to hex)"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return Web3.to_hex(value)
+    if isinstance(value, Mapping):
+        return {key: _to_json_rpc(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_rpc(item) for item in value]
+    return value
+
+
+class RpcServer:
+    """
+    JSON-RPC over HTTP that counts the agent's calls per method; backed by
+    eth-tester or an upstream node. The benchmark's own traffic goes to
+    /driver, which is served the same way but not counted.
+    """
+
+    def __init__(self, upstream_url=None):
+        self.upstream_url = upstream_url
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        if upstream_url:
+            self._session = requests.Session()
+        else:
+            try:
+                from web3 import EthereumTesterProvider
+                self._tester = Web3(EthereumTesterProvider())
+            except Exception as e:
+                raise SystemExit(f"eth-tester is not available ({e}); pip install 'web3[tester]' or pass --rpc-url")
+        self._server = None
+        self.url = None
+        self.w3 = None  # Driver connection, available after start()
+
+    def _dispatch(self, request, counted=True):
+        method = request.get("method")
+        if counted:
+            with self._lock:
+                self.calls[method] += 1
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if self.upstream_url:
+            return self._session.post(self.upstream_url, json=request, timeout=30).json()
+        try:
+            with self._lock:  # eth-tester is not thread safe
+                result = self._tester.manager.request_blocking(method, request.get("params") or [])
+            response["result"] = _to_json_rpc(result)
+        except Exception as e:
+            message = str(e)
+            if "revert" in message.lower() and "execution reverted" not in message:
+                message = f"execution reverted: {message}"
+            response["error"] = {"code": 3 if "revert" in message.lower() else -32000, "message": message}
+        return response
+
+    def start(self):
+        rpc = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                counted = self.path != "/driver"
+                if isinstance(body, list):
+                    result = [rpc._dispatch(item, counted) for item in body]
+                else:
+                    result = rpc._dispatch(body, counted)
+                payload = json.dumps(result).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="bench-rpc", daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.w3 = Web3(Web3.HTTPProvider(f"{self.url}/driver"))
+        return self.url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+# --- stand-in inference endpoint -------------------------------------------------
+
+class FakeInferenceServer:
+    """Answers like the HF toxic-bert endpoint after a configurable delay, failing at error_rate"""
+
+    def __init__(self, latency_ms=50, jitter_ms=10, error_rate=0.0, seed=0, scores=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.scores = scores or {}  # content -> recorded toxic score (0-1), e.g. from a replayed export
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "latency_ms": []}
+        self._server = None
+
+    def classify(self, text):
+        score = self.scores.get(text)
+        if score is None:
+            score = 0.91 if any(word in text.lower() for word in TOXIC_WORDS) else 0.02
+        return [[
+            {"label": "toxic", "score": score},
+            {"label": "insult", "score": score / 2},
+            {"label": "obscene", "score": 0.01}
+        ]]
+
+    def _respond(self, body):
+        with self._lock:
+            delay = max(self._random.gauss(self.latency_ms, self.jitter_ms), 0) / 1000
+            failed = self._random.random() < self.error_rate
+            self.stats["requests"] += 1
+            self.stats["latency_ms"].append(delay * 1000)
+            if failed:
+                self.stats["errors"] += 1
+        time.sleep(delay)
+        if failed:
+            return 503, {"error": "Model unitary/toxic-bert is currently loading", "estimated_time": 20.0}
+        return 200, self.classify(body.get("inputs", ""))
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, result = server._respond(body)
+                payload = json.dumps(result).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="bench-hf", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/models/unitary/toxic-bert"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+# --- deployment -------------------------------------------------------------------
+
+def contract_source(name):
+    return CONTRACTS_DIR / "contracts" / CONTRACT_SOURCES.get(name, f"{name}.sol")
+
+
+def hardhat_artifacts(directory, names):
+    """{name: (abi, bytecode)} from a Hardhat artifacts dir, or None if any is missing or older than its source"""
+    artifacts = {}
+    for name in names:
+        source = contract_source(name)
+        path = Path(directory) / source.name / f"{name}.json"
+        if not path.exists() or path.stat().st_mtime < source.stat().st_mtime:
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not data.get("bytecode") or data["bytecode"] == "0x":
+            return None
+        artifacts[name] = (data["abi"], data["bytecode"])
+    return artifacts
+
+
+def solcx_artifacts(names):
+    """{name: (abi, bytecode)} compiled from contracts/contracts with py-solc-x, or None if it isn't installed"""
+    try:
+        import solcx
+    except ImportError:
+        return None
+    openzeppelin = CONTRACTS_DIR / "node_modules" / "@openzeppelin"
+    if not openzeppelin.exists():
+        raise RuntimeError(f"{openzeppelin} not found; run `npm install` in {CONTRACTS_DIR}")
+    solcx.install_solc(SOLC_VERSION)
+    sources = sorted({str(contract_source(name)) for name in names})
+    output = solcx.compile_files(
+        sources, output_values=["abi", "bin"], solc_version=SOLC_VERSION,
+        import_remappings={"@openzeppelin/": f"{openzeppelin}/"}, allow_paths=[str(CONTRACTS_DIR)],
+        optimize=True, optimize_runs=SOLC_OPTIMIZE_RUNS
+    )
+    compiled = {key.rsplit(":", 1)[1]: value for key, value in output.items()}
+    return {name: (compiled[name]["abi"], "0x" + compiled[name]["bin"]) for name in names}
+
+
+def load_artifacts(artifacts_dir=HARDHAT_ARTIFACTS, names=DEPLOYED_CONTRACTS):
+    """Deployable (abi, bytecode) per contract, built from the current sources; raises if there are none"""
+    artifacts = hardhat_artifacts(artifacts_dir, names) or solcx_artifacts(names)
+    if artifacts is None:
+        raise RuntimeError(
+            f"No up-to-date compiled contracts in {artifacts_dir}: run `npx hardhat compile` in {CONTRACTS_DIR} "
+            "or pip install py-solc-x so the benchmark can compile them"
+        )
+    return artifacts
+
+
+def deploy_contracts(w3, deployer, agent_address, artifacts):
+    """Deploy and wire the contract suite from load_artifacts() output; returns {name: contract}"""
+
+    def transact(fn):
+        receipt = w3.eth.wait_for_transaction_receipt(fn.transact({"from": deployer}))
+        if receipt.status != 1:
+            raise RuntimeError(f"Deployment transaction failed: {fn}")
+        return receipt
+
+    def deploy(name, *args):
+        abi, bytecode = artifacts[name]
+        receipt = transact(w3.eth.contract(abi=abi, bytecode=bytecode).constructor(*args))
+        return w3.eth.contract(address=receipt.contractAddress, abi=abi)
+
+    deployed = {}
+    deployed["social"] = deploy("SocialPosts", deployer)
+    deployed["moderator"] = deploy("Moderator", deployed["social"].address, deployer)
+    transact(deployed["social"].functions.setModerator(deployed["moderator"].address))
+    transact(deployed["moderator"].functions.setAgent(agent_address, True))
+    deployed["reputation"] = deploy("ReputationSystem", deployed["social"].address)
+    token = deploy("SOLToken")
+    deployed["incentive"] = deploy("IncentiveSystem", token.address, deployed["reputation"].address, deployed["social"].address)
+    transact(token.functions.transferOwnership(deployed["incentive"].address))
+    transact(deployed["incentive"].functions.setDistributor(agent_address, True))
+    deployed["governance"] = deploy("GovernanceSystem", deployed["reputation"].address, deployed["social"].address)
+    return deployed
+
+
+# --- measurements -----------------------------------------------------------------
+
+def percentiles(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(p):
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": rank(50), "p90": rank(90), "p95": rank(95), "p99": rank(99),
+        "max": round(ordered[-1], 2)
+    }
+
+
+def gas_report(w3, first_block, last_block, senders, contracts):
+    """gasUsed of every agent transaction in the block range, by contract function"""
+    selectors = {}
+    for name, contract in contracts.items():
+        if contract is None:
+            continue
+        for fn in contract.all_functions():
+            selectors[Web3.to_hex(Web3.keccak(text=fn.signature))[:10]] = f"{name}.{fn.fn_name}"
+    senders = {address.lower() for address in senders}
+    by_function, total, count = Counter(), 0, 0
+    for number in range(first_block, last_block + 1):
+        block = w3.eth.get_block(number, full_transactions=True)
+        for tx in block["transactions"]:
+            if tx["from"].lower() not in senders:
+                continue
+            receipt = w3.eth.get_transaction_receipt(tx["hash"])
+            data = tx.get("input", tx.get("data", b""))
+            data = data if isinstance(data, str) else Web3.to_hex(data)
+            by_function[selectors.get(data[:10], data[:10] or "transfer")] += receipt["gasUsed"]
+            total += receipt["gasUsed"]
+            count += 1
+    return {"total": total, "transactions": count, "by_function": dict(by_function.most_common())}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def synthetic_posts(count, toxic_ratio, seed):
+    rng = random.Random(seed)
+    posts = []
+    for index in range(count):
+        words = rng.sample(SAFE_WORDS, 4)
+        if rng.random() < toxic_ratio:
+            words.insert(rng.randrange(len(words)), rng.choice(TOXIC_WORDS))
+        posts.append(f"post {index}: " + " ".join(words))
+    return posts
+
+
+def span_overhead(iterations=20000):
+    """Cost of one tracer.span() around an empty block, sampled / unsampled / tracing off (ns)"""
+    from tracing import Tracer
+
+    def measure(tracer):
+        started = time.perf_counter_ns()
+        for index in range(iterations):
+            with tracer.span(index, "bench"):
+                pass
+        return round((time.perf_counter_ns() - started) / iterations)
+
+    baseline_started = time.perf_counter_ns()
+    for index in range(iterations):
+        with contextlib.nullcontext():
+            pass
+    baseline = (time.perf_counter_ns() - baseline_started) / iterations
+    return {
+        "sampled_ns": measure(Tracer(capacity=1000, sample_rate=1.0)),
+        "unsampled_ns": measure(Tracer(capacity=1000, sample_rate=0.0001)),
+        "disabled_ns": measure(Tracer(capacity=0)),
+        "empty_block_ns": round(baseline)
+    }
+
+
+def trace_report(tracer, post_ids):
+    """Per-stage latency percentiles over the traced posts"""
+    stages = {}
+    traced = 0
+    for post_id in post_ids:
+        trace = tracer.get(post_id)
+        if trace is None:
+            continue
+        traced += 1
+        for stage, ms in trace["stages_ms"].items():
+            stages.setdefault(stage, []).append(ms)
+    return {
+        "sample_rate": tracer.sample_rate,
+        "traced_posts": traced,
+        "stages_ms": {stage: percentiles(values) for stage, values in stages.items()},
+        "span_overhead": span_overhead()
+    }
+
+
+def compare(result, baseline):
+    """Print key metrics next to a previous run"""
+    def pick(report, path):
+        for key in path:
+            report = report.get(key) if isinstance(report, dict) else None
+        return report
+
+    metrics = [
+        ("posts/sec", ("throughput", "posts_per_sec")),
+        ("detection p50 ms", ("latency_ms", "detection", "p50")),
+        ("detection p95 ms", ("latency_ms", "detection", "p95")),
+        ("flag p95 ms", ("latency_ms", "flag", "p95")),
+        ("RPC calls/post", ("rpc", "per_post")),
+        ("gas/post", ("gas", "per_post")),
+        ("sampled span ns", ("tracing", "span_overhead", "sampled_ns"))
+    ]
+    print(f"\n{'metric':<20}{'baseline':>14}{'current':>14}{'change':>10}")
+    for label, path in metrics:
+        old, new = pick(baseline, path), pick(result, path)
+        change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "-"
+        print(f"{label:<20}{str(old):>14}{str(new):>14}{change:>10}")
+
+
+# --- run --------------------------------------------------------------------------
+
+class LocalStack:
+    """
+    Local chain, stand-in inference endpoint, deployed contracts and the
+    imported agent, with decision and flag times recorded per post id.
+    Shared by this benchmark and replay.py.
+    """
+
+    def __init__(self, rpc_url=None, hf_latency_ms=50, hf_jitter_ms=10, hf_error_rate=0.0, seed=1,
+                 poll_interval=1.0, env=(), verbose=False, scores=None, artifacts_dir=HARDHAT_ARTIFACTS):
+        # Compile (or fail) before any server starts
+        self.artifacts = load_artifacts(artifacts_dir)
+        self.rpc = RpcServer(rpc_url)
+        self.hf = FakeInferenceServer(hf_latency_ms, hf_jitter_ms, hf_error_rate, seed, scores=scores)
+        self.backend = rpc_url or "eth-tester"
+        self.poll_interval = poll_interval
+        self.env = list(env)
+        self.verbose = verbose
+        self.decided, self.flag_applied, self.created = {}, {}, {}
+        self.outcomes = {}  # post id -> handle_post result
+        self._authors, self._nonces = {}, {}
+        self._redirect = self._log = None
+
+    def start(self):
+        rpc_url = self.rpc.start()
+        hf_url = self.hf.start()
+        chain = self.chain = self.rpc.w3
+        self.deployer = chain.eth.accounts[0]
+        self.gas_price = chain.eth.gas_price
+        agent = Account.create()
+        self.fund(agent.address)
+        self.deployed = deploy_contracts(chain, self.deployer, agent.address, self.artifacts)
+
+        self.data_dir = tempfile.mkdtemp(prefix="agent-bench-")
+        env = {
+            "SOMNIA_RPC_URL": rpc_url,
+            "CHAIN_ID": str(chain.eth.chain_id),
+            "AGENT_PRIVATE_KEY": agent.key.hex().removeprefix("0x"),
+            "SOCIAL_POSTS_ADDRESS": self.deployed["social"].address,
+            "MODERATOR_ADDRESS": self.deployed["moderator"].address,
+            "REPUTATION_SYSTEM_ADDRESS": self.deployed["reputation"].address,
+            "INCENTIVE_SYSTEM_ADDRESS": self.deployed["incentive"].address,
+            "GOVERNANCE_SYSTEM_ADDRESS": self.deployed["governance"].address,
+            "HF_TOKEN": "benchmark",
+            "HF_API_URL": hf_url,
+            "AGENT_DATA_DIR": self.data_dir,
+            "MONITOR_INTERVAL": str(self.poll_interval),
+            "FLAG_BATCH_WAIT": "1",
+            "TOXICITY_THRESHOLD_BP": "2500"
+        }
+        for item in self.env:
+            key, _, value = item.partition("=")
+            env[key] = value
+        os.environ.update(env)
+        self.threshold_bp = int(env["TOXICITY_THRESHOLD_BP"])
+
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        self.log_path = Path(self.data_dir) / "agent.log"
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        self._redirect = contextlib.redirect_stdout(sys.stdout if self.verbose else self._log)
+        self._redirect.__enter__()
+        import app as agent_app
+        self.app = agent_app
+
+        handle_post, apply_flag = agent_app.handle_post, agent_app.apply_flag
+
+        def timed_handle_post(post_id, author, content):
+            result = handle_post(post_id, author, content)
+            self.decided[post_id] = time.perf_counter()
+            self.outcomes[post_id] = result
+            return result
+
+        def timed_apply_flag(post_id, author, block_number):
+            apply_flag(post_id, author, block_number)
+            self.flag_applied[post_id] = time.perf_counter()
+
+        agent_app.handle_post = timed_handle_post
+        agent_app.apply_flag = timed_apply_flag
+
+        deadline = time.time() + 60
+        while not agent_app.startup_state["ready"] and time.time() < deadline:
+            time.sleep(0.1)
+        time.sleep(self.poll_interval * 2)  # Let the monitoring loop take its starting position
+        self.first_block = chain.eth.block_number + 1
+        self.calls_before = Counter(self.rpc.calls)
+        return self
+
+    def fund(self, address, ether=100):
+        self.chain.eth.wait_for_transaction_receipt(self.chain.eth.send_transaction({
+            "from": self.deployer, "to": address, "value": Web3.to_wei(ether, "ether")
+        }))
+
+    def author(self, label):
+        """A funded local key standing in for author `label` (same label, same key)"""
+        if label not in self._authors:
+            account = Account.create()
+            self.fund(account.address, 10)
+            self._authors[label] = account
+            self._nonces[label] = 0
+        return self._authors[label]
+
+    def create_post(self, label, content):
+        """createPost as author `label`; returns the new post id once mined"""
+        account = self.author(label)
+        tx = self.deployed["social"].functions.createPost(content).build_transaction({
+            "from": account.address, "nonce": self._nonces[label], "gas": 500000,
+            "gasPrice": self.gas_price, "chainId": self.chain.eth.chain_id
+        })
+        self._nonces[label] += 1
+        signed = account.sign_transaction(tx)
+        receipt = self.chain.eth.wait_for_transaction_receipt(
+            self.chain.eth.send_raw_transaction(getattr(signed, "raw_transaction", None) or signed.rawTransaction)
+        )
+        if receipt.status != 1:
+            raise RuntimeError(f"createPost failed for {label}")
+        event = self.deployed["social"].events.PostCreated().process_receipt(receipt)[0]
+        post_id = event["args"]["id"]
+        self.created[post_id] = time.perf_counter()
+        return post_id
+
+    def backlog(self):
+        """(posts created but not decided yet, outbox transactions not confirmed yet)"""
+        counts = self.app.tx_outbox.counts()
+        return len(self.created) - len(self.decided), sum(counts.get(status, 0) for status in ("pending", "signed", "sent"))
+
+    def wait_idle(self, expected_flags, timeout):
+        """Wait for every created post to be decided and the outbox to drain; False on timeout"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            posts, txs = self.backlog()
+            if posts <= 0 and txs == 0 and len(self.flag_applied) >= expected_flags:
+                return True
+            time.sleep(0.2)
+        return False
+
+    def results(self, started):
+        """Shared report sections for everything created since `started` (perf_counter)"""
+        self.app.monitoring_active = False
+        calls = Counter(self.rpc.calls)
+        calls.subtract(self.calls_before)
+        created, decided, flag_applied = self.created, self.decided, self.flag_applied
+        detection = [(decided[post_id] - created[post_id]) * 1000 for post_id in created if post_id in decided]
+        flag_latency = [(flag_applied[post_id] - created[post_id]) * 1000 for post_id in created if post_id in flag_applied]
+        last_decision = max(decided.values(), default=time.perf_counter())
+        total_calls = sum(count for count in calls.values() if count > 0)
+        agent_addresses = [account.address for account in self.app.agent_accounts]
+        gas = gas_report(self.chain, self.first_block, self.chain.eth.block_number, agent_addresses, self.deployed)
+        gas["per_post"] = round(gas["total"] / len(created)) if created else 0
+        hf_latency = self.hf.stats["latency_ms"]
+        return {
+            "chain": {
+                "backend": self.backend,
+                "multicall3": bool(self.app.multicall and self.app.multicall._available)
+            },
+            "throughput": {
+                "duration_s": round(last_decision - started, 3),
+                "posts_per_sec": round(len(decided) / (last_decision - started), 3) if decided else 0
+            },
+            "latency_ms": {"detection": percentiles(detection), "flag": percentiles(flag_latency)},
+            "rpc": {
+                "total": total_calls,
+                "per_post": round(total_calls / len(created), 2) if created else 0,
+                "by_method": {method: count for method, count in calls.most_common() if count > 0}
+            },
+            "gas": gas,
+            "inference": {
+                "requests": self.hf.stats["requests"], "errors": self.hf.stats["errors"],
+                "mean_latency_ms": round(statistics.fmean(hf_latency), 2) if hf_latency else None
+            },
+            "outbox": self.app.tx_outbox.counts(),
+            "tracing": trace_report(self.app.tracer, list(created)),
+            "agent_stats": {key: value for key, value in self.app.agent_stats.items() if isinstance(value, (int, float, str))},
+            "agent_log": str(self.log_path)
+        }
+
+    def stop(self):
+        if self._redirect:
+            self._redirect.__exit__(None, None, None)
+            self._log.close()
+            self._redirect = None
+        self.hf.stop()
+        self.rpc.stop()
+
+
+def run(args):
+    env = [f"TRACE_SAMPLE_RATE={args.trace_sample_rate}"] + args.env
+    stack = LocalStack(args.rpc_url, args.hf_latency_ms, args.hf_jitter_ms, args.hf_error_rate, args.seed,
+                       args.poll_interval, env, args.verbose, artifacts_dir=args.artifacts).start()
+    try:
+        contents = synthetic_posts(args.posts, args.toxic_ratio, args.seed)
+        expected_flags = sum(any(word in content for word in TOXIC_WORDS) for content in contents)
+        interval = 1 / args.rate if args.rate else 0
+        started = time.perf_counter()
+        for index, content in enumerate(contents):
+            stack.create_post(f"author-{index % args.authors}", content)
+            if interval:
+                time.sleep(max(started + (index + 1) * interval - time.perf_counter(), 0))
+        caught_up = stack.wait_idle(expected_flags, args.timeout)
+        report = stack.results(started)
+    finally:
+        stack.stop()
+
+    return {
+        "benchmark": "agent-e2e",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": git_commit(),
+        "config": {
+            "posts": args.posts, "authors": args.authors, "toxic_ratio": args.toxic_ratio, "rate": args.rate,
+            "poll_interval": args.poll_interval, "hf_latency_ms": args.hf_latency_ms,
+            "hf_jitter_ms": args.hf_jitter_ms, "hf_error_rate": args.hf_error_rate, "seed": args.seed,
+            "trace_sample_rate": args.trace_sample_rate,
+            "env": dict(item.partition("=")[::2] for item in args.env)
+        },
+        "posts": {
+            "created": len(stack.created), "decided": len(stack.decided),
+            "flag_expected": expected_flags, "flag_confirmed": len(stack.flag_applied),
+            "timed_out": not caught_up
+        },
+        **report
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark for the moderation agent")
+    parser.add_argument("--posts", type=int, default=100, help="synthetic posts to create")
+    parser.add_argument("--authors", type=int, default=5, help="distinct posting accounts")
+    parser.add_argument("--toxic-ratio", type=float, default=0.3, help="share of posts with toxic words")
+    parser.add_argument("--rate", type=float, default=0, help="posts per second to create (0 = as fast as possible)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="MONITOR_INTERVAL for the agent")
+    parser.add_argument("--hf-latency-ms", type=float, default=50, help="mean stand-in inference latency")
+    parser.add_argument("--hf-jitter-ms", type=float, default=10, help="inference latency std deviation")
+    parser.add_argument("--hf-error-rate", type=float, default=0.0, help="share of inference calls answered with 503")
+    parser.add_argument("--artifacts", type=Path, default=HARDHAT_ARTIFACTS,
+                        help="Hardhat artifacts/contracts dir (compiled with py-solc-x if missing or stale)")
+    parser.add_argument("--rpc-url", help="use this JSON-RPC node (hardhat node / anvil) instead of eth-tester")
+    parser.add_argument("--trace-sample-rate", type=float, default=1.0, help="TRACE_SAMPLE_RATE for the agent (0 = off)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra agent config, repeatable")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for the agent to catch up")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="result JSON path (default: data/benchmarks/bench-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous result JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show agent output instead of logging it to a file")
+    args = parser.parse_args()
+
+    try:
+        result = run(args)
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    print(f"📊 {result['posts']['decided']}/{result['posts']['created']} posts decided in {result['throughput']['duration_s']}s "
+          f"({result['throughput']['posts_per_sec']} posts/sec)")
+    detection = result["latency_ms"]["detection"] or {}
+    print(f"⏱️ Detection latency p50 {detection.get('p50')} ms, p95 {detection.get('p95')} ms, p99 {detection.get('p99')} ms")
+    print(f"🔗 {result['rpc']['total']} RPC calls ({result['rpc']['per_post']}/post), "
+          f"{result['gas']['total']} gas over {result['gas']['transactions']} txs ({result['gas']['per_post']}/post)")
+    tracing = result["tracing"]
+    print(f"🧵 Traced {tracing['traced_posts']} posts; span overhead {tracing['span_overhead']['sampled_ns']} ns sampled, "
+          f"{tracing['span_overhead']['unsampled_ns']} ns unsampled")
+    if result["posts"]["timed_out"]:
+        print(f"⚠️ Timed out before the agent caught up (see {result['agent_log']})")
+    print(f"💾 Saved {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Reorg-aware block cursor.
+
+Remembers the last processed block together with the hashes of recently
+processed blocks. Before each advance the stored tip is checked against the
+chain (for free when the new head's parentHash matches it); on a mismatch
+the cursor walks back through its history to the newest block that is still
+canonical, so callers can undo what came after that fork point and replay
+it. Ingestion can follow the head without a periodic full rescan.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from web3 import Web3
+
+
+class BlockCursor:
+    """Last processed block plus recent block hashes; history=0 disables reorg tracking"""
+
+    def __init__(self, w3, start_block=None, path=None, history=128):
+        self.w3 = w3
+        self.path = Path(path) if path else None
+        self.history = history
+        self.last_block = start_block - 1 if start_block else None
+        self._hashes = OrderedDict()   # block number -> hash, oldest first
+        self._latest = None            # (number, hash, parentHash) of the last head read
+        self.stats = {"reorgs": 0, "deepest_reorg": 0}
+        self.load()
+
+    @property
+    def tracking(self):
+        return self.history > 0
+
+    def _block_hash(self, block_number):
+        try:
+            return Web3.to_hex(self.w3.eth.get_block(block_number)["hash"])
+        except Exception:
+            return None  # Block no longer exists (the chain got shorter) - treated as a mismatch
+
+    def head(self):
+        """Current head block number (one header read when tracking reorgs)"""
+        if not self.tracking:
+            return self.w3.eth.block_number
+        block = self.w3.eth.get_block("latest")
+        self._latest = (block["number"], Web3.to_hex(block["hash"]), Web3.to_hex(block["parentHash"]))
+        return block["number"]
+
+    def find_fork(self):
+        """None while the stored tip is canonical, else the newest remembered block that still is"""
+        if not self.tracking or self.last_block not in self._hashes:
+            return None
+        stored = self._hashes[self.last_block]
+        if self._latest:
+            number, block_hash, parent_hash = self._latest
+            if (number == self.last_block and block_hash == stored) or \
+                    (number == self.last_block + 1 and parent_hash == stored):
+                return None
+        if self._block_hash(self.last_block) == stored:
+            return None
+        numbers = list(self._hashes)
+        for block_number in reversed(numbers[:-1]):
+            if self._block_hash(block_number) == self._hashes[block_number]:
+                return block_number
+        # Deeper than the remembered history: replay from just before the oldest entry
+        print(f"⚠️ Reorg deeper than {len(numbers)} remembered blocks, replaying from block {numbers[0] - 1}")
+        return numbers[0] - 1
+
+    def rewind(self, fork_block):
+        """Forget everything after fork_block; the next advance replays from there"""
+        depth = (self.last_block or 0) - fork_block
+        for block_number in [n for n in self._hashes if n > fork_block]:
+            del self._hashes[block_number]
+        self.last_block = fork_block
+        self.stats["reorgs"] += 1
+        self.stats["deepest_reorg"] = max(self.stats["deepest_reorg"], depth)
+
+    def advance(self, block_number):
+        """Mark everything up to block_number processed and remember its hash"""
+        if self.tracking:
+            if self._latest and self._latest[0] == block_number:
+                block_hash = self._latest[1]
+            else:
+                block_hash = self._block_hash(block_number)
+            if block_hash:
+                self._hashes[block_number] = block_hash
+                while len(self._hashes) > self.history:
+                    self._hashes.popitem(last=False)
+        self.last_block = block_number
+
+    @property
+    def oldest_tracked(self):
+        return next(iter(self._hashes), None)
+
+    def load(self):
+        """Restore from path; also accepts a bare block number (the old .last_block format)"""
+        if not self.path or not self.path.exists():
+            return False
+        try:
+            text = self.path.read_text(encoding="utf-8").strip()
+            state = json.loads(text)
+            if isinstance(state, int):
+                state = {"last_block": state}
+            self.last_block = int(state["last_block"])
+            self._hashes = OrderedDict(
+                sorted((int(number), block_hash) for number, block_hash in state.get("hashes", {}).items())
+            )
+            return True
+        except Exception as e:
+            print(f"Warning: Could not read block cursor {self.path}: {e}")
+            return False
+
+    def save(self):
+        if not self.path or self.last_block is None:
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"last_block": self.last_block, "hashes": {str(n): h for n, h in self._hashes.items()}}, f)
+        os.replace(tmp_path, self.path)
+        return True
+
+    def snapshot(self):
+        return {
+            "last_block": self.last_block,
+            "tracked_blocks": len(self._hashes),
+            **self.stats
+        }
@@ -0,0 +1,135 @@
+"""
+Incremental contract event polling.
+
+Handlers subscribe to (contract, event name) pairs; each poll() fetches all
+new logs for every subscription with one eth_getLogs per block range and
+dispatches the decoded events in chain order. With a reorg-tracking
+BlockCursor, events from blocks after a fork point are handed to the reorg
+handlers to undo and the new canonical logs are replayed.
+"""
+
+from web3 import Web3
+
+from block_cursor import BlockCursor
+
+# Somnia's public RPC caps eth_getLogs ranges, keep requests comfortably below
+DEFAULT_MAX_BLOCK_RANGE = 1000
+
+
+def event_topic(contract, event_name):
+    """keccak256 topic0 of a contract event, computed from its ABI"""
+    for item in contract.abi:
+        if item.get("type") == "event" and item.get("name") == event_name:
+            types = ",".join(inp["type"] for inp in item.get("inputs", []))
+            return Web3.keccak(text=f"{event_name}({types})")
+    raise ValueError(f"Event {event_name} not found in contract ABI")
+
+
+class EventPoller:
+    """Polls eth_getLogs for subscribed events and dispatches them in order"""
+
+    def __init__(self, w3, start_block=None, max_block_range=DEFAULT_MAX_BLOCK_RANGE, cursor=None, confirmations=0):
+        self.w3 = w3
+        self.cursor = cursor or BlockCursor(w3, start_block, history=0)
+        self.max_block_range = max_block_range
+        self.confirmations = confirmations  # Only process blocks this far behind the head
+        self._subscriptions = {}  # (address, topic0) -> (event, [handlers])
+        self._reorg_handlers = []
+        self._recent = []         # (event, handlers) dispatched from blocks a reorg could still remove
+
+    @property
+    def last_block(self):
+        return self.cursor.last_block
+
+    @last_block.setter
+    def last_block(self, block_number):
+        self.cursor.last_block = block_number
+
+    def subscribe(self, contract, event_name, handler):
+        """Call handler(decoded_event) for every new event_name log of contract"""
+        if contract is None:
+            return False
+        key = (contract.address.lower(), bytes(event_topic(contract, event_name)))
+        if key not in self._subscriptions:
+            self._subscriptions[key] = (getattr(contract.events, event_name)(), [])
+        self._subscriptions[key][1].append(handler)
+        return True
+
+    def on_reorg(self, handler):
+        """Call handler(fork_block, removed_events) before logs after fork_block are replayed"""
+        self._reorg_handlers.append(handler)
+
+    def _filter_params(self, from_block, to_block):
+        addresses = sorted({address for address, _ in self._subscriptions})
+        topics = sorted({topic for _, topic in self._subscriptions})
+        return {
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": [Web3.to_checksum_address(a) for a in addresses],
+            "topics": [["0x" + t.hex() for t in topics]]
+        }
+
+    def fetch(self, from_block, to_block):
+        """Fetch and decode subscribed logs in [from_block, to_block]"""
+        decoded = []
+        start = from_block
+        while start <= to_block:
+            end = min(start + self.max_block_range - 1, to_block)
+            for log in self.w3.eth.get_logs(self._filter_params(start, end)):
+                if not log["topics"]:
+                    continue
+                key = (log["address"].lower(), bytes(log["topics"][0]))
+                subscription = self._subscriptions.get(key)
+                if subscription:
+                    decoded.append((subscription[0].process_log(log), subscription[1]))
+            start = end + 1
+        decoded.sort(key=lambda item: (item[0]["blockNumber"], item[0]["logIndex"]))
+        return decoded
+
+    def dispatch(self, decoded):
+        for event, handlers in decoded:
+            for handler in handlers:
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"⚠️ Event handler error for {event['event']} in block {event['blockNumber']}: {e}")
+        return len(decoded)
+
+    def _rollback(self, fork_block):
+        removed = [event for event, _ in self._recent if event["blockNumber"] > fork_block]
+        self._recent = [item for item in self._recent if item[0]["blockNumber"] <= fork_block]
+        print(f"⚠️ Chain reorg: rolling back from block {self.last_block} to {fork_block} ({len(removed)} events)")
+        self.cursor.rewind(fork_block)
+        for handler in self._reorg_handlers:
+            try:
+                handler(fork_block, removed)
+            except Exception as e:
+                print(f"⚠️ Reorg handler error at fork block {fork_block}: {e}")
+
+    def _remember(self, decoded):
+        if not self.cursor.tracking:
+            return
+        self._recent.extend(decoded)
+        oldest = self.cursor.oldest_tracked
+        if oldest is not None:
+            self._recent = [item for item in self._recent if item[0]["blockNumber"] > oldest]
+
+    def poll(self, to_block=None):
+        """Process every subscribed event since the last poll; returns the count"""
+        if not self._subscriptions:
+            return 0
+        head = self.cursor.head() - self.confirmations if to_block is None else to_block
+        if self.last_block is None:
+            # First poll without an explicit start block: only follow new events
+            self.cursor.advance(head)
+            return 0
+        fork_block = self.cursor.find_fork()
+        if fork_block is not None:
+            self._rollback(fork_block)
+        if head <= self.last_block:
+            return 0
+        decoded = self.fetch(self.last_block + 1, head)
+        count = self.dispatch(decoded)
+        self._remember(decoded)
+        self.cursor.advance(head)
+        return count
@@ -4,11 +4,11 @@ Check if the agent has proper authorization to flag content
 """
 
 import os
-import json
-from pathlib import Path
 from web3 import Web3
 from dotenv import load_dotenv
 
+from agent_client import connect, load_abi
+
 # Load environment
 load_dotenv()
 
@@ -20,7 +20,7 @@ AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY", "")
 print("🔍 Checking Agent Authorization\n")
 
 # Web3 setup
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL)) if SOMNIA_RPC_URL else None
+w3 = connect(SOMNIA_RPC_URL)
 if not w3:
     print("❌ No Web3 connection")
     exit(1)
@@ -39,16 +39,11 @@ else:
     exit(1)
 
 # Load Moderator ABI
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-try:
-    with open(ABI_DIR / "Moderator.json", "r", encoding="utf-8") as f:
-        MOD_ABI = json.load(f)
-    print("✅ Moderator ABI loaded")
-except Exception as e:
-    print(f"❌ Could not load Moderator ABI: {e}")
+MOD_ABI = load_abi("Moderator.json")
+if not MOD_ABI:
+    print("❌ Could not load Moderator ABI")
     exit(1)
+print("✅ Moderator ABI loaded")
 
 # Initialize moderator contract
 try:
@@ -1,9 +1,9 @@
-import json
 import os
-from pathlib import Path
 from dotenv import load_dotenv
 from web3 import Web3
 
+from agent_client import connect, load_abi
+
 # Load env
 load_dotenv()
 
@@ -11,17 +11,10 @@ SOMNIA_RPC_URL = os.getenv("SOMNIA_RPC_URL", "")
 SOCIAL_ADDR = Web3.to_checksum_address(os.getenv("SOCIAL_POSTS_ADDRESS", ""))
 
 # Read ABI
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-with open(ABI_DIR / "SocialPosts.json", "r", encoding="utf-8") as f:
-    artifact = json.load(f)
-    if isinstance(artifact, dict) and 'abi' in artifact:
-        SOCIAL_ABI = artifact['abi']
-    else:
-        SOCIAL_ABI = artifact
+SOCIAL_ABI = load_abi("SocialPosts.json")
 
 # Web3 setup
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL))
+w3 = connect(SOMNIA_RPC_URL)
 social = w3.eth.contract(address=SOCIAL_ADDR, abi=SOCIAL_ABI)
 
 print("SocialPosts:", SOCIAL_ADDR)
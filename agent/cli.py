@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Bulk operations against the deployed contracts.
+
+    python cli.py list [IDS] [--flagged | --unflagged] [--author ADDRESS] [--json]
+    python cli.py inspect IDS [--json]
+    python cli.py score IDS [--keywords] [--workers N] [--flag]
+    python cli.py flag IDS [--score-bp BP] [--model NAME] [--batch-size N] [--dry-run]
+    python cli.py authorize [ADDRESS ...] [--distributor] [--revoke]
+
+IDS are ids and ranges such as "1-500,742 900-" (an open range ends at
+totalPosts, "all" is every post); --file adds ids from a file ("-" for stdin,
+# starts a comment). Reads go through PostReader / Multicall a page at a time.
+Flags go through the agent's outbox machinery: a durable outbox of its own
+(CLI_OUTBOX_PATH), one nonce lane per agent key with many transactions in
+flight, cached gas estimates and flagPosts batches, so flagging 1,000 posts
+takes a few blocks instead of 1,000 receipt round-trips. An interrupted run
+resumes its in-flight transactions the next time. Progress goes to stderr,
+so --json output (one object per line) can be piped.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+from web3.logs import DISCARD
+
+from agent_client import AgentClient, http_session
+from gas import GasStrategy
+from multicall import Multicall
+from post_reader import PostReader
+from reputation_cache import ReputationCache
+from signer_pool import NonceLane, SignerPool, parse_private_keys
+from structured_log import setup_logging
+from toxicity import DEFAULT_API_URL, InferenceError, keyword_score, model_score
+from tx_outbox import OutboxSender, TxOutbox
+
+load_dotenv()
+
+CHAIN_ID = int(os.getenv("CHAIN_ID", "0") or 0)
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "")
+POST_READ_PAGE_SIZE = int(os.getenv("POST_READ_PAGE_SIZE", "200"))
+THRESHOLD_BP = int(os.getenv("TOXICITY_THRESHOLD_BP", "2500"))
+HF_TOKEN = os.getenv("HF_TOKEN", "")
+HF_API_URL = os.getenv("HF_API_URL") or DEFAULT_API_URL
+HF_HEADERS = {"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {}
+GAS_ESTIMATE_TTL = int(os.getenv("GAS_ESTIMATE_TTL", "600"))
+MAX_FEE_GWEI = float(os.getenv("MAX_FEE_GWEI", "0") or 0)
+OUTBOX_STUCK_SECONDS = int(os.getenv("OUTBOX_STUCK_SECONDS", "120"))
+AGENT_DATA_DIR = Path(os.getenv("AGENT_DATA_DIR") or Path(__file__).resolve().parent / "data")
+CLI_OUTBOX_PATH = os.getenv("CLI_OUTBOX_PATH") or str(AGENT_DATA_DIR / "cli_outbox.sqlite3")  # Separate from the agent's outbox
+OWNER_PRIVATE_KEY = os.getenv("OWNER_PRIVATE_KEY") or os.getenv("AGENT_PRIVATE_KEY", "")  # Signs setAgent / setDistributor
+
+FINAL_STATUSES = ("confirmed", "dropped", "failed")
+
+
+def fail(message):
+    print(f"❌ {message}", file=sys.stderr)
+    raise SystemExit(1)
+
+
+# --- ids ----------------------------------------------------------------------
+
+def parse_ids(spec, total=None):
+    """Ids from "1-100,105 900-"; an open range (or "all") runs to total"""
+    ids = set()
+    for part in spec.replace(",", " ").split():
+        if part == "all":
+            part = "1-"
+        if "-" not in part:
+            ids.add(int(part))
+            continue
+        start, _, end = part.partition("-")
+        if not end:
+            if total is None:
+                raise ValueError(f"open range {part!r} needs totalPosts")
+            end = total
+        ids.update(range(int(start or 1), int(end) + 1))
+    return ids
+
+
+def read_id_file(path):
+    text = sys.stdin.read() if path == "-" else Path(path).read_text()
+    return " ".join(line.split("#", 1)[0] for line in text.splitlines())
+
+
+def format_ids(ids):
+    """Compact "1-5,9,12-14" form of a set of ids"""
+    ranges = []
+    for post_id in sorted(ids):
+        if ranges and post_id == ranges[-1][1] + 1:
+            ranges[-1][1] = post_id
+        else:
+            ranges.append([post_id, post_id])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def target_ids(args, total, default="all"):
+    """Sorted ids from the positional spec and --file, limited to existing posts"""
+    spec = " ".join(args.ids)
+    if args.file:
+        spec += " " + read_id_file(args.file)
+    if not spec.strip():
+        if not default:
+            fail("No post ids given (e.g. 1-100, all, or --file ids.txt)")
+        spec = default
+    try:
+        ids = parse_ids(spec, total)
+    except ValueError as e:
+        fail(f"Bad id list: {e}")
+    missing = {post_id for post_id in ids if not 1 <= post_id <= total}
+    if missing:
+        print(f"⚠️ Skipping {len(missing)} ids outside 1-{total}: {format_ids(missing)[:200]}", file=sys.stderr)
+    return sorted(ids - missing)
+
+
+def chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# --- output -------------------------------------------------------------------
+
+class Progress:
+    """Progress line with throughput on stderr, redrawn in place on a terminal"""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.tty = sys.stderr.isatty()
+        self.interval = 0.5 if self.tty else 5
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def _line(self, done, detail):
+        elapsed = time.perf_counter() - self.started
+        rate = done / elapsed if elapsed else 0
+        return f"{self.label}: {done}/{self.total} in {elapsed:.1f}s ({rate:.1f}/s){', ' + detail if detail else ''}"
+
+    def update(self, done, detail=""):
+        now = time.perf_counter()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        line = "⏳ " + self._line(done, detail)
+        sys.stderr.write(f"\r\033[K{line}" if self.tty else f"{line}\n")
+        sys.stderr.flush()
+
+    def finish(self, done, detail=""):
+        if self.tty:
+            sys.stderr.write("\r\033[K")
+        print("✅ " + self._line(done, detail), file=sys.stderr)
+
+
+def post_view(post):
+    post_id, author, content, flagged, timestamp, likes, replies = post[:7]
+    return {"id": post_id, "author": author, "content": content, "flagged": flagged,
+            "timestamp": timestamp, "likes": likes, "replies": replies}
+
+
+def emit(args, record, text):
+    print(json.dumps(record, default=str) if args.json else text, flush=args.json)
+
+
+def post_line(post):
+    when = time.strftime("%Y-%m-%d %H:%M", time.gmtime(post["timestamp"])) if post["timestamp"] else "-"
+    content = post["content"].replace("\n", " ")
+    content = content if len(content) <= 60 else content[:57] + "..."
+    return (f"#{post['id']:<6} {'🚩' if post['flagged'] else '  '} {post['author']} {when} "
+            f"❤️ {post['likes']} 💬 {post['replies']}  {content}")
+
+
+# --- chain --------------------------------------------------------------------
+
+def open_reader(client):
+    if client.w3 is None:
+        fail("SOMNIA_RPC_URL is not set")
+    social = client.contract("social")
+    if social is None:
+        fail("SocialPosts is not configured (SOCIAL_POSTS_ADDRESS)")
+    multicall = Multicall(client.w3, MULTICALL3_ADDRESS or None)
+    return PostReader(social, multicall, page_size=POST_READ_PAGE_SIZE), multicall
+
+
+def read_posts(reader, ids, label="read"):
+    """Yield pages of post dicts for ids, with progress"""
+    progress = Progress(label, len(ids))
+    done = 0
+    for chunk in chunks(ids, reader.page_size):
+        posts = [post_view(post) for post in reader.read_ids(chunk)]
+        done += len(chunk)
+        progress.update(done)
+        yield posts
+    progress.finish(done, f"{reader.stats['range_calls']} range reads, {reader.stats['fallback_calls']} getPost batches")
+
+
+def gas_strategy(w3):
+    return GasStrategy(w3, chain_id=CHAIN_ID or None, estimate_ttl=GAS_ESTIMATE_TTL, max_fee_gwei=MAX_FEE_GWEI or None)
+
+
+def wait_for_receipts(w3, tx_hashes, timeout=300, poll=1.0):
+    """Poll every pending hash each round until all are mined; returns {tx_hash: receipt or None}"""
+    receipts = {tx_hash: None for tx_hash in tx_hashes}
+    deadline = time.time() + timeout
+    progress = Progress("confirm", len(receipts))
+    while time.time() < deadline:
+        for tx_hash in [h for h, receipt in receipts.items() if receipt is None]:
+            try:
+                receipts[tx_hash] = w3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                pass
+        done = sum(1 for receipt in receipts.values() if receipt is not None)
+        progress.update(done)
+        if done == len(receipts):
+            break
+        time.sleep(poll)
+    progress.finish(sum(1 for receipt in receipts.values() if receipt is not None))
+    return receipts
+
+
+# --- flagging -----------------------------------------------------------------
+
+def flag_posts(client, decisions, args):
+    """
+    Flag {post_id: (score_bp, model)} through the outbox and wait until every
+    entry is confirmed, dropped or failed; returns {post_id: outcome}.
+    """
+    moderator = client.contract("moderator")
+    if moderator is None:
+        fail("Moderator is not configured (MODERATOR_ADDRESS)")
+    if not client.accounts:
+        fail("No agent keys (AGENT_PRIVATE_KEY / AGENT_PRIVATE_KEYS)")
+    w3 = client.w3
+    pool = SignerPool(w3, client.accounts)
+    authorized = pool.refresh_authorization(moderator)
+    if not any(authorized.values()):
+        fail("No agent key is authorized in Moderator; run `python cli.py authorize` first")
+    lanes = pool.active_lanes()
+    batch_size = max(1, args.batch_size)
+    models = sorted({model for _, model in decisions.values()})
+    transactions = sum(-(-sum(1 for _, m in decisions.values() if m == model) // batch_size) for model in models)
+    print(f"🚩 Flagging {len(decisions)} posts: about {transactions} transactions over {len(lanes)} agent keys "
+          f"(batch size {batch_size})", file=sys.stderr)
+    if args.dry_run:
+        return {post_id: "dry-run" for post_id in decisions}
+
+    outbox = TxOutbox(args.outbox)
+    sender = OutboxSender(w3, pool, outbox, gas_strategy(w3), stuck_after=OUTBOX_STUCK_SECONDS,
+                          max_attempts=args.max_attempts, poll_interval=args.poll)
+    outcomes = {}
+    blocks = []
+
+    def build(entries):
+        if len(entries) == 1:
+            entry = entries[0]
+            return moderator.functions.flagPost(int(entry["key"]), entry["payload"]["score_bp"], entry["payload"]["model"])
+        return moderator.functions.flagPosts(
+            [int(entry["key"]) for entry in entries],
+            [entry["payload"]["score_bp"] for entry in entries],
+            entries[0]["payload"]["model"]
+        )
+
+    def on_receipt(entries, receipt):
+        blocks.append(receipt.blockNumber)
+        for event in moderator.events.PostFlagged().process_receipt(receipt, errors=DISCARD):
+            outcomes[event["args"]["id"]] = "flagged"
+        for event in moderator.events.FlagFailed().process_receipt(receipt, errors=DISCARD):
+            outcomes[event["args"]["id"]] = f"not flagged: {event['args']['reason'] or 'reverted'}"
+
+    def is_final_error(entries, error):
+        error_msg = str(error).lower()
+        return "already flagged" in error_msg or "invalid post id" in error_msg or "not authorized agent" in error_msg
+
+    for model in models:
+        sender.register(f"flag:{model}", build, on_receipt, is_final_error, batch_size=batch_size)
+
+    # Each run owns its entries: earlier finished entries for the same posts are queued again
+    keys = {}
+    resumed = 0
+    for post_id, (score_bp, model) in decisions.items():
+        action = f"flag:{model}"
+        payload = {"score_bp": score_bp, "model": model}
+        if not (outbox.enqueue(action, post_id, payload) or outbox.requeue(action, post_id, payload)):
+            resumed += 1  # Still pending or in flight from an interrupted run
+        keys[(action, str(post_id))] = post_id
+    if resumed:
+        print(f"↩️ Resuming {resumed} posts left in {args.outbox} by an earlier run", file=sys.stderr)
+
+    progress = Progress("flag", len(keys))
+    sender.start()
+    try:
+        while True:
+            statuses = {}
+            for action in {action for action, _ in keys}:
+                for key, status in outbox.statuses(action).items():
+                    statuses[(action, key)] = status
+            states = [statuses.get(key, ("pending", None))[0] for key in keys]
+            done = sum(1 for state in states if state in FINAL_STATUSES)
+            progress.update(done, f"{states.count('signed') + states.count('sent')} in flight, {sender.stats['sent']} txs sent")
+            if done == len(keys):
+                break
+            time.sleep(args.poll)
+            sender.wake()
+    except KeyboardInterrupt:
+        sender.stop()
+        print(f"\n⏸️ Interrupted; unfinished flags stay in {args.outbox} and resume on the next run", file=sys.stderr)
+        raise SystemExit(130)
+    sender.stop()
+    span = f", blocks {min(blocks)}-{max(blocks)}" if blocks else ""
+    progress.finish(done, f"{sender.stats['sent']} txs{span}")
+
+    results = {}
+    for key, post_id in keys.items():
+        status, error = statuses[key]
+        if status == "confirmed":
+            results[post_id] = outcomes.get(post_id, "confirmed")
+        else:
+            results[post_id] = f"{status}: {error}" if error else status
+    outbox.close()
+    return results
+
+
+def report_flags(args, results, skipped):
+    flagged = sum(1 for outcome in results.values() if outcome == "flagged")
+    for post_id, outcome in sorted(results.items()):
+        if args.json or outcome != "flagged":
+            emit(args, {"id": post_id, "outcome": outcome}, f"#{post_id:<6} {outcome}")
+    for post_id, reason in sorted(skipped.items()):
+        emit(args, {"id": post_id, "outcome": f"skipped: {reason}"}, f"#{post_id:<6} skipped: {reason}")
+    if not args.dry_run:
+        print(f"🚩 {flagged} flagged, {len(results) - flagged} not flagged, {len(skipped)} skipped", file=sys.stderr)
+
+
+# --- commands -----------------------------------------------------------------
+
+def cmd_list(args, client):
+    reader, _ = open_reader(client)
+    total = reader.social.functions.totalPosts().call()
+    ids = target_ids(args, total)
+    author = args.author.lower() if args.author else None
+    shown = 0
+    for posts in read_posts(reader, ids):
+        for post in posts:
+            if args.flagged and not post["flagged"] or args.unflagged and post["flagged"]:
+                continue
+            if author and post["author"].lower() != author:
+                continue
+            emit(args, post, post_line(post))
+            shown += 1
+            if args.limit and shown >= args.limit:
+                return
+    print(f"📋 {shown} of {total} posts shown", file=sys.stderr)
+
+
+def cmd_inspect(args, client):
+    reader, multicall = open_reader(client)
+    total = reader.social.functions.totalPosts().call()
+    ids = target_ids(args, total, default=None)
+    social = reader.social
+    reputation = client.contract("reputation")
+    reputations = ReputationCache(client.w3, reputation, multicall=multicall) if reputation else None
+    for posts in read_posts(reader, ids):
+        authors = sorted({post["author"] for post in posts})
+        # One batched read per page for everything known about the page's authors
+        calls = []
+        for author in authors:
+            calls += [(social, "getUsername", [author]), (social, "getUserPostCount", [author]),
+                      (social, "getUserFlaggedPostCount", [author])]
+        values = [value for _, value in multicall.call(calls)]
+        profiles = {author: values[i * 3:i * 3 + 3] for i, author in enumerate(authors)}
+        scores = reputations.get_many(authors) if reputations else {}
+        for post in posts:
+            username, post_count, flagged_count = profiles[post["author"]]
+            rep = scores.get(Web3.to_checksum_address(post["author"]))
+            record = {**post, "author_username": username, "author_posts": post_count,
+                      "author_flagged_posts": flagged_count,
+                      "author_reputation": rep["current_score"] if rep else None,
+                      "author_tier": rep["tier"] if rep else None}
+            emit(args, record, "\n".join([
+                post_line(post),
+                f"        author: {username or '-'} ({post_count} posts, {flagged_count} flagged"
+                + (f", reputation {rep['current_score']}, tier {rep['tier']})" if rep else ")"),
+                f"        content: {post['content']}"
+            ]))
+
+
+def cmd_score(args, client):
+    reader, _ = open_reader(client)
+    total = reader.social.functions.totalPosts().call()
+    ids = target_ids(args, total, default=None)
+    use_model = bool(HF_TOKEN) and not args.keywords
+    threshold = args.threshold
+    inference_errors = []
+
+    def score(post):
+        if use_model:
+            try:
+                return model_score(post["content"], HF_API_URL, HF_HEADERS, http_session())[0], "toxic-bert"
+            except InferenceError as e:
+                inference_errors.append(str(e))
+        return keyword_score(post["content"])[0], "keyword-based"
+
+    posts = [post for page in read_posts(reader, ids) for post in page]
+    progress = Progress(f"score ({'toxic-bert' if use_model else 'keyword-based'})", len(posts))
+    decisions = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="score") as pool:
+        for done, (post, (score_bp, scorer)) in enumerate(zip(posts, pool.map(score, posts)), 1):
+            toxic = score_bp >= threshold
+            emit(args, {"id": post["id"], "score_bp": score_bp, "scorer": scorer, "toxic": toxic, "flagged": post["flagged"]},
+                 f"#{post['id']:<6} {score_bp / 100:6.2f}% {scorer:<13} {'TOXIC' if toxic else 'ok':<5}"
+                 f"{' (flagged)' if post['flagged'] else ''}")
+            if toxic and not post["flagged"]:
+                decisions[post["id"]] = (score_bp, scorer)
+            progress.update(done)
+    progress.finish(len(posts), f"{len(decisions)} toxic and unflagged at {threshold} BP")
+    if inference_errors:
+        print(f"⚠️ {len(inference_errors)} posts fell back to keywords ({inference_errors[0]})", file=sys.stderr)
+    if args.flag and decisions:
+        report_flags(args, flag_posts(client, decisions, args), {})
+
+
+def cmd_flag(args, client):
+    reader, _ = open_reader(client)
+    total = reader.social.functions.totalPosts().call()
+    ids = target_ids(args, total, default=None)
+    found = {post["id"]: post for page in read_posts(reader, ids) for post in page}
+    skipped = {post_id: "no such post" for post_id in ids if post_id not in found}
+    skipped.update({post_id: "already flagged" for post_id, post in found.items() if post["flagged"]})
+    decisions = {post_id: (args.score_bp, args.model) for post_id in found if post_id not in skipped}
+    if not decisions:
+        print("Nothing to flag.", file=sys.stderr)
+        report_flags(args, {}, skipped)
+        return
+    report_flags(args, flag_posts(client, decisions, args), skipped)
+
+
+def cmd_authorize(args, client):
+    w3 = client.w3
+    if w3 is None:
+        fail("SOMNIA_RPC_URL is not set")
+    moderator = client.contract("moderator")
+    if moderator is None:
+        fail("Moderator is not configured (MODERATOR_ADDRESS)")
+    incentive = client.contract("incentive") if args.distributor else None
+    if args.distributor and incentive is None:
+        fail("IncentiveSystem is not configured (INCENTIVE_SYSTEM_ADDRESS)")
+    keys = parse_private_keys(OWNER_PRIVATE_KEY)
+    if not keys:
+        fail("No owner key (OWNER_PRIVATE_KEY or AGENT_PRIVATE_KEY)")
+    owner = Account.from_key(bytes.fromhex(keys[0]))
+    targets = [Web3.to_checksum_address(address) for address in args.addresses] or [a.address for a in client.accounts]
+    if not targets:
+        fail("No addresses given and no agent keys configured")
+    allowed = not args.revoke
+
+    # (label, contract, read fn, write fn); each target's current state comes back in one batched read
+    roles = [("agent", moderator, "agents", "setAgent")]
+    if incentive:
+        roles.append(("distributor", incentive, "distributors", "setDistributor"))
+    multicall = Multicall(w3, MULTICALL3_ADDRESS or None)
+
+    def read_state():
+        calls = [(contract, "owner", []) for _, contract, _, _ in roles]
+        calls += [(contract, read_fn, [target]) for target in targets for _, contract, read_fn, _ in roles]
+        return [value for _, value in multicall.call(calls)]
+
+    state = read_state()
+    for (label, contract, _, _), contract_owner in zip(roles, state):
+        if contract_owner and contract_owner.lower() != owner.address.lower():
+            fail(f"{owner.address} is not the {label} contract owner ({contract_owner})")
+    changes = []
+    for i, (target, (label, contract, _, write_fn)) in enumerate(
+            (target, role) for target in targets for role in roles):
+        if bool(state[len(roles) + i]) == allowed:
+            print(f"✅ {target} {label}: already {allowed}", file=sys.stderr)
+            continue
+        changes.append((target, label, getattr(contract.functions, write_fn)(target, allowed)))
+    if not changes:
+        return
+
+    # All transactions go out back to back on consecutive nonces, then every receipt is awaited together
+    lane = NonceLane(w3, owner)
+    gas = gas_strategy(w3)
+    sent = []
+    errors = 0
+    for target, label, contract_fn in changes:
+        try:
+            _, tx_hash = lane.send(lambda nonce: contract_fn.build_transaction(gas.tx_params(contract_fn, owner.address, nonce)))
+        except Exception as e:
+            print(f"❌ {label} {target}: could not send ({e})", file=sys.stderr)
+            errors += 1
+            continue
+        print(f"📤 {label} {target} -> {allowed}: {tx_hash.hex()}", file=sys.stderr)
+        sent.append((target, label, tx_hash.hex()))
+    receipts = wait_for_receipts(w3, [tx_hash for _, _, tx_hash in sent], poll=args.poll) if sent else {}
+    state = read_state()
+    for i, (target, (label, _, _, _)) in enumerate((target, role) for target in targets for role in roles):
+        emit(args, {"address": target, "role": label, "allowed": bool(state[len(roles) + i])},
+             f"{'✅' if bool(state[len(roles) + i]) == allowed else '❌'} {target} {label}: {bool(state[len(roles) + i])}")
+    failed = [tx_hash for tx_hash, receipt in receipts.items() if receipt is None or receipt.status != 1]
+    if failed:
+        fail(f"{len(failed)} transactions failed or were not mined: {', '.join(failed)}")
+    if errors:
+        fail(f"{errors} transactions could not be sent")
+
+
+# --- entry point --------------------------------------------------------------
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--rpc-url", help="Defaults to SOMNIA_RPC_URL")
+    common.add_argument("--json", action="store_true", help="One JSON object per line on stdout")
+    common.add_argument("--verbose", action="store_true", help="Show the outbox's per-transaction log lines")
+    common.add_argument("--poll", type=float, default=1.0, help="Seconds between receipt checks")
+    parser = argparse.ArgumentParser(description="Bulk listing, inspection, scoring, flagging and authorization")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def with_ids(name, help_text):
+        command = commands.add_parser(name, help=help_text, parents=[common])
+        command.add_argument("ids", nargs="*", help='Ids and ranges, e.g. "1-500,742 900-" or "all"')
+        command.add_argument("--file", help="File of ids and ranges ('-' for stdin)")
+        return command
+
+    def with_flag_options(command):
+        command.add_argument("--batch-size", type=int, default=int(os.getenv("CLI_FLAG_BATCH_SIZE", "50")),
+                             help="Posts per flagPosts transaction (1 sends flagPost per post)")
+        command.add_argument("--outbox", default=CLI_OUTBOX_PATH, help="Outbox file (':memory:' for none)")
+        command.add_argument("--max-attempts", type=int, default=3, help="Sends per batch before giving up")
+        command.add_argument("--dry-run", action="store_true", help="Show what would be sent")
+
+    command = with_ids("list", "List posts (default: all)")
+    command.add_argument("--flagged", action="store_true")
+    command.add_argument("--unflagged", action="store_true")
+    command.add_argument("--author", help="Only posts by this address")
+    command.add_argument("--limit", type=int, default=0)
+    command.set_defaults(handler=cmd_list)
+
+    command = with_ids("inspect", "Post details with author profile and reputation")
+    command.set_defaults(handler=cmd_inspect)
+
+    command = with_ids("score", "Score posts with toxic-bert (keyword fallback)")
+    command.add_argument("--keywords", action="store_true", help="Keyword scoring only")
+    command.add_argument("--workers", type=int, default=8, help="Concurrent inference requests")
+    command.add_argument("--threshold", type=int, default=THRESHOLD_BP, help="Toxic at or above this BP")
+    command.add_argument("--flag", action="store_true", help="Flag toxic, unflagged posts")
+    with_flag_options(command)
+    command.set_defaults(handler=cmd_score)
+
+    command = with_ids("flag", "Flag posts")
+    command.add_argument("--score-bp", type=int, default=10000, help="Score recorded with the flag")
+    command.add_argument("--model", default="manual", help="Model name recorded with the flag")
+    with_flag_options(command)
+    command.set_defaults(handler=cmd_flag)
+
+    command = commands.add_parser("authorize", help="setAgent (and setDistributor) for agent addresses",
+                                  parents=[common])
+    command.add_argument("addresses", nargs="*", help="Defaults to every configured agent key")
+    command.add_argument("--distributor", action="store_true", help="Also IncentiveSystem.setDistributor")
+    command.add_argument("--revoke", action="store_true", help="Remove instead of grant")
+    command.set_defaults(handler=cmd_authorize)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging("INFO" if args.verbose else "WARNING", "text", sys.stderr)
+    try:
+        args.handler(args, AgentClient(args.rpc_url))
+    except BrokenPipeError:
+        # Output piped into head & co.; stop quietly
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
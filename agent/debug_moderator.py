@@ -1,9 +1,9 @@
-import json
 import os
-from pathlib import Path
 from dotenv import load_dotenv
 from web3 import Web3
 
+from agent_client import connect, load_abi
+
 load_dotenv()
 
 SOMNIA_RPC_URL = os.getenv("SOMNIA_RPC_URL", "")
@@ -11,14 +11,10 @@ SOCIAL_ADDR = Web3.to_checksum_address(os.getenv("SOCIAL_POSTS_ADDRESS", ""))
 MODERATOR_ADDR = Web3.to_checksum_address(os.getenv("MODERATOR_ADDRESS", ""))
 AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY", "")
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-with open(ABI_DIR / "SocialPosts.json", "r", encoding="utf-8") as f:
-    SOCIAL_ABI = json.load(f)
-with open(ABI_DIR / "Moderator.json", "r", encoding="utf-8") as f:
-    MOD_ABI = json.load(f)
+SOCIAL_ABI = load_abi("SocialPosts.json")
+MOD_ABI = load_abi("Moderator.json")
 
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL))
+w3 = connect(SOMNIA_RPC_URL)
 acct = w3.eth.account.from_key(bytes.fromhex(AGENT_PRIV))
 social = w3.eth.contract(address=SOCIAL_ADDR, abi=SOCIAL_ABI)
 moderator = w3.eth.contract(address=MODERATOR_ADDR, abi=MOD_ABI)
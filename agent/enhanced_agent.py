@@ -1,15 +1,14 @@
-import json
 import os
 import time
 import threading
-import requests
 from decimal import Decimal
-from pathlib import Path
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 from web3 import Web3
 
+from agent_client import connect, http_session, load_abi
+
 print('=== ENHANCED SOL AI AGENT STARTUP ===')
 
 # Load environment variables
@@ -48,17 +47,6 @@ agent_stats = {
 }
 
 # Load ABIs
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-def load_abi(filename):
-    try:
-        with open(ABI_DIR / filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Warning: Could not load {filename}: {e}")
-        return []
-
 SOCIAL_ABI = load_abi("SocialPosts.json")
 MOD_ABI = load_abi("Moderator.json")
 # Note: These ABIs would need to be generated after contract deployment
@@ -66,17 +54,8 @@ REPUTATION_ABI = []  # load_abi("ReputationSystem.json")
 INCENTIVE_ABI = []   # load_abi("IncentiveSystem.json")
 GOVERNANCE_ABI = []  # load_abi("GovernanceSystem.json")
 
-# Web3 setup
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL)) if SOMNIA_RPC_URL else None
-
-# Handle PoA middleware
-if w3:
-    try:
-        from web3.middleware import geth_poa_middleware
-        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        print("PoA middleware injected successfully")
-    except ImportError:
-        print("Warning: PoA middleware not available")
+# Web3 setup (pooled session, PoA middleware)
+w3 = connect(SOMNIA_RPC_URL)
 
 # Initialize account
 acct = None
@@ -111,7 +90,7 @@ def test_huggingface_api():
         return False
     
     try:
-        test_response = requests.post(
+        test_response = http_session().post(
             HF_API_URL, 
             headers=HF_HEADERS, 
             json={"inputs": "Hello, how are you?"},
@@ -139,7 +118,7 @@ def score_toxicity(text: str) -> int:
         try:
             print(f"🔍 Analyzing with toxic-bert: '{text[:50]}...'")
             
-            response = requests.post(
+            response = http_session().post(
                 HF_API_URL,
                 headers=HF_HEADERS,
                 json={"inputs": text},
@@ -0,0 +1,257 @@
+"""
+Server-side feed ranking.
+
+Port of FeedRankingSystem (app/utils/feedRanking.js) that keeps the ranking
+up to date incrementally: posts, likes, flags and reputation changes each
+rescore only the affected posts, and the best `top_k` posts are kept in a
+sorted list so a page of the feed is a slice rather than a full re-rank.
+
+Only the top K plus a candidate margin are held in memory; posts that fall
+below that are evicted, and the periodic rebuild refills the index from
+`load_candidates` (the post store's indexed candidate query) instead of
+re-ranking every post ever seen.
+"""
+
+import bisect
+import heapq
+import math
+import threading
+import time
+
+RANKING_WEIGHTS = {
+    "reputation": 0.4,   # 40% weight for user reputation
+    "recency": 0.3,      # 30% weight for post recency
+    "engagement": 0.2,   # 20% weight for likes/replies
+    "safety": 0.1        # 10% weight for safety score
+}
+
+
+def reputation_component(reputation):
+    # Normalize reputation (0-100) and slightly favor high reputation
+    normalized = min(max(reputation, 0) / 100, 1)
+    return normalized ** 0.7
+
+
+def recency_component(timestamp, now):
+    if not timestamp:
+        return 1.0
+    age_hours = (now - timestamp) / 3600
+    if age_hours <= 1:
+        return 1.0
+    if age_hours <= 24:
+        return math.exp(-age_hours / 24)
+    return math.exp(-age_hours / 168) * 0.5  # 168 hours = 7 days
+
+
+def engagement_component(likes=0, replies=0):
+    # Replies count double; log scale keeps viral posts from dominating
+    total = likes + replies * 2
+    if total <= 0:
+        return 0.0
+    return math.log(total + 1) / math.log(101)
+
+
+def post_score(post, reputation, now, weights=RANKING_WEIGHTS):
+    return (
+        reputation_component(reputation) * weights["reputation"] +
+        recency_component(post["timestamp"], now) * weights["recency"] +
+        engagement_component(post["likes"], post["replies"]) * weights["engagement"] +
+        (0.0 if post["flagged"] else 1.0) * weights["safety"]
+    )
+
+
+def encode_cursor(key):
+    neg_score, neg_id = key
+    return f"{-neg_score!r}_{-neg_id}"  # repr() round-trips the float exactly
+
+
+def decode_cursor(cursor):
+    score, post_id = cursor.split("_", 1)
+    return (-float(score), -int(post_id))
+
+
+class FeedIndex:
+    """Incrementally maintained top-K ranking of posts, bounded to top_k + margin posts"""
+
+    def __init__(self, top_k=1000, margin=250, rescore_interval=60, rebuild_interval=900,
+                 load_candidates=None, candidate_authors=50):
+        self.top_k = top_k
+        self.capacity = top_k + max(margin, 0)
+        self.rescore_interval = rescore_interval
+        self.rebuild_interval = rebuild_interval
+        self.load_candidates = load_candidates  # (limit, authors) -> getPost() tuples, or None
+        self.candidate_authors = candidate_authors
+        self.posts = {}               # post id -> post dict, only for posts in _ranked
+        self.author_posts = {}        # lowercase author -> set of tracked post ids
+        self.author_reputation = {}   # lowercase author -> reputation score (0-100)
+        self._ranked = []             # sorted keys (-score, -post id), best first
+        self._keys = {}               # post id -> key for posts in _ranked
+        self._lock = threading.RLock()
+        self._last_rescore = 0.0
+        self._last_rebuild = 0.0
+        self.evicted = 0
+
+    # --- incremental updates -------------------------------------------------
+
+    def upsert_post(self, post_id, author, flagged=False, timestamp=0, likes=0, replies=0, content=None):
+        with self._lock:
+            post = self.posts.get(post_id) or {"id": post_id}
+            post.update({
+                "author": author,
+                "flagged": bool(flagged),
+                "timestamp": int(timestamp or 0),
+                "likes": int(likes or 0),
+                "replies": int(replies or 0)
+            })
+            if content is not None:
+                post["content"] = content
+            self.posts[post_id] = post
+            self.author_posts.setdefault(author.lower(), set()).add(post_id)
+            self._rescore(post_id, time.time())
+
+    def add_like(self, post_id, delta=1):
+        with self._lock:
+            post = self.posts.get(post_id)
+            if post:
+                post["likes"] = max(post["likes"] + delta, 0)
+                self._rescore(post_id, time.time())
+
+    def set_flagged(self, post_id, flagged=True):
+        with self._lock:
+            post = self.posts.get(post_id)
+            if post and post["flagged"] != flagged:
+                post["flagged"] = flagged
+                self._rescore(post_id, time.time())
+
+    def set_reputation(self, author, reputation):
+        with self._lock:
+            key = author.lower()
+            if self.author_reputation.get(key) == reputation:
+                return
+            self.author_reputation[key] = reputation
+            now = time.time()
+            for post_id in list(self.author_posts.get(key, ())):
+                self._rescore(post_id, now)
+
+    def unknown_authors(self, authors):
+        """Authors whose reputation has not been loaded yet"""
+        with self._lock:
+            return sorted({a for a in authors if a.lower() not in self.author_reputation})
+
+    # --- ranking maintenance --------------------------------------------------
+
+    def _score(self, post, now):
+        return post_score(post, self.author_reputation.get(post["author"].lower(), 0), now)
+
+    def _remove_key(self, post_id):
+        key = self._keys.pop(post_id, None)
+        if key is not None:
+            index = bisect.bisect_left(self._ranked, key)
+            if index < len(self._ranked) and self._ranked[index] == key:
+                del self._ranked[index]
+
+    def _evict(self, post_id):
+        post = self.posts.pop(post_id, None)
+        if post is None:
+            return
+        author = post["author"].lower()
+        ids = self.author_posts.get(author)
+        if ids is not None:
+            ids.discard(post_id)
+            if not ids:
+                del self.author_posts[author]
+        self.evicted += 1
+
+    def _rescore(self, post_id, now):
+        self._remove_key(post_id)
+        key = (-self._score(self.posts[post_id], now), -post_id)
+        if len(self._ranked) >= self.capacity and key >= self._ranked[-1]:
+            self._evict(post_id)  # Not good enough for the top K or the margin behind it
+            return
+        bisect.insort(self._ranked, key)
+        self._keys[post_id] = key
+        while len(self._ranked) > self.capacity:
+            dropped = self._ranked.pop()
+            self._keys.pop(-dropped[1], None)
+            self._evict(-dropped[1])
+
+    def _top_authors(self):
+        """Checksummed authors of tracked posts, highest reputation first"""
+        authors = {}
+        for post in self.posts.values():
+            authors.setdefault(post["author"].lower(), post["author"])
+        ranked = sorted(authors, key=lambda a: self.author_reputation.get(a, 0), reverse=True)
+        return [authors[a] for a in ranked[:self.candidate_authors]]
+
+    def _rebuild(self, now):
+        """Re-rank tracked posts plus store candidates; the candidate query runs outside the lock"""
+        candidates = []
+        if self.load_candidates:
+            with self._lock:
+                authors = self._top_authors()
+            candidates = self.load_candidates(self.capacity, authors)
+        with self._lock:
+            for post in candidates:
+                # id, author, content, flagged, timestamp, likes, replies; tracked copies are fresher
+                if post[0] not in self.posts:
+                    self.posts[post[0]] = {
+                        "id": post[0], "author": post[1], "content": post[2], "flagged": bool(post[3]),
+                        "timestamp": int(post[4] or 0), "likes": int(post[5] or 0), "replies": int(post[6] or 0)
+                    }
+            scored = ((-self._score(post, now), -post_id) for post_id, post in self.posts.items())
+            self._ranked = heapq.nsmallest(self.capacity, scored)
+            self._keys = {-key[1]: key for key in self._ranked}
+            self.posts = {post_id: self.posts[post_id] for post_id in self._keys}
+            self.author_posts = {}
+            for post_id, post in self.posts.items():
+                self.author_posts.setdefault(post["author"].lower(), set()).add(post_id)
+            # Reputation is only needed for authors still in the index
+            self.author_reputation = {
+                a: score for a, score in self.author_reputation.items() if a in self.author_posts
+            }
+            self._last_rebuild = self._last_rescore = now
+
+    def refresh(self, now=None, force_rebuild=False):
+        """Apply recency decay: rescore the tracked posts often, rebuild from store candidates rarely"""
+        now = now or time.time()
+        if force_rebuild or now - self._last_rebuild >= self.rebuild_interval:
+            self._rebuild(now)
+            return
+        with self._lock:
+            if now - self._last_rescore >= self.rescore_interval:
+                self._ranked = sorted((-self._score(self.posts[-k[1]], now), k[1]) for k in self._ranked)
+                self._keys = {-key[1]: key for key in self._ranked}
+                self._last_rescore = now
+
+    # --- reads ----------------------------------------------------------------
+
+    def page(self, limit=20, cursor=None):
+        """Return (posts, next_cursor) for one page of the ranked feed (the top K only)"""
+        with self._lock:
+            ranked = self._ranked[:self.top_k]
+            start = 0
+            if cursor:
+                start = bisect.bisect_right(ranked, decode_cursor(cursor))
+            keys = ranked[start:start + limit]
+            items = []
+            for key in keys:
+                post = dict(self.posts[-key[1]])
+                post["rankingScore"] = round(-key[0], 4)
+                post["authorReputation"] = self.author_reputation.get(post["author"].lower(), 0)
+                items.append(post)
+            has_more = start + limit < len(ranked)
+            next_cursor = encode_cursor(keys[-1]) if keys and has_more else None
+            return items, next_cursor
+
+    def stats(self):
+        with self._lock:
+            return {
+                "posts_indexed": len(self.posts),
+                "authors": len(self.author_posts),
+                "ranked": min(len(self._ranked), self.top_k),
+                "top_k": self.top_k,
+                "capacity": self.capacity,
+                "evicted": self.evicted,
+                "last_rescore": self._last_rescore or None,
+                "last_rebuild": self._last_rebuild or None
+            }
@@ -1,9 +1,8 @@
-import json
 import os
-from pathlib import Path
 from dotenv import load_dotenv
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
+
+from agent_client import connect, load_abi
 
 load_dotenv()
 
@@ -12,13 +11,9 @@ CHAIN_ID = int(os.getenv("CHAIN_ID", "0") or 0)
 MODERATOR_ADDR = Web3.to_checksum_address(os.getenv("MODERATOR_ADDRESS", ""))
 AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY", "")
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-with open(ABI_DIR / "Moderator.json", "r", encoding="utf-8") as f:
-    MOD_ABI = json.load(f)
+MOD_ABI = load_abi("Moderator.json")
 
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL))
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+w3 = connect(SOMNIA_RPC_URL)
 
 acct = w3.eth.account.from_key(bytes.fromhex(AGENT_PRIV))
 moderator = w3.eth.contract(address=MODERATOR_ADDR, abi=MOD_ABI)
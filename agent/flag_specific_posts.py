@@ -1,12 +1,12 @@
 """
 Simple script to manually flag specific posts by ID
 """
-import json
 import os
-from pathlib import Path
 from dotenv import load_dotenv
 from web3 import Web3
 
+from agent_client import connect, load_abi
+
 load_dotenv()
 
 SOMNIA_RPC_URL = os.getenv("SOMNIA_RPC_URL", "")
@@ -18,27 +18,10 @@ MODERATOR_ADDR = Web3.to_checksum_address(
 AGENT_PRIV = os.getenv("AGENT_PRIVATE_KEY", "")
 
 # Read ABI
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-def load_abi(filename):
-    with open(ABI_DIR / filename, "r", encoding="utf-8") as f:
-        artifact = json.load(f)
-        if isinstance(artifact, dict) and 'abi' in artifact:
-            return artifact['abi']
-        return artifact
-
 MOD_ABI = load_abi("Moderator.json")
 
-# Web3 setup
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL))
-
-# Handle PoA middleware
-try:
-    from web3.middleware import geth_poa_middleware
-    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-except:
-    pass
+# Web3 setup (PoA middleware included)
+w3 = connect(SOMNIA_RPC_URL)
 
 acct = w3.eth.account.from_key(bytes.fromhex(AGENT_PRIV))
 moderator = w3.eth.contract(address=MODERATOR_ADDR, abi=MOD_ABI)
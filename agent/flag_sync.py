@@ -0,0 +1,80 @@
+"""
+Flagged-post set reconciled from contract events.
+
+Moderator.PostFlagged and SocialPosts.PostFlagged logs are the record of
+which posts are flagged. On startup every log since the last synced block
+(or the configured start block on a fresh data dir) is replayed into the
+decision cache; after that each pass only fetches the blocks it hasn't seen.
+The agent checks this set before any flag transaction work instead of
+finding out about duplicates from a reverted gas estimate. Flags from blocks
+dropped by a reorg are cleared again before the new logs are replayed.
+"""
+
+from block_cursor import BlockCursor
+from chain_events import EventPoller, DEFAULT_MAX_BLOCK_RANGE
+
+
+class FlagSync:
+    """Keeps decision_cache.flagged current from PostFlagged logs, with a persisted block cursor"""
+
+    def __init__(self, w3, decision_cache, state_path=None, start_block=None,
+                 max_block_range=DEFAULT_MAX_BLOCK_RANGE, reorg_history=128, exclude=None):
+        self.decision_cache = decision_cache
+        self.exclude = exclude      # callable(post_id) -> True for posts unflagged off-chain (appeals)
+        self.cursor = BlockCursor(w3, start_block, state_path, history=reorg_history)
+        self.poller = EventPoller(w3, max_block_range=max_block_range, cursor=self.cursor)
+        self.poller.on_reorg(self._on_reorg)
+        self.stats = {"events": 0, "new_flags": 0, "syncs": 0, "reverted_flags": 0}
+
+    def watch(self, contract, handler=None):
+        """Track contract's PostFlagged events; handler(event) also sees each one"""
+        subscribed = self.poller.subscribe(contract, "PostFlagged", self._on_flagged)
+        if subscribed and handler:
+            self.poller.subscribe(contract, "PostFlagged", handler)
+        return subscribed
+
+    def _on_flagged(self, event):
+        post_id = event["args"]["id"]
+        self.stats["events"] += 1
+        if self.exclude and self.exclude(post_id):
+            return
+        if post_id not in self.decision_cache.flagged:
+            self.decision_cache.mark_flagged(post_id)
+            self.stats["new_flags"] += 1
+
+    def _on_reorg(self, fork_block, removed):
+        # Replayed logs re-mark every flag that survived on the new chain
+        for event in removed:
+            if event["event"] == "PostFlagged":
+                self.decision_cache.unmark_flagged(event["args"]["id"])
+                self.stats["reverted_flags"] += 1
+
+    def on_reorg(self, handler):
+        """handler(fork_block, removed_events) runs after the flagged bits are cleared"""
+        self.poller.on_reorg(handler)
+
+    def is_flagged(self, post_id):
+        return self.decision_cache.is_flagged(post_id)
+
+    @property
+    def synced_block(self):
+        return self.poller.last_block
+
+    def sync(self, to_block=None):
+        """Apply PostFlagged logs up to to_block (default: head); returns the number of events"""
+        before = self.poller.last_block
+        count = self.poller.poll(to_block)
+        self.stats["syncs"] += 1
+        if self.poller.last_block != before:
+            # Bits first, cursor second: a crash in between only replays a few blocks
+            self.decision_cache.save_if_dirty()
+            self.cursor.save()
+        return count
+
+    def snapshot(self):
+        return {
+            "synced_block": self.poller.last_block,
+            "flagged": len(self.decision_cache.flagged),
+            "cursor": self.cursor.snapshot(),
+            **self.stats
+        }
@@ -0,0 +1,158 @@
+"""
+Gas limits and fees for agent transactions.
+
+Gas estimates are cached per contract function (and batch size) and only
+re-estimated periodically, the chain id is read once, and fees are derived
+from recent blocks: EIP-1559 maxFeePerGas / maxPriorityFeePerGas from
+eth_feeHistory where the chain has a base fee, otherwise the node's legacy
+gas price. This replaces the hardcoded gasPrice / gas values.
+"""
+
+import math
+import threading
+import time
+
+GWEI = 10 ** 9
+
+
+def function_key(contract_fn):
+    """Cache key for a bound contract call: address, function name and batch size"""
+    args = getattr(contract_fn, "args", None) or ()
+    batch = next((len(arg) for arg in args if isinstance(arg, (list, tuple))), 0)
+    return (contract_fn.address, contract_fn.fn_name, batch)
+
+
+class GasStrategy:
+    """Cached gas estimates, chain id and fee oracle shared by every tx path"""
+
+    def __init__(self, w3, chain_id=None, estimate_ttl=600, fee_ttl=12, gas_buffer=1.2,
+                 fee_history_blocks=10, priority_percentile=50, base_fee_multiplier=2,
+                 max_fee_gwei=None, fallback_gas_price_gwei=10):
+        self.w3 = w3
+        self._chain_id = chain_id or None
+        self.estimate_ttl = estimate_ttl
+        self.fee_ttl = fee_ttl
+        self.gas_buffer = gas_buffer
+        self.fee_history_blocks = fee_history_blocks
+        self.priority_percentile = priority_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.max_fee = int(max_fee_gwei * GWEI) if max_fee_gwei else None
+        self.fallback_gas_price = int(fallback_gas_price_gwei * GWEI)
+        self.eip1559 = None               # Unknown until the first fee_history answer
+        self._estimates = {}              # function key -> (expires_at, gas limit)
+        self._fees = (0, None)            # (expires_at, fee params)
+        self._lock = threading.Lock()
+        self.stats = {"estimates": 0, "estimate_hits": 0, "fee_refreshes": 0}
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    # --- gas limits -------------------------------------------------------------
+
+    def gas_limit(self, contract_fn, sender, refresh=False):
+        """Buffered gas limit for contract_fn, estimating only when the cache entry is stale"""
+        key = function_key(contract_fn)
+        now = time.time()
+        with self._lock:
+            entry = self._estimates.get(key)
+            if entry and entry[0] > now and not refresh:
+                self.stats["estimate_hits"] += 1
+                return entry[1]
+        # Estimation reverts on calls that would fail (e.g. already flagged) - let that propagate
+        gas = int(contract_fn.estimate_gas({"from": sender}) * self.gas_buffer)
+        with self._lock:
+            self.stats["estimates"] += 1
+            cached = self._estimates.get(key)
+            # Keep the largest recent estimate so a cheap call doesn't under-gas an expensive one
+            if cached and cached[0] > now:
+                gas = max(gas, cached[1])
+            self._estimates[key] = (now + self.estimate_ttl, gas)
+        return gas
+
+    def invalidate(self, contract_fn):
+        """Forget a cached estimate (e.g. after a revert) so the next send re-estimates"""
+        with self._lock:
+            self._estimates.pop(function_key(contract_fn), None)
+
+    # --- fees ---------------------------------------------------------------------
+
+    def _fee_history_fees(self):
+        history = self.w3.eth.fee_history(self.fee_history_blocks, "latest", [self.priority_percentile])
+        base_fees = history.get("baseFeePerGas") or []
+        if not base_fees or base_fees[-1] is None:
+            return None
+        next_base_fee = base_fees[-1]  # The last entry is the base fee of the next block
+        tips = sorted(reward[0] for reward in history.get("reward") or [] if reward)
+        priority = tips[len(tips) // 2] if tips else GWEI
+        priority = max(priority, 1)
+        return {
+            "maxPriorityFeePerGas": priority,
+            "maxFeePerGas": next_base_fee * self.base_fee_multiplier + priority
+        }
+
+    def _compute_fees(self):
+        if self.eip1559 is not False:
+            try:
+                fees = self._fee_history_fees()
+                self.eip1559 = fees is not None
+                if fees:
+                    return fees
+            except Exception:
+                self.eip1559 = False
+        try:
+            return {"gasPrice": self.w3.eth.gas_price}
+        except Exception:
+            return {"gasPrice": self.fallback_gas_price}
+
+    def _cap(self, fees):
+        if not self.max_fee:
+            return fees
+        capped = {name: min(value, self.max_fee) for name, value in fees.items()}
+        if "maxPriorityFeePerGas" in capped:
+            capped["maxPriorityFeePerGas"] = min(capped["maxPriorityFeePerGas"], capped["maxFeePerGas"])
+        return capped
+
+    def fees(self, refresh=False):
+        """Fee fields for a transaction dict: EIP-1559 pair or legacy gasPrice"""
+        now = time.time()
+        with self._lock:
+            if self._fees[1] and self._fees[0] > now and not refresh:
+                return dict(self._fees[1])
+        fees = self._cap(self._compute_fees())
+        with self._lock:
+            self._fees = (now + self.fee_ttl, fees)
+            self.stats["fee_refreshes"] += 1
+        return dict(fees)
+
+    def bump(self, previous, factor=1.125):
+        """Replacement fees: at least `factor` above the previous tx and no lower than current fees"""
+        current = self.fees()
+        bumped = {}
+        for name, value in previous.items():
+            bumped[name] = max(int(math.ceil(value * factor)), current.get(name, 0))
+        if "maxPriorityFeePerGas" in bumped and bumped["maxPriorityFeePerGas"] > bumped.get("maxFeePerGas", 0):
+            bumped["maxFeePerGas"] = bumped["maxPriorityFeePerGas"]
+        return bumped
+
+    def tx_params(self, contract_fn, sender, nonce, gas=None, fees=None):
+        """Everything build_transaction needs besides the call itself"""
+        return {
+            "from": sender,
+            "nonce": nonce,
+            "chainId": self.chain_id,
+            "gas": gas or self.gas_limit(contract_fn, sender),
+            **(fees or self.fees())
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "chain_id": self._chain_id,
+                "eip1559": self.eip1559,
+                "fees": self._fees[1],
+                "cached_estimates": len(self._estimates),
+                **self.stats
+            }
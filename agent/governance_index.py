@@ -0,0 +1,228 @@
+"""
+In-memory index of GovernanceSystem appeals.
+
+Appeal state is read once (appealCounter + every appeals(id), batched
+through Multicall3) at the event cursor's block, then kept current from
+AppealCreated / VoteCast / AppealResolved / PostUnflagged logs, so the API
+serves live tallies without per-appeal reads. PostUnflagged is only an event
+on-chain (SocialPosts has no unflag), so the agent applies it to its own
+flagged set through the on_unflag callback.
+"""
+
+import threading
+import time
+
+APPEAL_FIELDS = ("post_id", "appellant", "reason", "created_at", "voting_ends",
+                 "resolved", "upheld", "total_votes", "yes_votes", "no_votes")
+
+SEED_BATCH_SIZE = 200
+
+
+def appeal_status(appeal, now=None):
+    now = time.time() if now is None else now
+    if appeal["resolved"]:
+        return "upheld" if appeal["upheld"] else "rejected"
+    return "active" if now <= appeal["voting_ends"] else "awaiting_resolution"
+
+
+class GovernanceIndex:
+    """Appeals, tallies and unflag decisions mirrored from GovernanceSystem events"""
+
+    def __init__(self, governance_contract, multicall=None, on_unflag=None, on_appeal=None):
+        self.governance = governance_contract
+        self.multicall = multicall
+        self.on_unflag = on_unflag          # callable(post_id, unflagged) - False undoes a reorged-out unflag
+        self.on_appeal = on_appeal          # callable(appeal_id, appeal or None) when an appeal opens, resolves or vanishes
+        self.appeals = {}                   # appeal id -> appeal dict
+        self.unflagged = set()              # post ids unflagged by an upheld appeal
+        self.quorum_votes = None            # getEligibleVoterCount() * quorumPercentage / 100
+        self.seeded_block = None
+        self._lock = threading.Lock()
+        self.stats = {"seed_reads": 0, "appeal_reads": 0, "events": 0}
+
+    def subscribe(self, poller):
+        poller.subscribe(self.governance, "AppealCreated", self._on_appeal_created)
+        poller.subscribe(self.governance, "VoteCast", self._on_vote_cast)
+        poller.subscribe(self.governance, "AppealResolved", self._on_appeal_resolved)
+        poller.subscribe(self.governance, "PostUnflagged", self._on_post_unflagged)
+        poller.on_reorg(self._on_reorg)
+
+    # --- reads ----------------------------------------------------------------
+
+    def _read_appeals(self, appeal_ids, block_identifier):
+        calls = [(self.governance, "appeals", [appeal_id]) for appeal_id in appeal_ids]
+        if self.multicall:
+            results = self.multicall.call(calls, block_identifier)
+        else:
+            results = []
+            for _, _, args in calls:
+                try:
+                    results.append((True, self.governance.functions.appeals(*args).call(block_identifier=block_identifier)))
+                except Exception:
+                    results.append((False, None))
+        appeals = {}
+        for appeal_id, (ok, value) in zip(appeal_ids, results):
+            if ok:
+                appeals[appeal_id] = {"id": appeal_id, **dict(zip(APPEAL_FIELDS, value))}
+        return appeals
+
+    def seed(self, block_identifier="latest"):
+        """Load every appeal as of block_identifier; events after that block are applied on top"""
+        count = self.governance.functions.appealCounter().call(block_identifier=block_identifier)
+        appeals = {}
+        for start in range(1, count + 1, SEED_BATCH_SIZE):
+            appeals.update(self._read_appeals(list(range(start, min(start + SEED_BATCH_SIZE, count + 1))), block_identifier))
+            self.stats["seed_reads"] += 1
+        try:
+            eligible = self.governance.functions.getEligibleVoterCount().call(block_identifier=block_identifier)
+            quorum = self.governance.functions.quorumPercentage().call(block_identifier=block_identifier)
+            self.quorum_votes = eligible * quorum // 100
+        except Exception as e:
+            print(f"Warning: Could not read governance quorum: {e}")
+        with self._lock:
+            self.appeals = appeals
+            unflagged = {a["post_id"] for a in appeals.values() if a["resolved"] and a["upheld"]}
+            newly_unflagged = unflagged - self.unflagged
+            self.unflagged = unflagged
+            self.seeded_block = block_identifier
+        for post_id in newly_unflagged:
+            self._notify(post_id, True)
+        for appeal_id, appeal in appeals.items():
+            self._appeal_changed(appeal_id, appeal)
+        print(f"⚖️ Governance index seeded with {len(appeals)} appeals ({len(unflagged)} posts unflagged)")
+        return len(appeals)
+
+    # --- events ---------------------------------------------------------------
+
+    def _notify(self, post_id, unflagged):
+        if self.on_unflag:
+            try:
+                self.on_unflag(post_id, unflagged)
+            except Exception as e:
+                print(f"⚠️ Could not apply governance decision for post {post_id}: {e}")
+
+    def _appeal_changed(self, appeal_id, appeal):
+        if self.on_appeal:
+            try:
+                self.on_appeal(appeal_id, appeal)
+            except Exception as e:
+                print(f"⚠️ Appeal #{appeal_id} listener error: {e}")
+
+    def _on_appeal_created(self, event):
+        appeal_id = event["args"]["appealId"]
+        self.stats["events"] += 1
+        # The event carries no deadline or reason: one read per appeal, at its creation block
+        appeal = self._read_appeals([appeal_id], event["blockNumber"]).get(appeal_id)
+        self.stats["appeal_reads"] += 1
+        if appeal is None:
+            appeal = {
+                "id": appeal_id, "post_id": event["args"]["postId"], "appellant": event["args"]["appellant"],
+                "reason": "", "created_at": 0, "voting_ends": 0, "resolved": False, "upheld": False,
+                "total_votes": 0, "yes_votes": 0, "no_votes": 0
+            }
+        with self._lock:
+            self.appeals[appeal_id] = appeal
+        self._appeal_changed(appeal_id, appeal)
+
+    def _on_vote_cast(self, event, sign=1):
+        args = event["args"]
+        self.stats["events"] += 1
+        with self._lock:
+            appeal = self.appeals.get(args["appealId"])
+            if appeal is None:
+                return
+            weight = sign * args["weight"]
+            appeal["total_votes"] += weight
+            appeal["yes_votes" if args["vote"] else "no_votes"] += weight
+
+    def _on_appeal_resolved(self, event):
+        args = event["args"]
+        self.stats["events"] += 1
+        with self._lock:
+            appeal = self.appeals.get(args["appealId"])
+            if appeal is not None:
+                appeal["resolved"] = True
+                appeal["upheld"] = args["upheld"]
+                appeal["total_votes"] = args["totalVotes"]
+        if appeal is not None:
+            self._appeal_changed(args["appealId"], appeal)
+
+    def _on_post_unflagged(self, event):
+        post_id = event["args"]["postId"]
+        self.stats["events"] += 1
+        with self._lock:
+            if post_id in self.unflagged:
+                return
+            self.unflagged.add(post_id)
+        print(f"⚖️ Post {post_id} unflagged by appeal #{event['args']['appealId']}")
+        self._notify(post_id, True)
+
+    def _on_reorg(self, fork_block, removed):
+        for event in reversed(removed):
+            name, args = event["event"], event["args"]
+            if name == "AppealCreated":
+                with self._lock:
+                    self.appeals.pop(args["appealId"], None)
+                self._appeal_changed(args["appealId"], None)
+            elif name == "VoteCast":
+                self._on_vote_cast(event, sign=-1)
+            elif name == "AppealResolved":
+                with self._lock:
+                    appeal = self.appeals.get(args["appealId"])
+                    if appeal is not None:
+                        appeal["resolved"] = appeal["upheld"] = False
+                if appeal is not None:
+                    self._appeal_changed(args["appealId"], appeal)
+            elif name == "PostUnflagged":
+                with self._lock:
+                    self.unflagged.discard(args["postId"])
+                self._notify(args["postId"], False)
+
+    # --- queries ----------------------------------------------------------------
+
+    def is_unflagged(self, post_id):
+        return post_id in self.unflagged
+
+    def _view(self, appeal, now):
+        view = dict(appeal)
+        view["status"] = appeal_status(appeal, now)
+        view["time_left"] = max(appeal["voting_ends"] - int(now), 0) if not appeal["resolved"] else 0
+        total = appeal["total_votes"]
+        view["yes_percentage"] = appeal["yes_votes"] * 100 // total if total else 0
+        view["no_percentage"] = appeal["no_votes"] * 100 // total if total else 0
+        if self.quorum_votes is not None:
+            view["quorum_met"] = total >= self.quorum_votes
+        return view
+
+    def list_appeals(self, status=None, limit=100):
+        """Newest first; status filters on active / awaiting_resolution / upheld / rejected"""
+        now = time.time()
+        with self._lock:
+            appeals = sorted(self.appeals.values(), key=lambda a: a["id"], reverse=True)
+            views = [self._view(a, now) for a in appeals]
+        if status:
+            views = [v for v in views if v["status"] == status]
+        return views[:limit]
+
+    def get(self, appeal_id):
+        with self._lock:
+            appeal = self.appeals.get(appeal_id)
+            return self._view(appeal, time.time()) if appeal else None
+
+    def counts(self):
+        now = time.time()
+        counts = {}
+        with self._lock:
+            for appeal in self.appeals.values():
+                status = appeal_status(appeal, now)
+                counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def snapshot(self):
+        return {
+            "appeals": len(self.appeals),
+            "unflagged_posts": len(self.unflagged),
+            "seeded_block": self.seeded_block,
+            "quorum_votes": self.quorum_votes,
+            **self.stats
+        }
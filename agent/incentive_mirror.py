@@ -0,0 +1,235 @@
+"""
+Local mirror of IncentiveSystem reward eligibility.
+
+canClaimReward and calculatePostReward depend on a handful of per-user
+values (lastRewardTime, dailyRewardCount, lastRewardDay, lastProcessedPost),
+the user's post list and flags, the user's tier and four contract
+parameters. Those are read once per user in a single Multicall3 batch and
+then kept current from the agent's own ingestion, so eligibility and the
+pending reward are evaluated without any RPC. A RewardClaimed /
+EngagementReward event marks the user stale; the next batch re-reads them.
+"""
+
+import threading
+import time
+
+from web3 import Web3
+
+SECONDS_PER_DAY = 86400
+DEFAULT_PARAMS = {
+    "base_reward": 10 ** 18,
+    "tier_multiplier": 50,
+    "max_daily": 10,
+    "min_interval": 300
+}
+
+
+class UserRewardState:
+    __slots__ = ("last_reward_time", "daily_count", "last_reward_day", "last_processed", "posts", "tier")
+
+    def __init__(self, last_reward_time, daily_count, last_reward_day, last_processed, posts, tier):
+        self.last_reward_time = last_reward_time
+        self.daily_count = daily_count
+        self.last_reward_day = last_reward_day
+        self.last_processed = last_processed   # index into the user's post list
+        self.posts = list(posts)               # SocialPosts.getUserPosts, in creation order
+        self.tier = tier
+
+
+class IncentiveMirror:
+    """Per-user claim state mirrored from IncentiveSystem, evaluated locally"""
+
+    def __init__(self, incentive_contract, social_contract, reputation_contract, multicall,
+                 is_flagged, tier_of=None, params_ttl=3600):
+        self.incentive = incentive_contract
+        self.social = social_contract
+        self.reputation = reputation_contract
+        self.multicall = multicall
+        self.is_flagged = is_flagged        # callable(post_id) -> on-chain flagged state
+        self.tier_of = tier_of              # optional callable(user) -> current getUserTier without RPC, or None
+        self.params_ttl = params_ttl
+        self.params = dict(DEFAULT_PARAMS)
+        self._params_expire = 0
+        self._users = {}                    # lowercase address -> UserRewardState
+        self._stale = set()                 # lowercase addresses to re-read
+        self._candidates = {}               # lowercase address -> checksum address with new safe posts
+        self._queued = set()                # lowercase addresses with a distribution in flight
+        self._lock = threading.RLock()
+        self.stats = {"loads": 0, "batched_reads": 0, "evaluations": 0}
+
+    # --- loading ----------------------------------------------------------------
+
+    def _param_calls(self):
+        return [
+            (self.incentive, "baseRewardPerPost", []),
+            (self.incentive, "tierMultiplier", []),
+            (self.incentive, "maxDailyRewards", []),
+            (self.incentive, "minTimeBetweenRewards", [])
+        ]
+
+    def load(self, users, force=False):
+        """Read claim state for users not yet mirrored (or stale) in one batched call"""
+        with self._lock:
+            missing = {}
+            for user in users:
+                key = user.lower()
+                if force or key not in self._users or key in self._stale:
+                    missing[key] = Web3.to_checksum_address(user)
+            refresh_params = time.time() >= self._params_expire
+        if not missing and not refresh_params:
+            return 0
+        calls = self._param_calls() if refresh_params else []
+        for address in missing.values():
+            calls += [
+                (self.incentive, "lastRewardTime", [address]),
+                (self.incentive, "dailyRewardCount", [address]),
+                (self.incentive, "lastRewardDay", [address]),
+                (self.incentive, "lastProcessedPost", [address]),
+                (self.social, "getUserPosts", [address]),
+                (self.reputation, "getUserTier", [address])
+            ]
+        results = self.multicall.call(calls)
+        self.stats["batched_reads"] += 1
+        with self._lock:
+            if refresh_params:
+                values = [value for _, value in results[:4]]
+                if all(ok for ok, _ in results[:4]):
+                    self.params = dict(zip(("base_reward", "tier_multiplier", "max_daily", "min_interval"), values))
+                self._params_expire = time.time() + self.params_ttl
+                results = results[4:]
+            loaded = 0
+            for index, (key, address) in enumerate(missing.items()):
+                chunk = results[index * 6:(index + 1) * 6]
+                if not all(ok for ok, _ in chunk[:5]):
+                    continue
+                (_, last_time), (_, daily), (_, last_day), (_, processed), (_, posts), (tier_ok, tier) = chunk
+                self._users[key] = UserRewardState(last_time, daily, last_day, processed, posts, tier if tier_ok else 0)
+                self._stale.discard(key)
+                self._queued.discard(key)
+                loaded += 1
+            self.stats["loads"] += loaded
+        return loaded
+
+    # --- updates from ingestion and events ------------------------------------------
+
+    def record_post(self, author, post_id):
+        """A post by author was ingested; only mirrored users need the append"""
+        with self._lock:
+            state = self._users.get(author.lower())
+            if state is not None and (not state.posts or post_id > state.posts[-1]):
+                state.posts.append(post_id)
+
+    def mark_candidate(self, author):
+        """author has a new safe post and may be owed a reward"""
+        with self._lock:
+            self._candidates[author.lower()] = author
+
+    def mark_stale(self, user):
+        with self._lock:
+            self._stale.add(user.lower())
+
+    def on_reward_event(self, event):
+        """RewardClaimed / EngagementReward handler for chain_events.EventPoller"""
+        self.mark_stale(event["args"]["user"])
+
+    def release(self, users):
+        """A queued distribution was dropped; let the users be picked again"""
+        with self._lock:
+            for user in users:
+                self._queued.discard(user.lower())
+
+    # --- evaluation -------------------------------------------------------------
+
+    def _tier(self, user, state):
+        """tier_of's answer when it has one, else the mirrored getUserTier read"""
+        if self.tier_of:
+            try:
+                tier = self.tier_of(user)
+                if tier is not None:
+                    return tier
+            except Exception as e:
+                print(f"Warning: Could not project tier for {user}: {e}")
+        return state.tier
+
+    def evaluate(self, user, now=None):
+        """canClaimReward + the pending post reward, from mirrored state only (None if not mirrored)"""
+        now = int(time.time() if now is None else now)
+        with self._lock:
+            state = self._users.get(user.lower())
+            if state is None:
+                return None
+            self.stats["evaluations"] += 1
+            params = self.params
+            next_claim = state.last_reward_time + params["min_interval"]
+            day = now // SECONDS_PER_DAY
+            daily_left = params["max_daily"] - state.daily_count if day == state.last_reward_day else params["max_daily"]
+            can_claim = now >= next_claim and daily_left > 0
+            # Mirrors claimPostRewards: up to maxDailyRewards unflagged posts since lastProcessedPost
+            rewarded = 0
+            for post_id in state.posts[state.last_processed:]:
+                if rewarded >= params["max_daily"]:
+                    break
+                if not self.is_flagged(post_id):
+                    rewarded += 1
+            tier = self._tier(user, state)
+            per_post = params["base_reward"] + params["base_reward"] * tier * params["tier_multiplier"] // 100
+            return {
+                "address": Web3.to_checksum_address(user),
+                "eligible": can_claim and rewarded > 0,
+                "can_claim": can_claim,
+                "pending_posts": rewarded,
+                "pending_reward": str(rewarded * per_post),
+                "reward_per_post": str(per_post),
+                "next_claim_time": max(next_claim, now),
+                "daily_rewards_left": max(daily_left, 0),
+                "tier": tier,
+                "queued": user.lower() in self._queued,
+                "stale": user.lower() in self._stale
+            }
+
+    def evaluate_many(self, users, now=None):
+        """Load unknown users in one batch, then evaluate everyone locally"""
+        self.load(users)
+        results = {}
+        for user in users:
+            result = self.evaluate(user, now)
+            if result is not None:
+                results[result["address"]] = result
+        return results
+
+    def take_eligible(self, limit):
+        """Pop up to limit candidates that are eligible right now and mark them queued"""
+        with self._lock:
+            candidates = list(self._candidates.values())
+        if not candidates:
+            return []
+        self.load(candidates)
+        chosen = []
+        now = int(time.time())
+        with self._lock:
+            for user in candidates:
+                key = user.lower()
+                if key in self._queued or key in self._stale:
+                    continue
+                result = self.evaluate(user, now)
+                if result is None:
+                    continue
+                if result["pending_posts"] == 0:
+                    self._candidates.pop(key, None)  # Nothing owed until the next safe post
+                    continue
+                if result["eligible"] and len(chosen) < limit:
+                    self._candidates.pop(key, None)
+                    self._queued.add(key)
+                    chosen.append(result["address"])
+        return chosen
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "candidates": len(self._candidates),
+                "queued": len(self._queued),
+                "stale": len(self._stale),
+                "params": {name: str(value) for name, value in self.params.items()},
+                **self.stats
+            }
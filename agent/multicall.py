@@ -0,0 +1,119 @@
+"""
+Batched contract reads through Multicall3.
+
+Many view calls (possibly against different contracts) are packed into one
+aggregate3 eth_call. When Multicall3 is not deployed on the chain the same
+calls are made one by one, so callers never need a separate code path.
+"""
+
+from web3 import Web3
+
+# Multicall3 is deployed at the same address on most EVM chains
+DEFAULT_MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [{
+    "name": "aggregate3",
+    "type": "function",
+    "stateMutability": "payable",
+    "inputs": [{
+        "name": "calls",
+        "type": "tuple[]",
+        "components": [
+            {"name": "target", "type": "address"},
+            {"name": "allowFailure", "type": "bool"},
+            {"name": "callData", "type": "bytes"}
+        ]
+    }],
+    "outputs": [{
+        "name": "returnData",
+        "type": "tuple[]",
+        "components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"}
+        ]
+    }]
+}]
+
+
+def encode_call(contract, fn_name, args):
+    """ABI-encode a contract call (web3 v6 and v7+ spell this differently)"""
+    if hasattr(contract, "encode_abi"):
+        return contract.encode_abi(fn_name, args=args)
+    return contract.encodeABI(fn_name=fn_name, args=args)
+
+
+def _abi_type(param):
+    if param["type"].startswith("tuple"):
+        inner = ",".join(_abi_type(c) for c in param["components"])
+        return f"({inner}){param['type'][len('tuple'):]}"
+    return param["type"]
+
+
+def output_types(contract, fn_name):
+    for item in contract.abi:
+        if item.get("type") == "function" and item.get("name") == fn_name:
+            return [_abi_type(o) for o in item.get("outputs", [])]
+    raise ValueError(f"Function {fn_name} not found in contract ABI")
+
+
+class Multicall:
+    """Run many (contract, function, args) view calls in one eth_call"""
+
+    def __init__(self, w3, address=None):
+        self.w3 = w3
+        self.contract = w3.eth.contract(
+            address=Web3.to_checksum_address(address or DEFAULT_MULTICALL3_ADDRESS),
+            abi=MULTICALL3_ABI
+        )
+        self._available = None
+        self._types = {}  # (contract address, fn name) -> output types
+        self.rpc_calls = 0
+
+    def available(self):
+        if self._available is None:
+            try:
+                self._available = len(self.w3.eth.get_code(self.contract.address)) > 0
+            except Exception:
+                self._available = False
+            if not self._available:
+                print("⚠️ Multicall3 not found on this chain, batched reads fall back to individual calls")
+        return self._available
+
+    def _decode(self, contract, fn_name, data):
+        key = (contract.address, fn_name)
+        if key not in self._types:
+            self._types[key] = output_types(contract, fn_name)
+        decoded = self.w3.codec.decode(self._types[key], data)
+        return decoded[0] if len(decoded) == 1 else decoded
+
+    def call(self, calls, block_identifier="latest"):
+        """
+        calls: list of (contract, fn_name, args). Returns a list of
+        (success, value) in the same order; failed calls have value None.
+        """
+        if not calls:
+            return []
+        if not self.available():
+            results = []
+            for contract, fn_name, args in calls:
+                self.rpc_calls += 1
+                try:
+                    value = getattr(contract.functions, fn_name)(*args).call(block_identifier=block_identifier)
+                    results.append((True, value))
+                except Exception:
+                    results.append((False, None))
+            return results
+
+        packed = [(contract.address, True, encode_call(contract, fn_name, list(args))) for contract, fn_name, args in calls]
+        self.rpc_calls += 1
+        returned = self.contract.functions.aggregate3(packed).call(block_identifier=block_identifier)
+        results = []
+        for (contract, fn_name, _), (success, data) in zip(calls, returned):
+            if not success:
+                results.append((False, None))
+                continue
+            try:
+                results.append((True, self._decode(contract, fn_name, data)))
+            except Exception:
+                results.append((False, None))
+        return results
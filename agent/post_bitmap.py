@@ -0,0 +1,183 @@
+"""
+Compact bitmaps for per-post moderation state.
+
+SocialPosts ids are dense and sequential starting at 1, so one bit per post
+is enough to remember whether the agent has flagged (or already scored) it.
+Ten million posts fit in ~1.2 MB per bitmap instead of hundreds of MB for a
+Python set of ints.
+"""
+
+import os
+import struct
+import threading
+from pathlib import Path
+
+SNAPSHOT_MAGIC = b"SBMP"
+SNAPSHOT_VERSION = 1
+# magic, version, flagged byte length, scored byte length
+SNAPSHOT_HEADER = struct.Struct("<4sIQQ")
+
+# Grow in at least 64 KiB steps (~500k posts) to avoid frequent reallocation
+MIN_GROWTH_BYTES = 64 * 1024
+
+
+class PostBitmap:
+    """Growable bitmap of post ids with O(1) add/discard/membership"""
+
+    def __init__(self, data=b""):
+        self._lock = threading.Lock()
+        self.load_bytes(data)
+
+    def load_bytes(self, data):
+        """Replace the contents in place (keeps existing references valid)"""
+        bits = bytearray(data)
+        count = sum(bin(byte).count("1") for byte in bits)
+        with self._lock:
+            self._bits = bits
+            self._count = count
+
+    def _ensure_capacity(self, post_id):
+        needed = (post_id >> 3) + 1
+        if needed > len(self._bits):
+            grow_to = max(needed, len(self._bits) * 2, MIN_GROWTH_BYTES)
+            self._bits.extend(bytes(grow_to - len(self._bits)))
+
+    def add(self, post_id):
+        """Set the bit for post_id; returns True if it was not already set"""
+        post_id = int(post_id)
+        if post_id < 0:
+            raise ValueError(f"Invalid post id: {post_id}")
+        with self._lock:
+            self._ensure_capacity(post_id)
+            index, mask = post_id >> 3, 1 << (post_id & 7)
+            if self._bits[index] & mask:
+                return False
+            self._bits[index] |= mask
+            self._count += 1
+            return True
+
+    def discard(self, post_id):
+        """Clear the bit for post_id; returns True if it was set"""
+        post_id = int(post_id)
+        with self._lock:
+            index, mask = post_id >> 3, 1 << (post_id & 7)
+            if post_id < 0 or index >= len(self._bits) or not self._bits[index] & mask:
+                return False
+            self._bits[index] &= ~mask & 0xFF
+            self._count -= 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._bits = bytearray()
+            self._count = 0
+
+    def __contains__(self, post_id):
+        post_id = int(post_id)
+        index = post_id >> 3
+        return 0 <= post_id and index < len(self._bits) and bool(self._bits[index] & (1 << (post_id & 7)))
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index, byte in enumerate(bytes(self._bits)):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (index << 3) | bit
+
+    def to_bytes(self):
+        """Snapshot of the underlying bytes with trailing zero bytes trimmed"""
+        with self._lock:
+            return bytes(self._bits).rstrip(b"\x00")
+
+    @property
+    def memory_bytes(self):
+        return len(self._bits)
+
+
+class PostDecisionCache:
+    """Flagged and scored bitmaps with snapshot/restore to a single file"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.flagged = PostBitmap()
+        self.scored = PostBitmap()
+        self.dirty = False
+
+    def mark_scored(self, post_id):
+        if self.scored.add(post_id):
+            self.dirty = True
+
+    def mark_flagged(self, post_id):
+        # A flagged post has necessarily been decided on as well
+        changed = self.flagged.add(post_id)
+        changed = self.scored.add(post_id) or changed
+        if changed:
+            self.dirty = True
+
+    def unmark_flagged(self, post_id):
+        if self.flagged.discard(post_id):
+            self.dirty = True
+
+    def is_flagged(self, post_id):
+        return post_id in self.flagged
+
+    def is_scored(self, post_id):
+        return post_id in self.scored
+
+    def clear(self):
+        self.flagged.clear()
+        self.scored.clear()
+        self.dirty = True
+
+    def stats(self):
+        return {
+            "flagged": len(self.flagged),
+            "scored": len(self.scored),
+            "memory_bytes": self.flagged.memory_bytes + self.scored.memory_bytes
+        }
+
+    def save(self, path=None):
+        """Atomically write both bitmaps to disk"""
+        path = Path(path) if path else self.path
+        if path is None:
+            return False
+        flagged_bytes = self.flagged.to_bytes()
+        scored_bytes = self.scored.to_bytes()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(flagged_bytes), len(scored_bytes)))
+            f.write(flagged_bytes)
+            f.write(scored_bytes)
+        os.replace(tmp_path, path)
+        self.dirty = False
+        return True
+
+    def save_if_dirty(self):
+        if self.dirty:
+            return self.save()
+        return False
+
+    def load(self, path=None):
+        """Restore both bitmaps from disk; returns False if there is no snapshot"""
+        path = Path(path) if path else self.path
+        if path is None or not path.exists():
+            return False
+        with open(path, "rb") as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) != SNAPSHOT_HEADER.size:
+                raise ValueError(f"Truncated decision snapshot: {path}")
+            magic, version, flagged_len, scored_len = SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unrecognized decision snapshot format: {path}")
+            flagged_bytes = f.read(flagged_len)
+            scored_bytes = f.read(scored_len)
+        if len(flagged_bytes) != flagged_len or len(scored_bytes) != scored_len:
+            raise ValueError(f"Truncated decision snapshot: {path}")
+        self.flagged.load_bytes(flagged_bytes)
+        self.scored.load_bytes(scored_bytes)
+        self.dirty = False
+        return True
@@ -0,0 +1,105 @@
+"""
+Bulk post reads from SocialPosts.
+
+getPostsRange(startId, count) returns a page of posts in one eth_call and
+getPostsFlagged(startId, count) returns their flagged bits packed into
+256-bit words. Deployments that predate these views fall back to getPost
+calls batched through Multicall3, so callers get the same tuples either way.
+"""
+
+
+class PostReader:
+    """Reads pages of getPost()-style tuples (id, author, content, flagged, timestamp, likes, replies)"""
+
+    def __init__(self, social_contract, multicall=None, page_size=200):
+        self.social = social_contract
+        self.multicall = multicall
+        self.page_size = page_size
+        self._range_supported = None   # None until the first getPostsRange call answers
+        self._flagged_supported = None
+        self.stats = {"range_calls": 0, "flagged_calls": 0, "fallback_calls": 0, "posts_read": 0}
+
+    def _get_posts(self, post_ids):
+        """Fallback: one getPost per id, batched through Multicall3 when available"""
+        self.stats["fallback_calls"] += 1
+        if self.multicall:
+            results = self.multicall.call([(self.social, "getPost", [post_id]) for post_id in post_ids])
+            return [tuple(value) for ok, value in results if ok]
+        posts = []
+        for post_id in post_ids:
+            try:
+                posts.append(tuple(self.social.functions.getPost(post_id).call()))
+            except Exception as e:
+                print(f"Warning: Could not read post {post_id}: {e}")
+        return posts
+
+    def read_range(self, start_id, count):
+        """Posts start_id .. start_id + count - 1 (ids past totalPosts are simply absent)"""
+        if count <= 0:
+            return []
+        start_id = max(start_id, 1)
+        if self._range_supported is not False:
+            try:
+                self.stats["range_calls"] += 1
+                posts = [tuple(p) for p in self.social.functions.getPostsRange(start_id, count).call()]
+                self._range_supported = True
+                self.stats["posts_read"] += len(posts)
+                return posts
+            except Exception as e:
+                if self._range_supported is None:
+                    print(f"⚠️ getPostsRange unavailable ({e}), reading posts individually")
+                    self._range_supported = False
+                else:
+                    raise
+        posts = self._get_posts(range(start_id, start_id + count))
+        self.stats["posts_read"] += len(posts)
+        return posts
+
+    def iter_pages(self, start_id, end_id):
+        """Yield pages of posts covering start_id .. end_id inclusive"""
+        for page_start in range(max(start_id, 1), end_id + 1, self.page_size):
+            yield self.read_range(page_start, min(self.page_size, end_id - page_start + 1))
+
+    def read_ids(self, post_ids):
+        """Posts for arbitrary ids in id order: covering pages when ids are dense, Multicall getPost when sparse"""
+        wanted = sorted(set(post_id for post_id in post_ids if post_id > 0))
+        posts = []
+        for i in range(0, len(wanted), self.page_size):
+            chunk = wanted[i:i + self.page_size]
+            span = chunk[-1] - chunk[0] + 1
+            if self._range_supported is False or (self.multicall and span > 2 * len(chunk)):
+                found = self._get_posts(chunk)
+                self.stats["posts_read"] += len(found)
+                posts.extend(found)
+                continue
+            keep = set(chunk)
+            for page in self.iter_pages(chunk[0], chunk[-1]):
+                posts.extend(post for post in page if post[0] in keep)
+        return posts
+
+    def read_flagged(self, start_id, count, fallback=True):
+        """Set of flagged post ids in start_id .. start_id + count - 1 (None if unavailable and not fallback)"""
+        if count <= 0:
+            return set()
+        start_id = max(start_id, 1)
+        if self._flagged_supported is not False:
+            try:
+                self.stats["flagged_calls"] += 1
+                words = self.social.functions.getPostsFlagged(start_id, count).call()
+                self._flagged_supported = True
+                flagged = set()
+                for word_index, word in enumerate(words):
+                    while word:
+                        low_bit = word & -word
+                        flagged.add(start_id + word_index * 256 + low_bit.bit_length() - 1)
+                        word ^= low_bit
+                return flagged
+            except Exception as e:
+                if self._flagged_supported is None:
+                    print(f"⚠️ getPostsFlagged unavailable ({e}), deriving flags from post reads")
+                    self._flagged_supported = False
+                else:
+                    raise
+        if not fallback:
+            return None
+        return {post[0] for post in self.read_range(start_id, count) if post[3]}
@@ -0,0 +1,299 @@
+"""
+Local SQLite mirror of SocialPosts.
+
+The agent already reads every post while monitoring; persisting them here
+lets the API (and scripts) serve post reads from indexed local queries
+instead of one getPost RPC per id.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    author TEXT NOT NULL,
+    content TEXT NOT NULL,
+    flagged INTEGER NOT NULL DEFAULT 0,
+    timestamp INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    replies INTEGER NOT NULL DEFAULT 0,
+    score_bp INTEGER,
+    updated_at INTEGER NOT NULL,
+    flag_from_event INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_posts_author ON posts (author, id);
+CREATE INDEX IF NOT EXISTS idx_posts_flagged ON posts (flagged, id);
+CREATE INDEX IF NOT EXISTS idx_posts_timestamp ON posts (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_posts_engagement ON posts (likes + 2 * replies, id);
+"""
+
+# External-content FTS5 index over post content, kept in sync by triggers.
+# Only content changes touch the index, so likes/flag/score updates stay cheap.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE posts_fts USING fts5(
+    content,
+    content='posts',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+# upsert_posts always SETs content, so the trigger checks that it actually changed.
+# Stores created before the WHEN clause have posts_fts_update, which re-indexed every upsert.
+FTS_UPDATE_TRIGGER = """
+DROP TRIGGER IF EXISTS posts_fts_update;
+CREATE TRIGGER IF NOT EXISTS posts_fts_update_content AFTER UPDATE OF content ON posts
+WHEN old.content IS NOT new.content BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO posts_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+POST_COLUMNS = "id, author, content, flagged, timestamp, likes, replies, score_bp"
+
+
+def row_to_post(row):
+    return {
+        "id": row[0],
+        "author": row[1],
+        "content": row[2],
+        "flagged": bool(row[3]),
+        "timestamp": row[4],
+        "likes": row[5],
+        "replies": row[6],
+        "toxicity_score_bp": row[7]
+    }
+
+
+class PostStore:
+    """Indexed SQLite mirror of posts, safe to share between threads"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(posts)")}
+            # Stores created before event-driven flags won over page reads lack this column
+            if "flag_from_event" not in columns:
+                self._conn.execute("ALTER TABLE posts ADD COLUMN flag_from_event INTEGER NOT NULL DEFAULT 0")
+            self.search_available = self._init_fts()
+            self._conn.commit()
+
+    def _init_fts(self):
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+        ).fetchone()
+        if exists:
+            self._conn.executescript(FTS_UPDATE_TRIGGER)
+            return True
+        try:
+            self._conn.executescript(FTS_SCHEMA + FTS_UPDATE_TRIGGER)
+            # Index posts mirrored before full-text search existed
+            self._conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Warning: SQLite FTS5 unavailable, post search disabled: {e}")
+            return False
+
+    # --- writes ---------------------------------------------------------------
+
+    def upsert_posts(self, posts):
+        """
+        Insert or refresh getPost() tuples (id, author, content, flagged, timestamp, likes, replies).
+        Once set_flagged has recorded a flag event for a post, a (possibly lagging) read no
+        longer overrides its flagged state.
+        """
+        now = int(time.time())
+        rows = [(p[0], p[1], p[2], int(bool(p[3])), p[4], p[5], p[6], now) for p in posts]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                """INSERT INTO posts (id, author, content, flagged, timestamp, likes, replies, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET
+                       author = excluded.author,
+                       content = excluded.content,
+                       flagged = CASE WHEN posts.flag_from_event THEN posts.flagged ELSE excluded.flagged END,
+                       timestamp = excluded.timestamp,
+                       likes = excluded.likes,
+                       replies = excluded.replies,
+                       updated_at = excluded.updated_at""",
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def _update(self, sql, params):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def set_flagged(self, post_id, flagged=True):
+        """Flag state from PostFlagged / unflag reconciliation; authoritative over later page reads"""
+        return self._update(
+            "UPDATE posts SET flagged = ?, flag_from_event = 1, updated_at = ? WHERE id = ?",
+            (int(flagged), int(time.time()), post_id)
+        )
+
+    def set_score(self, post_id, score_bp):
+        return self._update(
+            "UPDATE posts SET score_bp = ?, updated_at = ? WHERE id = ?",
+            (score_bp, int(time.time()), post_id)
+        )
+
+    def add_like(self, post_id, delta=1):
+        return self._update(
+            "UPDATE posts SET likes = MAX(likes + ?, 0), updated_at = ? WHERE id = ?",
+            (delta, int(time.time()), post_id)
+        )
+
+    # --- reads ----------------------------------------------------------------
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, post_id):
+        rows = self._query(f"SELECT {POST_COLUMNS} FROM posts WHERE id = ?", (post_id,))
+        return row_to_post(rows[0]) if rows else None
+
+    def max_id(self):
+        return self._query("SELECT COALESCE(MAX(id), 0) FROM posts")[0][0]
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM posts")[0][0]
+
+    def list_posts(self, limit=50, before_id=None, author=None, flagged=None, since=None, until=None):
+        """Newest-first page of posts; pass the last id seen as before_id for the next page"""
+        clauses, params = [], []
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if author is not None:
+            clauses.append("author = ?")
+            params.append(author)
+        if flagged is not None:
+            clauses.append("flagged = ?")
+            params.append(int(flagged))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            f"SELECT {POST_COLUMNS} FROM posts {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit)
+        )
+        return [row_to_post(row) for row in rows]
+
+    def feed_candidates(self, limit, authors=()):
+        """
+        getPost()-style tuples that could rank in the feed: the newest posts, the
+        most engaged (likes + 2 * replies, as the ranking weighs them) and the
+        newest by the given authors. Each part is an indexed top-N scan.
+        """
+        parts = [
+            "SELECT id FROM (SELECT id FROM posts ORDER BY id DESC LIMIT ?)",
+            "SELECT id FROM (SELECT id FROM posts ORDER BY likes + 2 * replies DESC, id DESC LIMIT ?)"
+        ]
+        params = [limit, limit]
+        for author in authors:
+            parts.append("SELECT id FROM (SELECT id FROM posts WHERE author = ? ORDER BY id DESC LIMIT ?)")
+            params.extend([author, limit])
+        rows = self._query(
+            f"""SELECT id, author, content, flagged, timestamp, likes, replies FROM posts
+                WHERE id IN ({' UNION '.join(parts)})""",
+            params
+        )
+        return [(r[0], r[1], r[2], bool(r[3]), r[4], r[5], r[6]) for r in rows]
+
+    def search(self, query, limit=20, author=None, min_score=None, max_score=None, flagged=None,
+               sort="recent", cursor=None):
+        """
+        Full-text search using FTS5 query syntax ("exact phrase", prefix*, AND/OR/NOT).
+        sort="recent" pages by post id (cursor = last id seen); sort="relevance"
+        orders by bm25 rank (cursor = offset). Raises ValueError on a bad query.
+        """
+        if not self.search_available:
+            raise RuntimeError("Full-text search is not available")
+        clauses, params = ["posts_fts MATCH ?"], [query]
+        if author is not None:
+            clauses.append("p.author = ?")
+            params.append(author)
+        if min_score is not None:
+            clauses.append("p.score_bp >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("p.score_bp <= ?")
+            params.append(max_score)
+        if flagged is not None:
+            clauses.append("p.flagged = ?")
+            params.append(int(flagged))
+
+        offset = 0
+        if sort == "relevance":
+            order = "bm25(posts_fts), posts_fts.rowid DESC"
+            offset = int(cursor) if cursor else 0
+        else:
+            order = "posts_fts.rowid DESC"
+            if cursor:
+                clauses.append("posts_fts.rowid < ?")
+                params.append(int(cursor))
+
+        sql = f"""
+            SELECT p.id, p.author, p.content, p.flagged, p.timestamp, p.likes, p.replies, p.score_bp,
+                   snippet(posts_fts, 0, '[', ']', '…', 12)
+            FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid
+            WHERE {' AND '.join(clauses)}
+            ORDER BY {order}
+            LIMIT ? OFFSET ?
+        """
+        try:
+            rows = self._query(sql, (*params, limit, offset))
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}") from e
+
+        results = []
+        for row in rows:
+            post = row_to_post(row)
+            post["snippet"] = row[8]
+            results.append(post)
+        if len(results) < limit:
+            next_cursor = None
+        elif sort == "relevance":
+            next_cursor = str(offset + limit)
+        else:
+            next_cursor = str(results[-1]["id"])
+        return results, next_cursor
+
+    def stats(self):
+        return {
+            "path": str(self.path),
+            "posts": self.count(),
+            "max_id": self.max_id(),
+            "search_available": self.search_available
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
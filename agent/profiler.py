@@ -0,0 +1,116 @@
+"""
+On-demand sampling profiler.
+
+While a profile runs, a loop in the requesting thread reads every other
+thread's current stack through sys._current_frames() at a fixed rate and
+counts identical stacks. Nothing is installed (no settrace/setprofile hooks,
+no signal handlers), so the agent pays nothing between profiles; during one
+the cost is a single stack walk per thread per sample.
+
+Output is the collapsed-stack format read by flamegraph.pl, speedscope and
+inferno: one `thread;outer;...;inner count` line per distinct stack.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+_WORKER_SUFFIX = re.compile(r"[-_ ]?\d+( \(.*\))?$")
+
+
+class ProfilerBusy(Exception):
+    """A profile is already running"""
+
+
+def _thread_label(name):
+    """Fold numbered pool/worker threads (tx-lane_3, Thread-12 (process_request_thread)) into one root"""
+    return _WORKER_SUFFIX.sub("", name) or name
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Samples all threads' stacks for a bounded time; one profile at a time"""
+
+    def __init__(self, default_hz=100, max_seconds=60, max_hz=1000):
+        self.default_hz = default_hz
+        self.max_seconds = max_seconds
+        self.max_hz = max_hz
+        self._lock = threading.Lock()
+        self.last = None  # summary of the most recent profile
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    def profile(self, seconds, hz=None):
+        """Sample for `seconds` at `hz`; returns (Counter of stack -> samples, summary)"""
+        seconds = min(max(float(seconds), 0.1), self.max_seconds)
+        hz = min(max(float(hz or self.default_hz), 1), self.max_hz)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            stacks = Counter()
+            own = threading.get_ident()
+            interval = 1 / hz
+            samples = 0
+            sampling_time = 0.0
+            started = time.perf_counter()
+            deadline = started + seconds
+            next_sample = started
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_sample:
+                    time.sleep(next_sample - now)
+                    continue
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    thread = _thread_label(names.get(ident, f"thread-{ident}"))
+                    stacks[";".join([thread] + _collapse(frame))] += 1
+                samples += 1
+                sampling_time += time.perf_counter() - now
+                next_sample += interval
+                if next_sample < time.perf_counter():
+                    next_sample = time.perf_counter()  # Fell behind; don't burst to catch up
+            elapsed = time.perf_counter() - started
+            self.last = {
+                "seconds": round(elapsed, 3),
+                "requested_hz": hz,
+                "achieved_hz": round(samples / elapsed, 1) if elapsed else 0,
+                "samples": samples,
+                "distinct_stacks": len(stacks),
+                "sampling_ms": round(sampling_time * 1000, 2),
+                "sampling_share": round(sampling_time / elapsed, 4) if elapsed else 0,
+                "finished_at": time.time()
+            }
+            return stacks, self.last
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapsed(stacks):
+        """flamegraph.pl input, hottest stacks first"""
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def snapshot(self):
+        return {"running": self.running, "default_hz": self.default_hz,
+                "max_seconds": self.max_seconds, "last": self.last}
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Replay recorded post traffic through the moderation agent.
+
+`export` writes the posts the agent has mirrored (its local post store, or
+SocialPosts directly) as JSON lines: id, author, content, timestamp and the
+recorded toxicity score. `run` feeds such a stream through the real scoring
+and decision path on the same local stack as benchmark.py (eth-tester chain,
+stand-in inference endpoint), keeping the recorded inter-arrival times at 1x,
+N x or max speed. Each recorded author posts from their own local key, and
+the stand-in endpoint answers with the recorded score where there is one, so
+the author and spam mix match production.
+
+Reports backlog (queue) growth, decision latency, cache hit rates and how
+often scoring fell back from the model to keyword detection.
+
+Usage:
+    python replay.py export --out posts.jsonl
+    python replay.py run posts.jsonl --speed 10 --max-gap 30
+    python replay.py run posts.jsonl --speed max --hf-error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+from benchmark import LocalStack, git_commit, percentiles
+
+AGENT_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIR = AGENT_DIR / "data" / "benchmarks"
+MAX_CONTENT_BYTES = 280  # SocialPosts.createPost limit
+
+
+# --- export -----------------------------------------------------------------------
+
+def export_from_store(path):
+    from post_store import PostStore
+    store = PostStore(path)
+    posts, before_id = [], None
+    while True:
+        page = store.list_posts(limit=1000, before_id=before_id)
+        if not page:
+            break
+        posts.extend(page)
+        before_id = page[-1]["id"]
+    store.close()
+    return [{
+        "id": post["id"], "author": post["author"], "content": post["content"],
+        "timestamp": post["timestamp"], "toxicity_score_bp": post["toxicity_score_bp"], "flagged": post["flagged"]
+    } for post in reversed(posts)]
+
+
+def export_from_chain(rpc_url, social_address, start_id=1):
+    from agent_client import AgentClient
+    from multicall import Multicall
+    from post_reader import PostReader
+    client = AgentClient(rpc_url)
+    w3 = client.w3
+    social = client.contract("social", social_address)
+    reader = PostReader(social, Multicall(w3, os.getenv("MULTICALL3_ADDRESS") or None))
+    total = social.functions.totalPosts().call()
+    posts = []
+    for page in reader.iter_pages(start_id, total):
+        for post_id, author, content, flagged, timestamp, _likes, _replies in page:
+            posts.append({
+                "id": post_id, "author": author, "content": content,
+                "timestamp": timestamp, "toxicity_score_bp": None, "flagged": flagged
+            })
+    return posts
+
+
+def export(args):
+    if args.from_chain:
+        rpc_url, social = os.getenv("SOMNIA_RPC_URL"), os.getenv("SOCIAL_POSTS_ADDRESS") or os.getenv("SOCIAL_POSTS_CONTRACT_ADDRESS")
+        if not rpc_url or not social:
+            raise SystemExit("SOMNIA_RPC_URL and SOCIAL_POSTS_ADDRESS are required for --from-chain")
+        posts = export_from_chain(rpc_url, social, args.start_id)
+    else:
+        store = Path(args.store or os.getenv("POST_STORE_PATH") or AGENT_DIR / "data" / "posts.sqlite3")
+        if not store.exists():
+            raise SystemExit(f"No post store at {store}; run the agent first or use --from-chain")
+        posts = [post for post in export_from_store(store) if post["id"] >= args.start_id]
+    with open(args.out, "w", encoding="utf-8") as f:
+        for post in posts:
+            f.write(json.dumps(post) + "\n")
+    print(f"💾 Exported {len(posts)} posts to {args.out}")
+
+
+# --- replay -------------------------------------------------------------------------
+
+def load_stream(path):
+    """Posts from a JSON lines (or JSON array) export, in arrival order"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        posts = json.loads(text)
+    else:
+        posts = [json.loads(line) for line in text.splitlines() if line.strip()]
+    posts = [post for post in posts if post.get("content")]
+    for post in posts:
+        encoded = post["content"].encode("utf-8")
+        if len(encoded) > MAX_CONTENT_BYTES:
+            post["content"] = encoded[:MAX_CONTENT_BYTES].decode("utf-8", errors="ignore")
+    return sorted(posts, key=lambda post: (post.get("timestamp") or 0, post.get("id") or 0))
+
+
+def schedule(posts, speed, max_gap=None):
+    """Seconds after start each post is due; speed None replays as fast as possible"""
+    offsets, offset = [], 0.0
+    previous = (posts[0].get("timestamp") or 0) if posts else 0
+    for post in posts:
+        timestamp = post.get("timestamp") or previous
+        gap = max(timestamp - previous, 0)
+        if max_gap is not None:
+            gap = min(gap, max_gap)
+        offset += gap
+        previous = timestamp
+        offsets.append(0.0 if speed is None else offset / speed)
+    return offsets
+
+
+class BacklogSampler:
+    """Samples (seconds, undecided posts, unconfirmed txs) from a LocalStack on a thread"""
+
+    def __init__(self, stack, interval=0.25):
+        self.stack = stack
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replay-sampler", daemon=True)
+
+    def start(self, started):
+        self.started = started
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            posts, txs = self.stack.backlog()
+            self.samples.append((round(time.perf_counter() - self.started, 3), posts, txs))
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self, until=None):
+        samples = [s for s in self.samples if until is None or s[0] <= until] or self.samples
+        if not samples:
+            return None
+        times, posts, txs = zip(*samples)
+        growth = 0.0
+        if len(samples) > 1 and max(times) > min(times):
+            # Least-squares slope of the post backlog while posts were arriving
+            mean_t, mean_p = statistics.fmean(times), statistics.fmean(posts)
+            variance = sum((t - mean_t) ** 2 for t in times)
+            growth = sum((t - mean_t) * (p - mean_p) for t, p in zip(times, posts)) / variance if variance else 0.0
+        step = max(1, len(self.samples) // 200)
+        return {
+            "max_posts_backlog": max(posts),
+            "mean_posts_backlog": round(statistics.fmean(posts), 2),
+            "max_tx_backlog": max(txs),
+            "growth_posts_per_s": round(growth, 3),
+            "timeline": [list(sample) for sample in self.samples[::step]]
+        }
+
+
+def _rate(hits, misses):
+    return round(hits / (hits + misses), 4) if hits + misses else None
+
+
+def cache_report(agent_app):
+    caches = {}
+    if agent_app.reputation_cache:
+        stats = agent_app.reputation_cache.stats
+        caches["reputation_cache"] = {**stats, "hit_rate": _rate(stats["hits"], stats["misses"])}
+    if agent_app.gas_strategy:
+        stats = agent_app.gas_strategy.stats
+        caches["gas_estimates"] = {**stats, "hit_rate": _rate(stats["estimate_hits"], stats["estimates"])}
+    if agent_app.reputation_sim:
+        stats = agent_app.reputation_sim.stats
+        caches["reputation_updates"] = {**stats, "skip_rate": _rate(stats["updates_skipped"], stats["updates_needed"])}
+    caches["outbox"] = dict(agent_app.outbox_sender.stats)
+    return caches
+
+
+def run(args):
+    posts = load_stream(args.stream)
+    if args.limit:
+        posts = posts[:args.limit]
+    if not posts:
+        raise SystemExit("No posts to replay")
+    speed = None if args.speed == "max" else float(args.speed)
+    offsets = schedule(posts, speed, args.max_gap)
+    scores = {}
+    if not args.ignore_recorded_scores:
+        scores = {post["content"]: post["toxicity_score_bp"] / 10000
+                  for post in posts if post.get("toxicity_score_bp") is not None}
+
+    stack = LocalStack(None, args.hf_latency_ms, args.hf_jitter_ms, args.hf_error_rate, args.seed,
+                       args.poll_interval, args.env, args.verbose, scores=scores).start()
+    sampler = BacklogSampler(stack)
+    try:
+        for post in posts:
+            stack.author(post.get("author") or "anonymous")  # Fund every author before the clock starts
+        model_calls_before = stack.hf.stats["requests"] - stack.hf.stats["errors"]
+        started = time.perf_counter()
+        sampler.start(started)
+        lag = []
+        for post, offset in zip(posts, offsets):
+            wait = started + offset - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            lag.append(max(time.perf_counter() - started - offset, 0))
+            stack.create_post(post.get("author") or "anonymous", post["content"])
+        arrival_end = time.perf_counter() - started
+        caught_up = stack.wait_idle(0, args.timeout)
+        sampler.stop()
+        report = stack.results(started)
+        model_answers = stack.hf.stats["requests"] - stack.hf.stats["errors"] - model_calls_before
+        caches = cache_report(stack.app)
+        threshold = stack.threshold_bp
+    finally:
+        stack.stop()
+
+    decided = len(stack.decided)
+    over_threshold = sum(1 for outcome in stack.outcomes.values() if (outcome or {}).get("score", 0) >= threshold)
+    recorded_flagged = sum(1 for post in posts if post.get("flagged"))
+    return {
+        "benchmark": "agent-replay",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": git_commit(),
+        "config": {
+            "stream": str(args.stream), "speed": args.speed, "max_gap": args.max_gap, "limit": args.limit,
+            "poll_interval": args.poll_interval, "hf_latency_ms": args.hf_latency_ms,
+            "hf_jitter_ms": args.hf_jitter_ms, "hf_error_rate": args.hf_error_rate,
+            "recorded_scores": bool(scores), "env": dict(item.partition("=")[::2] for item in args.env)
+        },
+        "replay": {
+            "posts": len(posts),
+            "authors": len({post.get("author") for post in posts}),
+            "recorded_span_s": (posts[-1].get("timestamp") or 0) - (posts[0].get("timestamp") or 0),
+            "arrival_span_s": round(arrival_end, 3),
+            "schedule_lag_ms": percentiles([value * 1000 for value in lag]),
+            "timed_out": not caught_up
+        },
+        "decisions": {
+            "decided": decided,
+            "threshold_bp": threshold,
+            "over_threshold": over_threshold,
+            "over_threshold_rate": round(over_threshold / decided, 4) if decided else None,
+            "recorded_flagged": recorded_flagged,
+            "flag_confirmed": len(stack.flag_applied)
+        },
+        "queue": sampler.report(until=arrival_end),
+        "caches": caches,
+        "cascade": {
+            "model": min(model_answers, decided),
+            "keyword_fallback": max(decided - model_answers, 0),
+            "model_hit_rate": round(min(model_answers, decided) / decided, 4) if decided else None
+        },
+        **report
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded post traffic through the moderation agent")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write mirrored posts as JSON lines")
+    export_parser.add_argument("--out", required=True, help="output .jsonl path")
+    export_parser.add_argument("--store", help="post store to read (default: POST_STORE_PATH or data/posts.sqlite3)")
+    export_parser.add_argument("--from-chain", action="store_true", help="read SocialPosts via SOMNIA_RPC_URL instead")
+    export_parser.add_argument("--start-id", type=int, default=1)
+
+    run_parser = commands.add_parser("run", help="replay an exported stream against the local stack")
+    run_parser.add_argument("stream", help="exported .jsonl (or JSON array) of posts")
+    run_parser.add_argument("--speed", default="1", help="1 = recorded pace, N = N times faster, max = no delays")
+    run_parser.add_argument("--max-gap", type=float, help="cap recorded gaps between posts at this many seconds")
+    run_parser.add_argument("--limit", type=int, help="replay only the first N posts")
+    run_parser.add_argument("--poll-interval", type=float, default=1.0, help="MONITOR_INTERVAL for the agent")
+    run_parser.add_argument("--hf-latency-ms", type=float, default=50)
+    run_parser.add_argument("--hf-jitter-ms", type=float, default=10)
+    run_parser.add_argument("--hf-error-rate", type=float, default=0.0)
+    run_parser.add_argument("--ignore-recorded-scores", action="store_true",
+                            help="score with the stand-in's keyword heuristic even where the export has a score")
+    run_parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra agent config, repeatable")
+    run_parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for the agent to catch up")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", help="result JSON path (default: data/benchmarks/replay-<timestamp>.json)")
+    run_parser.add_argument("--verbose", action="store_true", help="show agent output instead of logging it to a file")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(args)
+        return
+
+    if args.speed != "max":
+        try:
+            if float(args.speed) <= 0:
+                raise ValueError
+        except ValueError:
+            parser.error("--speed must be a positive number or 'max'")
+
+    result = run(args)
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / f"replay-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    queue = result["queue"] or {}
+    detection = result["latency_ms"]["detection"] or {}
+    print(f"📼 Replayed {result['replay']['posts']} posts from {result['replay']['authors']} authors "
+          f"at {args.speed if args.speed == 'max' else args.speed + 'x'} speed in {result['replay']['arrival_span_s']}s")
+    print(f"📈 Backlog max {queue.get('max_posts_backlog')} posts, growth {queue.get('growth_posts_per_s')} posts/s; "
+          f"{result['throughput']['posts_per_sec']} posts/sec decided")
+    print(f"⏱️ Decision latency p50 {detection.get('p50')} ms, p95 {detection.get('p95')} ms")
+    print(f"🧠 Model answered {result['cascade']['model']}, keyword fallback {result['cascade']['keyword_fallback']}")
+    if result["replay"]["timed_out"]:
+        print(f"⚠️ Timed out before the agent caught up (see {result['agent_log']})")
+    print(f"💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
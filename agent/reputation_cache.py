@@ -0,0 +1,127 @@
+"""
+Bulk reputation reads with a TTL cache.
+
+All addresses in a request are resolved with a single Multicall3 eth_call
+(getUserReputation + getReputationScore per address, plus the tier
+thresholds), and results are cached until they expire or a
+ReputationUpdated event invalidates them.
+"""
+
+import threading
+import time
+
+from web3 import Web3
+
+from multicall import Multicall
+
+TIER_COUNT = 4
+DEFAULT_TIER_THRESHOLDS = [0, 25, 50, 75]
+
+
+def tier_from_score(score, thresholds):
+    """Same rule as ReputationSystem.getTierFromScore"""
+    for tier in range(TIER_COUNT - 1, 0, -1):
+        if score >= thresholds[tier]:
+            return tier
+    return 0
+
+
+def format_reputation(address, reputation_data, current_score, tier):
+    return {
+        "address": address,
+        "current_score": current_score,
+        "tier": tier,
+        "reputation_data": {
+            "score": reputation_data[0],
+            "totalPosts": reputation_data[1],
+            "safePosts": reputation_data[2],
+            "flaggedPosts": reputation_data[3],
+            "lastUpdated": reputation_data[4],
+            "tier": reputation_data[5]
+        }
+    }
+
+
+class ReputationCache:
+    """TTL cache of reputation lookups backed by batched on-chain reads"""
+
+    def __init__(self, w3, reputation_contract, ttl_seconds=300, multicall=None):
+        self.w3 = w3
+        self.reputation = reputation_contract
+        self.ttl_seconds = ttl_seconds
+        self.multicall = multicall or Multicall(w3)
+        self._thresholds = (0, DEFAULT_TIER_THRESHOLDS)  # (expires_at, tier thresholds)
+        self._entries = {}  # lowercase address -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "batched_reads": 0, "invalidations": 0}
+
+    def invalidate(self, address):
+        with self._lock:
+            if self._entries.pop(address.lower(), None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def on_reputation_updated(self, event):
+        """ReputationUpdated handler for chain_events.EventPoller"""
+        self.invalidate(event["args"]["user"])
+
+    def get_many(self, addresses):
+        """Return {checksum address: reputation dict} using cache + one batched read"""
+        now = time.time()
+        results = {}
+        missing = []
+        with self._lock:
+            for address in addresses:
+                checksum = Web3.to_checksum_address(address)
+                entry = self._entries.get(checksum.lower())
+                if entry and entry[0] > now:
+                    results[checksum] = entry[1]
+                    self.stats["hits"] += 1
+                elif checksum not in missing:
+                    missing.append(checksum)
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            fetched = self._fetch(missing)
+            expires_at = time.time() + self.ttl_seconds
+            with self._lock:
+                for checksum, result in fetched.items():
+                    self._entries[checksum.lower()] = (expires_at, result)
+            results.update(fetched)
+        return results
+
+    def get(self, address):
+        return self.get_many([address])[Web3.to_checksum_address(address)]
+
+    def _fetch(self, addresses):
+        reputation = self.reputation
+        # Thresholds rarely change; re-read them along with the batch once they expire
+        refresh_thresholds = self._thresholds[0] <= time.time()
+        calls = [(reputation, "tierThresholds", [tier]) for tier in range(TIER_COUNT)] if refresh_thresholds else []
+        offset = len(calls)
+        for address in addresses:
+            calls.append((reputation, "getUserReputation", [address]))
+            calls.append((reputation, "getReputationScore", [address]))
+
+        self.stats["batched_reads"] += 1
+        returned = self.multicall.call(calls)
+        if refresh_thresholds:
+            thresholds = [
+                value if ok else DEFAULT_TIER_THRESHOLDS[tier]
+                for tier, (ok, value) in enumerate(returned[:TIER_COUNT])
+            ]
+            self._thresholds = (time.time() + self.ttl_seconds, thresholds)
+        thresholds = self._thresholds[1]
+
+        results = {}
+        for i, address in enumerate(addresses):
+            (rep_ok, reputation_data), (score_ok, current_score) = returned[offset + 2 * i:offset + 2 * i + 2]
+            if not (rep_ok and score_ok):
+                raise RuntimeError(f"Reputation read failed for {address}")
+            results[address] = format_reputation(
+                address, reputation_data, current_score, tier_from_score(current_score, thresholds)
+            )
+        return results
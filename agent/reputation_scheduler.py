@@ -0,0 +1,43 @@
+"""
+Coalesced updateReputation scheduling.
+
+Instead of one updateReputation transaction per post, each author gets at
+most one pending "reputation" entry in the transaction outbox, due once per
+window. Flags pull it forward so penalties are not delayed. The marks live
+in the outbox, so a restart neither loses them nor resets the window, and
+the outbox sender batches whatever is due. Transaction volume then scales
+with active authors per window rather than with posts.
+"""
+
+import threading
+import time
+
+
+class ReputationScheduler:
+    """Debounces per-author reputation updates into one delayed outbox entry per author"""
+
+    def __init__(self, outbox, action="reputation", window_seconds=60, wake=None):
+        self.outbox = outbox                  # tx_outbox.TxOutbox; the sender registered for `action` sends them
+        self.action = action
+        self.window_seconds = window_seconds
+        self.wake = wake                      # optional callable to wake the sender for urgent marks
+        self._lock = threading.Lock()
+        self.stats = {"marked": 0, "coalesced": 0, "queued": 0, "urgent": 0}
+
+    def mark_dirty(self, author, urgent=False):
+        """Schedule updateReputation(author); urgent (flag) updates skip the window"""
+        created = self.outbox.coalesce(
+            self.action, author.lower(), {"user": author},
+            not_before=time.time(), min_interval=0 if urgent else self.window_seconds
+        )
+        with self._lock:
+            self.stats["marked"] += 1
+            self.stats["queued" if created else "coalesced"] += 1
+            if urgent:
+                self.stats["urgent"] += 1
+        if urgent and self.wake:
+            self.wake()
+        return created
+
+    def pending(self):
+        return self.outbox.pending(self.action)
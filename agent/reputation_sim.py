@@ -0,0 +1,197 @@
+"""
+Off-chain mirror of ReputationSystem.calculateReputation.
+
+The on-chain score is a pure function of three SocialPosts counters per
+author (posts, safe posts, flagged posts). The agent mirrors those counters
+as it ingests posts and flags, computes score and tier locally, and only
+sends updateReputation when the stored score or tier would change (or the
+stored snapshot is older than a staleness bound).
+"""
+
+import threading
+import time
+
+from post_bitmap import PostBitmap
+from reputation_cache import DEFAULT_TIER_THRESHOLDS, TIER_COUNT, tier_from_score
+
+# ReputationSystem constants
+BASE_POINTS_PER_POST = 1
+MAX_BASE_POINTS = 50
+SAFE_POST_BONUS = 2
+MAX_SAFE_BONUS = 40
+FLAGGED_POST_PENALTY = 5
+MAX_SAFETY_BONUS = 10
+
+
+def calculate_reputation(total_posts, safe_posts, flagged_posts):
+    """Integer-exact port of ReputationSystem.calculateReputation"""
+    if total_posts == 0:
+        return 0
+    base_points = min(total_posts * BASE_POINTS_PER_POST, MAX_BASE_POINTS)
+    safe_bonus = min(safe_posts * SAFE_POST_BONUS, MAX_SAFE_BONUS)
+    flagged_penalty = flagged_posts * FLAGGED_POST_PENALTY
+    safety_ratio = (safe_posts * 100) // total_posts
+    safety_bonus = (safety_ratio * MAX_SAFETY_BONUS) // 100
+
+    total_score = base_points + safe_bonus + safety_bonus
+    total_score = total_score - flagged_penalty if total_score > flagged_penalty else 0
+    return min(total_score, 100)
+
+
+class AuthorState:
+    __slots__ = ("total", "safe", "flagged", "seed_total_posts", "seed_block",
+                 "stored_score", "stored_tier", "stored_counters", "stored_at")
+
+    def __init__(self):
+        self.total = self.safe = self.flagged = 0
+        self.seed_total_posts = 0   # SocialPosts.totalPosts when the counters were read
+        self.seed_block = 0         # block the counters were read at
+        self.stored_score = 0       # what ReputationSystem currently stores
+        self.stored_tier = 0
+        self.stored_counters = (0, 0, 0)
+        self.stored_at = 0
+
+    def counters(self):
+        return (self.total, self.safe, self.flagged)
+
+
+class ReputationSimulator:
+    """Per-author counter mirror deciding when updateReputation is worth sending"""
+
+    def __init__(self, w3, social_contract, reputation_contract, multicall, max_staleness=21600):
+        self.w3 = w3
+        self.social = social_contract
+        self.reputation = reputation_contract
+        self.multicall = multicall
+        self.max_staleness = max_staleness
+        self.thresholds = list(DEFAULT_TIER_THRESHOLDS)
+        self._thresholds_loaded = False
+        self._authors = {}                  # lowercase author -> AuthorState
+        self._counted_flags = PostBitmap()  # post ids whose flag is already in the counters
+        self._lock = threading.RLock()
+        self.stats = {"seeded_authors": 0, "updates_needed": 0, "updates_skipped": 0}
+
+    # --- seeding ----------------------------------------------------------------
+
+    def _seed(self, author):
+        """Read an author's counters and stored reputation in one batched call"""
+        block = self.w3.eth.block_number
+        calls = [
+            (self.social, "totalPosts", []),
+            (self.social, "getUserPostCount", [author]),
+            (self.social, "getUserSafePostCount", [author]),
+            (self.social, "getUserFlaggedPostCount", [author]),
+            (self.reputation, "getUserReputation", [author])
+        ]
+        if not self._thresholds_loaded:
+            calls += [(self.reputation, "tierThresholds", [tier]) for tier in range(TIER_COUNT)]
+        results = self.multicall.call(calls, block_identifier=block)
+        if not all(ok for ok, _ in results[:5]):
+            raise RuntimeError(f"Could not read reputation inputs for {author}")
+        if not self._thresholds_loaded:
+            self.thresholds = [value if ok else self.thresholds[i] for i, (ok, value) in enumerate(results[5:])]
+            self._thresholds_loaded = True
+
+        (_, total_posts), (_, total), (_, safe), (_, flagged), (_, stored) = results[:5]
+        state = AuthorState()
+        state.total, state.safe, state.flagged = total, safe, flagged
+        state.seed_total_posts = total_posts
+        state.seed_block = block
+        # UserReputation: score, totalPosts, safePosts, flaggedPosts, lastUpdated, tier
+        state.stored_score, state.stored_tier = stored[0], stored[5]
+        state.stored_counters = (stored[1], stored[2], stored[3])
+        state.stored_at = stored[4]
+        self.stats["seeded_authors"] += 1
+        return state
+
+    def _state(self, author):
+        key = author.lower()
+        state = self._authors.get(key)
+        if state is None:
+            state = self._seed(author)
+            self._authors[key] = state
+        return state
+
+    # --- counter updates ------------------------------------------------------
+
+    def record_post(self, author, post_id):
+        """A new post was created (createPost bumps total and safe counts)"""
+        with self._lock:
+            state = self._state(author)
+            if post_id <= state.seed_total_posts:
+                return  # Already included when the counters were read
+            state.total += 1
+            state.safe += 1
+
+    def record_flag(self, author, post_id, block_number=None):
+        """A post was flagged (flagFromModerator moves it from safe to flagged)"""
+        with self._lock:
+            if not self._counted_flags.add(post_id):
+                return  # Already counted (our own tx and its PostFlagged event)
+            state = self._authors.get(author.lower())
+            if state is None or (block_number is not None and block_number <= state.seed_block):
+                return  # Will be / was included when the counters were read
+            if state.safe > 0:
+                state.safe -= 1
+            state.flagged += 1
+
+    def record_stored(self, author, score, tier):
+        """ReputationUpdated: the contract stored a fresh snapshot for author"""
+        with self._lock:
+            state = self._authors.get(author.lower())
+            if state is None:
+                return
+            state.stored_score, state.stored_tier = score, tier
+            state.stored_counters = state.counters()
+            state.stored_at = int(time.time())
+
+    def forget(self, author):
+        """Drop an author's mirror so it is re-read on next use (e.g. after an unattributed flag)"""
+        with self._lock:
+            self._authors.pop(author.lower(), None)
+
+    # --- decisions --------------------------------------------------------------
+
+    def projected(self, author):
+        """(score, tier) the contract would store if updated now"""
+        with self._lock:
+            state = self._state(author)
+            score = calculate_reputation(*state.counters())
+            return score, tier_from_score(score, self.thresholds)
+
+    def needs_update(self, author, now=None):
+        """True if updateReputation(author) would change the stored reputation"""
+        now = now or time.time()
+        with self._lock:
+            state = self._state(author)
+            score, tier = self.projected(author)
+            changed = (score, tier) != (state.stored_score, state.stored_tier)
+            stale = (state.counters() != state.stored_counters
+                     and now - state.stored_at >= self.max_staleness)
+            if changed or stale:
+                self.stats["updates_needed"] += 1
+                return True
+            self.stats["updates_skipped"] += 1
+            return False
+
+    def mark_submitted(self, author):
+        """updateReputation(author) was mined; the stored snapshot now matches"""
+        score, tier = self.projected(author)
+        self.record_stored(author, score, tier)
+
+    def snapshot(self, author):
+        with self._lock:
+            state = self._authors.get(author.lower())
+            if state is None:
+                return None
+            score, tier = self.projected(author)
+            return {
+                "posts": state.total,
+                "safe_posts": state.safe,
+                "flagged_posts": state.flagged,
+                "projected_score": score,
+                "projected_tier": tier,
+                "stored_score": state.stored_score,
+                "stored_tier": state.stored_tier,
+                "stored_at": state.stored_at
+            }
@@ -0,0 +1,150 @@
+"""
+Pool of agent signing keys, one nonce lane per key.
+
+Moderator.agents is a mapping, so any number of addresses can be authorized.
+Each key gets its own lane with a locally tracked nonce and its own lock, so
+transactions from different keys never wait on each other. Work is sharded
+across lanes by post id (or address), lanes without authorization or funds
+are skipped, and low balances are reported before a lane runs dry.
+"""
+
+import threading
+import time
+import zlib
+
+
+def parse_private_keys(*values):
+    """Keys from comma/whitespace separated env values, 0x prefix optional, duplicates dropped"""
+    keys = []
+    for value in values:
+        for key in (value or "").replace(",", " ").split():
+            key = key[2:] if key.lower().startswith("0x") else key
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
+
+class NonceLane:
+    """One signing key and the nonces it hands out"""
+
+    def __init__(self, w3, account):
+        self.w3 = w3
+        self.account = account
+        self.address = account.address
+        self.lock = threading.Lock()
+        self.authorized = None    # None until checked against Moderator.agents
+        self.balance = None
+        self.low_balance = False
+        self._next_nonce = None
+        self.stats = {"sent": 0, "errors": 0}
+
+    @property
+    def usable(self):
+        return self.authorized is not False and not (self.balance is not None and self.balance == 0)
+
+    def send(self, build_tx, nonce=None, on_signed=None):
+        """
+        Sign and broadcast build_tx(nonce) under this lane's lock. New transactions
+        take the lane's next nonce; pass nonce to replace an earlier transaction.
+        on_signed(nonce, tx_hash) runs between signing and broadcasting, so callers can
+        record the transaction before it can be mined.
+        Returns (nonce, tx_hash).
+        """
+        with self.lock:
+            fresh = nonce is None
+            if fresh:
+                if self._next_nonce is None:
+                    self._next_nonce = self.w3.eth.get_transaction_count(self.address, "pending")
+                nonce = self._next_nonce
+            try:
+                signed = self.account.sign_transaction(build_tx(nonce))
+                # Support both Web3.py v5 and v6+ attribute names
+                raw_tx = getattr(signed, 'rawTransaction', None) or getattr(signed, 'raw_transaction', None)
+                if on_signed:
+                    on_signed(nonce, signed.hash)
+                tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
+            except Exception:
+                self.stats["errors"] += 1
+                self._next_nonce = None  # Re-read from the node rather than leave a gap
+                raise
+            if fresh:
+                self._next_nonce = nonce + 1
+            self.stats["sent"] += 1
+            return nonce, tx_hash
+
+    def resync(self):
+        with self.lock:
+            self._next_nonce = None
+
+
+class SignerPool:
+    """Shards transactions over the authorized, funded lanes"""
+
+    def __init__(self, w3, accounts, low_balance_wei=0, balance_check_interval=300):
+        self.w3 = w3
+        self.lanes = [NonceLane(w3, account) for account in accounts]
+        self.low_balance_wei = low_balance_wei
+        self.balance_check_interval = balance_check_interval
+        self._last_balance_check = 0
+        self._by_address = {lane.address.lower(): lane for lane in self.lanes}
+
+    def __len__(self):
+        return len(self.lanes)
+
+    @property
+    def primary(self):
+        return self.lanes[0] if self.lanes else None
+
+    def active_lanes(self):
+        lanes = [lane for lane in self.lanes if lane.usable]
+        return lanes or self.lanes[:1]
+
+    def lane_for(self, shard_key):
+        """Stable lane for a post id (int) or address (str) among the usable lanes"""
+        lanes = self.active_lanes()
+        if not lanes:
+            return None
+        if isinstance(shard_key, str):
+            shard_key = zlib.crc32(shard_key.lower().encode())
+        return lanes[int(shard_key) % len(lanes)]
+
+    def lane_by_address(self, address):
+        return self._by_address.get((address or "").lower())
+
+    def refresh_authorization(self, moderator_contract):
+        """Read Moderator.agents for every lane; unauthorized lanes stop receiving work"""
+        for lane in self.lanes:
+            try:
+                lane.authorized = bool(moderator_contract.functions.agents(lane.address).call())
+            except Exception as e:
+                print(f"⚠️ Could not check authorization for {lane.address}: {e}")
+            if lane.authorized is False:
+                print(f"⚠️ Agent key {lane.address} is not authorized in Moderator; its lane is disabled")
+        return {lane.address: lane.authorized for lane in self.lanes}
+
+    def check_balances(self, cost_per_tx=None, force=False):
+        """Refresh lane balances (rate limited) and warn about lanes close to running dry"""
+        now = time.time()
+        if not force and now - self._last_balance_check < self.balance_check_interval:
+            return
+        self._last_balance_check = now
+        for lane in self.lanes:
+            try:
+                lane.balance = self.w3.eth.get_balance(lane.address)
+            except Exception as e:
+                print(f"⚠️ Could not read balance for {lane.address}: {e}")
+                continue
+            txs_left = lane.balance // cost_per_tx if cost_per_tx else None
+            lane.low_balance = lane.balance < self.low_balance_wei or (txs_left is not None and txs_left < 100)
+            if lane.low_balance:
+                runway = f", about {txs_left} txs left" if txs_left is not None else ""
+                print(f"⚠️ LOW BALANCE: agent key {lane.address} has {self.w3.from_wei(lane.balance, 'ether')} native tokens{runway}")
+
+    def stats(self):
+        return [{
+            "address": lane.address,
+            "authorized": lane.authorized,
+            "balance_wei": lane.balance,
+            "low_balance": lane.low_balance,
+            **lane.stats
+        } for lane in self.lanes]
@@ -0,0 +1,119 @@
+"""
+Leveled, structured logging for the agent.
+
+Records are put on a bounded queue by a QueueHandler and written by a
+QueueListener thread, so the monitor and sender threads never block on
+stdout. Each record is one JSON object per line (LOG_FORMAT=text gives
+plain lines for local runs); keyword arguments passed through `extra=` become
+top-level fields. If the queue is full the record is dropped and counted
+rather than stalling the caller.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT_LOGGER = "sol_ai"
+QUEUE_SIZE = 10000
+
+# Attributes every LogRecord has; anything else came from extra= and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = " ".join(
+            f"{key}={value}" for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and not key.startswith("_")
+        )
+        line = f"{time.strftime('%H:%M:%S', time.gmtime(record.created))} {record.levelname:<7} {record.getMessage()}"
+        if fields:
+            line += f" [{fields}]"
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the writer falls behind"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Merge args and render the traceback here (the record crosses threads) but keep them out of msg
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level="INFO", fmt="json", stream=None):
+    """Route the sol_ai logger tree through a background writer; safe to call more than once"""
+    global _listener, _handler
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    root.propagate = False
+    if _listener is not None:
+        return root
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+    _handler = _DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+    root.addHandler(_handler)
+    _listener = QueueListener(_handler.queue, output)
+    _listener.start()
+    atexit.register(shutdown)
+    return root
+
+
+def shutdown():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def stats():
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "level": logging.getLevelName(logging.getLogger(ROOT_LOGGER).level)
+    }
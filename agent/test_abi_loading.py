@@ -1,18 +1,6 @@
 #!/usr/bin/env python3
-import json
-from pathlib import Path
-
 # Test ABI loading
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-def load_abi(filename):
-    try:
-        with open(ABI_DIR / filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Warning: Could not load {filename}: {e}")
-        return []
+from agent_client import ABI_DIR, load_abi
 
 print(f"ABI Directory: {ABI_DIR}")
 print(f"Directory exists: {ABI_DIR.exists()}")
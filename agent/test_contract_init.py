@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 import os
-import json
-from pathlib import Path
 from web3 import Web3
 from dotenv import load_dotenv
 
+from agent_client import connect, load_abi
+
 # Load environment variables
 load_dotenv()
 
@@ -19,20 +19,8 @@ GOVERNANCE_ADDR = os.getenv("GOVERNANCE_SYSTEM_ADDRESS")
 print("🔍 Testing Contract Initialization...")
 print(f"RPC URL: {SOMNIA_RPC_URL}")
 
-# Load ABIs
-REPO_ROOT = Path(__file__).resolve().parents[1]
-ABI_DIR = REPO_ROOT / "app" / "contracts" / "abis"
-
-def load_abi(filename):
-    try:
-        with open(ABI_DIR / filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Warning: Could not load {filename}: {e}")
-        return []
-
 # Web3 setup
-w3 = Web3(Web3.HTTPProvider(SOMNIA_RPC_URL)) if SOMNIA_RPC_URL else None
+w3 = connect(SOMNIA_RPC_URL)
 print(f"Web3 connected: {w3.is_connected() if w3 else False}")
 
 if w3:
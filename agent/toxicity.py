@@ -0,0 +1,76 @@
+"""
+Toxicity scoring shared by the agent and the bulk CLI.
+
+model_score() asks the Hugging Face toxic-bert endpoint for the "toxic"
+probability; keyword_score() is the fallback when there is no token or the
+request fails. Both return basis points (0-10000).
+"""
+
+import requests
+
+MODEL_NAME = "unitary/toxic-bert"
+DEFAULT_API_URL = "https://router.huggingface.co/hf-inference/models/unitary/toxic-bert"
+
+TOXIC_KEYWORDS = {
+    'high': ['kill', 'die', 'murder', 'suicide', 'terrorist', 'bomb', 'weapon', 'fuck', 'shit', 'bitch', 'asshole', 'cunt'],
+    'medium': ['hate', 'stupid', 'idiot', 'moron', 'loser', 'pathetic', 'disgusting', 'bastard', 'bloody', 'damn', 'retard'],
+    'low': ['hell', 'crap', 'sucks', 'annoying', 'boring', 'lame', 'dumb', 'weird']
+}
+KEYWORD_WEIGHTS = {'high': 3000, 'medium': 1500, 'low': 800}  # BP added per matching word (30% / 15% / 8%)
+
+
+class InferenceError(Exception):
+    """The model gave no usable score; `fields` carries details for the log"""
+
+    def __init__(self, message, **fields):
+        super().__init__(message)
+        self.fields = fields
+
+
+def model_score(text, api_url=DEFAULT_API_URL, headers=None, session=None, timeout=30):
+    """toxic-bert score in BP and the raw classification; raises InferenceError"""
+    try:
+        response = (session or requests).post(api_url, headers=headers or {}, json={"inputs": text}, timeout=timeout)
+    except requests.exceptions.Timeout:
+        raise InferenceError("Inference request timed out, falling back to keyword detection")
+    except Exception as e:
+        raise InferenceError("Inference error, falling back to keyword detection", error=str(e))
+
+    if response.status_code == 503:
+        raise InferenceError("Model is loading, falling back to keyword detection")
+    if response.status_code != 200:
+        raise InferenceError("Inference request failed", status=response.status_code, response=response.text[:200])
+
+    try:
+        result = response.json()
+        # toxic-bert returns a list of classifications
+        # Format: [[{'label': 'toxic', 'score': 0.xxx}, {'label': 'obscene', 'score': 0.xxx}, ...]]
+        if not (isinstance(result, list) and len(result) > 0):
+            raise InferenceError("Unexpected inference response format", response=str(result)[:200])
+        toxic_score = 0.0
+        for classification in result[0]:  # First element contains the classifications
+            if classification.get('label') == 'toxic':
+                toxic_score = classification.get('score', 0.0)
+                break
+    except InferenceError:
+        raise
+    except Exception as e:
+        raise InferenceError("Inference error, falling back to keyword detection", error=str(e))
+
+    # Convert to basis points (0-10000)
+    return int(toxic_score * 10000), result[0]
+
+
+def keyword_score(text):
+    """Keyword-weighted score in BP (3% base, capped at 95%) and the keywords that matched"""
+    lower_text = text.lower()
+    score = 300  # Base score (3%)
+    hits = []
+    for level, keywords in TOXIC_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in lower_text:
+                score += KEYWORD_WEIGHTS[level]
+                hits.append(keyword)
+
+    # Cap at 9500 (95%)
+    return min(score, 9500), hits
@@ -0,0 +1,248 @@
+"""
+Lightweight per-post tracing.
+
+Every stage a post goes through (fetch, ingest, score, decide, then the flag
+transaction's prepare, sign, broadcast and confirm) is recorded as a span
+keyed by the post id, so a slow flag can be broken down into RPC, inference
+and receipt-waiting time. The most recent posts' spans are kept in an
+in-memory ring buffer; finished spans can also be appended to a file as
+OTLP/JSON (one ExportTraceServiceRequest per line) for any OTLP collector.
+
+Sampling is decided per post id, so a post is traced in every stage or not at
+all; a span for an unsampled post is a shared no-op context manager.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+MAX_SPANS_PER_TRACE = 64
+
+
+class _NoopSpan(dict):
+    """Stand-in for unsampled posts: its own context manager, attribute writes go nowhere"""
+
+    def __setitem__(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """Span recorder with a per-post ring buffer and optional OTLP/JSON file export"""
+
+    def __init__(self, capacity=1000, sample_rate=1.0, export_path=None, service_name="sol-ai-agent"):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.export_path = export_path
+        self._traces = OrderedDict()     # key -> {"trace_id", "spans": deque}
+        self._lock = threading.Lock()
+        self._local = threading.local()  # stack of open spans per thread, for parent ids
+        self._export_file = None
+        self._last_flush = 0
+        self.stats = {"spans": 0, "evicted_traces": 0, "exported": 0, "export_errors": 0}
+
+    @property
+    def enabled(self):
+        return self.capacity > 0 and self.sample_rate > 0
+
+    def sampled(self, key):
+        """Same answer for a key every time, so all of a post's stages agree"""
+        if not self.enabled:
+            return False
+        if self.sample_rate >= 1:
+            return True
+        return zlib.crc32(str(key).encode()) % 10000 < self.sample_rate * 10000
+
+    # --- recording ----------------------------------------------------------------
+
+    def _trace(self, key):
+        trace = self._traces.get(key)
+        if trace is None:
+            trace = {"trace_id": os.urandom(16).hex(), "spans": deque(maxlen=MAX_SPANS_PER_TRACE)}
+            self._traces[key] = trace
+            while len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+                self.stats["evicted_traces"] += 1
+        else:
+            self._traces.move_to_end(key)
+        return trace
+
+    def _finish(self, key, span):
+        with self._lock:
+            trace = self._trace(key)
+            span["trace_id"] = trace["trace_id"]
+            trace["spans"].append(span)
+            self.stats["spans"] += 1
+            if self.export_path:
+                self._export(span)
+
+    def span(self, key, name, **attributes):
+        """Time the block as stage `name` of `key`'s trace; yields a dict for extra attributes"""
+        if not self.sampled(key):
+            return _NOOP
+        return self._span(key, name, attributes)
+
+    @contextmanager
+    def _span(self, key, name, attributes):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = next((s for s in reversed(stack) if s["key"] == key), None)
+        span = {
+            "key": key, "name": name, "span_id": os.urandom(8).hex(),
+            "parent_span_id": parent["span_id"] if parent else None,
+            "start_ns": time.time_ns(), "end_ns": None, "status": "ok", "attributes": dict(attributes)
+        }
+        stack.append(span)
+        try:
+            yield span["attributes"]
+        except Exception as e:
+            span["status"] = "error"
+            span["attributes"]["error"] = str(e)[:200]
+            raise
+        finally:
+            stack.pop()
+            span["end_ns"] = time.time_ns()
+            self._finish(key, span)
+
+    def record(self, key, name, start_ns, end_ns, status="ok", **attributes):
+        """Add a span whose timing was measured elsewhere (e.g. a shared page read or a receipt wait)"""
+        if not self.sampled(key):
+            return
+        self._finish(key, {
+            "key": key, "name": name, "span_id": os.urandom(8).hex(), "parent_span_id": None,
+            "start_ns": start_ns, "end_ns": end_ns, "status": status, "attributes": attributes
+        })
+
+    # --- export -------------------------------------------------------------------
+
+    @staticmethod
+    def _otlp_value(value):
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _otlp_span(self, span):
+        attributes = {"post.id": span["key"], **span["attributes"]}
+        otlp = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(span["end_ns"]),
+            "attributes": [{"key": k, "value": self._otlp_value(v)} for k, v in attributes.items()],
+            "status": {"code": 2 if span["status"] == "error" else 1}
+        }
+        if span["parent_span_id"]:
+            otlp["parentSpanId"] = span["parent_span_id"]
+        return otlp
+
+    def _export(self, span):
+        """Append one OTLP/JSON request per span; called under the lock"""
+        try:
+            if self._export_file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.export_path)), exist_ok=True)
+                self._export_file = open(self.export_path, "a", encoding="utf-8")
+            self._export_file.write(json.dumps({"resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "sol-ai-agent.tracing"}, "spans": [self._otlp_span(span)]}]
+            }]}) + "\n")
+            self.stats["exported"] += 1
+            now = time.monotonic()
+            if now - self._last_flush >= 1:
+                self._export_file.flush()
+                self._last_flush = now
+        except Exception as e:
+            self.stats["export_errors"] += 1
+            if self.stats["export_errors"] == 1:
+                print(f"⚠️ Could not export trace spans to {self.export_path}: {e}")
+
+    def flush(self):
+        with self._lock:
+            if self._export_file:
+                self._export_file.flush()
+
+    # --- queries ------------------------------------------------------------------
+
+    @staticmethod
+    def _span_view(span, origin_ns):
+        return {
+            "name": span["name"],
+            "span_id": span["span_id"],
+            "parent_span_id": span["parent_span_id"],
+            "start_offset_ms": round((span["start_ns"] - origin_ns) / 1e6, 3),
+            "duration_ms": round((span["end_ns"] - span["start_ns"]) / 1e6, 3),
+            "status": span["status"],
+            "attributes": span["attributes"]
+        }
+
+    def get(self, key):
+        """Spans of key's trace in start order, with time per stage (None if not traced)"""
+        with self._lock:
+            trace = self._traces.get(key)
+            if trace is None:
+                return None
+            spans = sorted(trace["spans"], key=lambda s: s["start_ns"])
+            trace_id = trace["trace_id"]
+        origin = spans[0]["start_ns"]
+        stages = {}
+        for span in spans:
+            stages[span["name"]] = round(stages.get(span["name"], 0) + (span["end_ns"] - span["start_ns"]) / 1e6, 3)
+        return {
+            "key": key,
+            "trace_id": trace_id,
+            "total_ms": round((max(s["end_ns"] for s in spans) - origin) / 1e6, 3),
+            "stages_ms": stages,
+            "spans": [self._span_view(span, origin) for span in spans]
+        }
+
+    def recent(self, limit=50):
+        """Newest traces first, summarized"""
+        with self._lock:
+            keys = list(self._traces)[-limit:]
+        summaries = []
+        for key in reversed(keys):
+            trace = self.get(key)
+            if trace:
+                summaries.append({k: trace[k] for k in ("key", "trace_id", "total_ms", "stages_ms")})
+        return summaries
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "traces": len(self._traces),
+            "capacity": self.capacity,
+            "export_path": self.export_path,
+            **self.stats
+        }
+
+
+def timed_iter(iterable):
+    """Yield (item, start_ns, end_ns) where the times bracket producing each item"""
+    iterator = iter(iterable)
+    while True:
+        start_ns = time.time_ns()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        yield item, start_ns, time.time_ns()
@@ -0,0 +1,537 @@
+"""
+Durable transaction outbox.
+
+Decisions that need an on-chain transaction are written to SQLite before
+anything is sent. A single sender thread drains the outbox, recording the
+nonce, every broadcast hash and the status of each entry, so a crash between
+send_raw_transaction and the receipt (or a transient RPC failure) never loses
+a decision and never needs the post to be scored again. Entries are unique
+per (action, key) and sharded over the signer pool's nonce lanes, sent
+transactions that stay unmined are rebroadcast from the same key at the
+same nonce with a bumped fee, and failures back off exponentially.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from web3.exceptions import TransactionNotFound
+
+from structured_log import get_logger
+
+log = get_logger("outbox")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    nonce INTEGER,
+    tx_hashes TEXT NOT NULL DEFAULT '[]',
+    gas INTEGER,
+    fees TEXT,
+    sender TEXT,
+    sent_at REAL,
+    block_number INTEGER,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (action, item_key)
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, next_attempt_at);
+"""
+
+# Status flow: pending -> signed -> sent -> confirmed; failed / dropped are terminal.
+# "signed" is written just before the broadcast, so a crash there leaves the nonce and hash behind.
+ENTRY_COLUMNS = "id, action, item_key, payload, status, attempts, nonce, tx_hashes, gas, fees, sent_at, created_at, sender"
+
+
+def row_to_entry(row):
+    return {
+        "id": row[0],
+        "action": row[1],
+        "key": row[2],
+        "payload": json.loads(row[3]),
+        "status": row[4],
+        "attempts": row[5],
+        "nonce": row[6],
+        "tx_hashes": json.loads(row[7]),
+        "gas": row[8],
+        "fees": json.loads(row[9]) if row[9] else None,
+        "sent_at": row[10],
+        "created_at": row[11],
+        "sender": row[12]
+    }
+
+
+class TxOutbox:
+    """SQLite-backed queue of transactions the agent owes the chain"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")  # A queued decision must survive a crash
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+            # Outboxes created before EIP-1559 fees / signer lanes lack these columns
+            for column in ("fees", "sender"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} TEXT")
+            self._conn.commit()
+
+    def enqueue(self, action, key, payload):
+        """Persist a decision; returns False if (action, key) is already in the outbox"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO outbox (action, item_key, payload, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(action, item_key) DO NOTHING""",
+                (action, str(key), json.dumps(payload), now, now)
+            )
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def coalesce(self, action, group, payload, not_before, min_interval=0):
+        """
+        Keep one pending entry per (action, group), keyed "group:<ms>". It becomes due at
+        not_before, but no sooner than min_interval after the group's last send; a later
+        mark only ever pulls an existing pending entry earlier. The group's last finished
+        entry is reused, carrying the group's last sent_at for the interval, and older
+        finished ones are deleted, so a group holds at most one finished-or-pending entry plus any in flight.
+        Returns True if a new pending entry was made.
+        """
+        now = time.time()
+        low, high = f"{group}:", f"{group};"  # ';' follows ':', so this is the group's key range
+        with self._lock:
+            pending_id, pending_due, finished_id, last_sent = self._conn.execute(
+                """SELECT MAX(CASE WHEN status = 'pending' THEN id END),
+                          MAX(CASE WHEN status = 'pending' THEN next_attempt_at END),
+                          MAX(CASE WHEN status IN ('confirmed', 'dropped', 'failed') THEN id END),
+                          MAX(sent_at)
+                   FROM outbox WHERE action = ? AND item_key >= ? AND item_key < ?""",
+                (action, low, high)
+            ).fetchone()
+            due_at = max(not_before, (last_sent or 0) + min_interval)
+            if pending_id is not None:
+                if due_at < pending_due:
+                    self._conn.execute(
+                        "UPDATE outbox SET next_attempt_at = ?, updated_at = ? WHERE id = ?", (due_at, now, pending_id)
+                    )
+                    self._conn.commit()
+                return False
+            if finished_id is None:
+                self._conn.execute(
+                    """INSERT INTO outbox (action, item_key, payload, next_attempt_at, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (action, f"{group}:{int(now * 1000)}", json.dumps(payload), due_at, now, now)
+                )
+            else:
+                self._conn.execute(
+                    """UPDATE outbox SET status = 'pending', payload = ?, attempts = 0, next_attempt_at = ?,
+                       nonce = NULL, tx_hashes = '[]', gas = NULL, fees = NULL, sent_at = ?, block_number = NULL,
+                       last_error = NULL, created_at = ?, updated_at = ? WHERE id = ?""",
+                    (json.dumps(payload), due_at, last_sent, now, now, finished_id)
+                )
+                self._conn.execute(
+                    """DELETE FROM outbox WHERE action = ? AND item_key >= ? AND item_key < ?
+                       AND status IN ('confirmed', 'dropped', 'failed') AND id != ?""",
+                    (action, low, high, finished_id)
+                )
+            self._conn.commit()
+            return True
+
+    def pending(self, action):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND action = ?", (action,)
+            ).fetchone()[0]
+
+    def _entries(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {ENTRY_COLUMNS} FROM outbox {sql}", params).fetchall()
+        return [row_to_entry(row) for row in rows]
+
+    def due(self, action, limit, now=None):
+        """Pending entries whose backoff has elapsed, oldest first"""
+        return self._entries(
+            "WHERE status = 'pending' AND action = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+            (action, now or time.time(), limit)
+        )
+
+    def in_flight(self):
+        """Signed or broadcast entries; a signed one may or may not have reached the node"""
+        return self._entries("WHERE status IN ('signed', 'sent') ORDER BY sender, nonce, id")
+
+    def get(self, action, key):
+        entries = self._entries("WHERE action = ? AND item_key = ?", (action, str(key)))
+        return entries[0] if entries else None
+
+    def statuses(self, action):
+        """item key -> (status, last_error) for every entry of an action"""
+        with self._lock:
+            rows = self._conn.execute("SELECT item_key, status, last_error FROM outbox WHERE action = ?", (action,)).fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def requeue(self, action, key, payload):
+        """Make a finished (confirmed, dropped or failed) entry pending again; False if it is still pending or in flight"""
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE outbox SET status = 'pending', payload = ?, attempts = 0, next_attempt_at = 0, nonce = NULL,
+                   tx_hashes = '[]', sent_at = NULL, block_number = NULL, last_error = NULL, updated_at = ?
+                   WHERE action = ? AND item_key = ? AND status NOT IN ('pending', 'signed', 'sent')""",
+                (json.dumps(payload), time.time(), action, str(key))
+            )
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def _update(self, ids, assignments, params):
+        if not ids:
+            return
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE outbox SET {assignments}, updated_at = ? WHERE id IN ({placeholders})",
+                (*params, time.time(), *ids)
+            )
+            self._conn.commit()
+
+    def _record_tx(self, ids, status, sender, nonce, tx_hash, gas, fees, attempt):
+        now = time.time()
+        with self._lock:
+            for entry_id in ids:
+                row = self._conn.execute("SELECT tx_hashes FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+                hashes = json.loads(row[0]) if row else []
+                if tx_hash not in hashes:
+                    hashes.append(tx_hash)
+                self._conn.execute(
+                    """UPDATE outbox SET status = ?, sender = ?, nonce = ?, tx_hashes = ?, gas = ?, fees = ?,
+                       sent_at = ?, attempts = attempts + ?, updated_at = ? WHERE id = ?""",
+                    (status, sender, nonce, json.dumps(hashes), gas, json.dumps(fees), now, attempt, now, entry_id)
+                )
+            self._conn.commit()
+
+    def mark_signed(self, ids, sender, nonce, tx_hash, gas, fees):
+        """Record a signed tx before it is broadcast, so a crash in between can't lose its nonce and hash"""
+        self._record_tx(ids, "signed", sender, nonce, tx_hash, gas, fees, 0)
+
+    def mark_sent(self, ids, sender, nonce, tx_hash, gas, fees):
+        """Record a broadcast; rebroadcasts append to the entry's hash list"""
+        self._record_tx(ids, "sent", sender, nonce, tx_hash, gas, fees, 1)
+
+    def mark_confirmed(self, ids, block_number):
+        self._update(ids, "status = 'confirmed', block_number = ?, last_error = NULL", (block_number,))
+
+    def mark_dropped(self, ids, reason):
+        """Nothing left to send (e.g. the post is already flagged on-chain)"""
+        self._update(ids, "status = 'dropped', last_error = ?", (reason,))
+
+    def retry_later(self, ids, error, backoff_seconds):
+        """Back to pending after a transient failure; a fresh nonce is assigned on the next send"""
+        self._update(
+            ids, "status = 'pending', nonce = NULL, next_attempt_at = ?, last_error = ?",
+            (time.time() + backoff_seconds, str(error)[:500])
+        )
+
+    def mark_failed(self, ids, error):
+        self._update(ids, "status = 'failed', last_error = ?", (str(error)[:500],))
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxSender:
+    """
+    Drains a TxOutbox from one thread, sending on all signer lanes in parallel.
+
+    Actions are registered with a builder that turns a list of entries into a
+    contract function call (one entry, or up to batch_size for batch entry
+    points), a handler for mined receipts, and a classifier deciding whether
+    an estimate/send error means the entries should be dropped.
+    """
+
+    def __init__(self, w3, pool, outbox, gas, stuck_after=120, fee_bump=1.125,
+                 max_attempts=8, poll_interval=5, max_in_flight_per_lane=16, tracer=None):
+        self.w3 = w3
+        self.pool = pool  # signer_pool.SignerPool
+        self.outbox = outbox
+        self.gas = gas    # gas.GasStrategy
+        self.stuck_after = stuck_after
+        self.fee_bump = fee_bump
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.max_in_flight_per_lane = max_in_flight_per_lane  # Nodes cap pending txs per account
+        self.tracer = tracer  # tracing.Tracer; spans are keyed by entry key for actions registered with trace=True
+        self._actions = {}
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._running = False
+        self._executor = None
+        self._stats_lock = threading.Lock()
+        self.stats = {"sent": 0, "confirmed": 0, "rebroadcast": 0, "retried": 0, "dropped": 0, "failed": 0, "skipped": 0}
+
+    def register(self, action, build, on_receipt, is_final_error=None, batch_size=1, batch_wait=0, skip=None,
+                 trace=False, batch_key=None):
+        """
+        build(entries) -> contract function; on_receipt(entries, receipt) -> None;
+        is_final_error(entries, error) -> True to drop instead of retrying;
+        skip(entry) -> reason to drop a due entry before any transaction work.
+        Batched actions wait up to batch_wait seconds for a full batch; batch_key(entry)
+        keeps entries that can't share a transaction in separate batches.
+        trace=True records prepare/sign/broadcast/confirm spans under each entry's key.
+        """
+        self._actions[action] = {
+            "build": build,
+            "on_receipt": on_receipt,
+            "is_final_error": is_final_error or (lambda entries, error: False),
+            "skip": skip,
+            "batch_size": max(1, batch_size),
+            "batch_wait": batch_wait,
+            "batch_key": batch_key,
+            "trace": trace
+        }
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self.stats[name] += n
+
+    # --- thread ---------------------------------------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.pool)), thread_name_prefix="tx-lane")
+        self._thread = threading.Thread(target=self._run, name="tx-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while self._running:
+            try:
+                self.drain()
+            except Exception as e:
+                log.error("Outbox sender error", extra={"error": str(e)})
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    # --- sending ----------------------------------------------------------------
+
+    def _broadcast(self, lane, entries, contract_fn, gas, fees, nonce=None, on_signed=None):
+        def build_tx(tx_nonce):
+            return contract_fn.build_transaction(self.gas.tx_params(contract_fn, lane.address, tx_nonce, gas, fees))
+
+        def signed(tx_nonce, tx_hash):
+            # Durable before the node sees it: after a crash the hash is still looked up
+            self.outbox.mark_signed([entry["id"] for entry in entries], lane.address, tx_nonce, tx_hash.hex(), gas, fees)
+            if on_signed:
+                on_signed()
+
+        nonce, tx_hash = lane.send(build_tx, nonce, signed)
+        return nonce, tx_hash.hex()
+
+    def _trace(self, spec, entries, name, start_ns, end_ns, status="ok", **attributes):
+        if self.tracer and spec["trace"]:
+            for entry in entries:
+                self.tracer.record(self._shard_key(entry), name, start_ns, end_ns, status,
+                                   batch_size=len(entries), **attributes)
+
+    def _send(self, lane, action, entries):
+        spec = self._actions[action]
+        ids = [entry["id"] for entry in entries]
+        marks = [time.time_ns()]  # start, prepared, signed, broadcast
+        try:
+            contract_fn = spec["build"](entries)
+            gas = self.gas.gas_limit(contract_fn, lane.address)
+            fees = self.gas.fees()
+            marks.append(time.time_ns())
+            nonce, tx_hash = self._broadcast(lane, entries, contract_fn, gas, fees, on_signed=lambda: marks.append(time.time_ns()))
+            marks.append(time.time_ns())
+        except Exception as e:
+            self._trace(spec, entries, "send", marks[0], time.time_ns(), "error", error=str(e)[:200])
+            if len(entries) > 1:
+                # One bad item (or a missing batch entry point) shouldn't hold up the rest
+                log.warning("Batch failed, sending items one by one", extra={"action": action, "batch_size": len(entries), "error": str(e)})
+                for entry in entries:
+                    self._send(lane, action, [entry])
+                return
+            self._handle_error(spec, entries, e)
+            return
+        self.outbox.mark_sent(ids, lane.address, nonce, tx_hash, gas, fees)
+        self._count("sent")
+        self._trace(spec, entries, "prepare", marks[0], marks[1], gas=gas)
+        self._trace(spec, entries, "sign", marks[1], marks[2], sender=lane.address, nonce=nonce)
+        self._trace(spec, entries, "broadcast", marks[2], marks[3], tx_hash=tx_hash)
+        log.info("Outbox sent", extra={"action": action, "keys": [entry["key"] for entry in entries], "sender": lane.address,
+                                       "nonce": nonce, "tx_hash": tx_hash})
+
+    def _handle_error(self, spec, entries, error):
+        ids = [entry["id"] for entry in entries]
+        if spec["is_final_error"](entries, error):
+            self.outbox.mark_dropped(ids, str(error)[:500])
+            self._count("dropped", len(ids))
+            return
+        attempts = max(entry["attempts"] for entry in entries) + 1
+        if attempts >= self.max_attempts:
+            self.outbox.mark_failed(ids, error)
+            self._count("failed", len(ids))
+            log.error("Outbox gave up", extra={"keys": [entry["key"] for entry in entries], "attempts": attempts, "error": str(error)})
+            return
+        backoff = min(5 * 2 ** attempts, 300)
+        self.outbox.retry_later(ids, error, backoff)
+        self._count("retried", len(ids))
+        log.warning("Outbox retrying", extra={"keys": [entry["key"] for entry in entries], "backoff_s": backoff, "error": str(error)})
+
+    @staticmethod
+    def _shard_key(entry):
+        key = entry["key"]
+        return int(key) if key.isdigit() else key
+
+    def _send_due(self, in_flight):
+        """Shard due entries over lanes, batch them, and send every lane's share concurrently"""
+        lanes = self.pool.active_lanes()
+        work = {lane.address: [] for lane in lanes}  # lane -> [(action, entries)]
+        for action, spec in self._actions.items():
+            capacity = {lane.address: self.max_in_flight_per_lane - in_flight.get(lane.address, 0) for lane in lanes}
+            limit = spec["batch_size"] * sum(max(c, 0) for c in capacity.values())
+            if limit <= 0:
+                continue
+            by_lane = {}
+            for entry in self.outbox.due(action, limit):
+                reason = spec["skip"](entry) if spec["skip"] else None
+                if reason:
+                    self.outbox.mark_dropped([entry["id"]], reason)
+                    self._count("skipped")
+                    continue
+                group = spec["batch_key"](entry) if spec["batch_key"] else None
+                by_lane.setdefault((self.pool.lane_for(self._shard_key(entry)).address, group), []).append(entry)
+            for (address, _), entries in by_lane.items():
+                for start in range(0, len(entries), spec["batch_size"]):
+                    if capacity[address] <= 0:
+                        break
+                    chunk = entries[start:start + spec["batch_size"]]
+                    partial = len(chunk) < spec["batch_size"]
+                    if partial and time.time() - chunk[0]["created_at"] < spec["batch_wait"]:
+                        break  # Give the batch a little longer to fill up
+                    work[address].append((action, chunk))
+                    capacity[address] -= 1
+
+        def run_lane(lane, jobs):
+            for action, entries in jobs:
+                self._send(lane, action, entries)
+
+        jobs = [(lane, work[lane.address]) for lane in lanes if work[lane.address]]
+        if len(jobs) <= 1 or not self._executor:
+            for lane, lane_jobs in jobs:
+                run_lane(lane, lane_jobs)
+            return
+        for future in [self._executor.submit(run_lane, lane, lane_jobs) for lane, lane_jobs in jobs]:
+            future.result()
+
+    # --- confirmation -----------------------------------------------------------
+
+    def _receipt(self, tx_hashes):
+        """Receipt of whichever broadcast was mined, None if none was; RPC errors propagate"""
+        for tx_hash in tx_hashes:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            if receipt is not None:
+                return receipt
+        return None
+
+    def _check_in_flight(self):
+        """Confirm, retry or bump sent entries; returns the number still in flight per lane"""
+        groups = {}
+        for entry in self.outbox.in_flight():
+            groups.setdefault((entry["sender"], entry["action"], entry["nonce"]), []).append(entry)
+        in_flight = {}
+        mined_nonces = {}
+        now = time.time()
+        for (sender, action, nonce), entries in groups.items():
+            spec = self._actions.get(action)
+            lane = self.pool.lane_by_address(sender)
+            if spec is None or lane is None:
+                continue  # Action or key not configured in this process
+            ids = [entry["id"] for entry in entries]
+            hashes = entries[0]["tx_hashes"]
+            try:
+                # Nonce first: a tx mined between the two reads then shows up as a receipt,
+                # never as a nonce consumed by someone else
+                if sender not in mined_nonces:
+                    mined_nonces[sender] = self.w3.eth.get_transaction_count(sender, "latest")
+                receipt = self._receipt(hashes)
+            except Exception as e:
+                # Unknown state; look again next pass rather than guess
+                log.warning("Could not check in-flight tx", extra={"sender": sender, "nonce": nonce, "error": str(e)})
+                in_flight[sender] = in_flight.get(sender, 0) + 1
+                continue
+            if receipt is not None:
+                sent_ns = int((entries[0]["sent_at"] or now) * 1e9)
+                self._trace(spec, entries, "confirm", sent_ns, time.time_ns(), "ok" if receipt.status == 1 else "error",
+                            block=receipt.blockNumber, gas_used=receipt.gasUsed, attempts=entries[0]["attempts"])
+                if receipt.status == 1:
+                    self.outbox.mark_confirmed(ids, receipt.blockNumber)
+                    self._count("confirmed")
+                    spec["on_receipt"](entries, receipt)
+                else:
+                    # Cached gas skips estimation, so re-estimate before retrying: that
+                    # surfaces permanent failures (e.g. already flagged) without another revert
+                    self.gas.invalidate(spec["build"](entries))
+                    self._handle_error(spec, entries, RuntimeError(f"tx {hashes[-1]} reverted"))
+                continue
+            if nonce < mined_nonces[sender]:
+                # The nonce was used by another transaction; send the decision again
+                lane.resync()
+                self.outbox.retry_later(ids, "nonce consumed without our tx being mined", 0)
+                self._count("retried", len(ids))
+                continue
+            in_flight[sender] = in_flight.get(sender, 0) + 1
+            if now - (entries[0]["sent_at"] or now) >= self.stuck_after:
+                self._rebroadcast(lane, spec, entries)
+        return in_flight
+
+    def _rebroadcast(self, lane, spec, entries):
+        """Same key, same nonce, fees bumped enough for nodes to accept the replacement"""
+        entry = entries[0]
+        fees = self.gas.bump(entry["fees"] or self.gas.fees(), self.fee_bump)
+        try:
+            nonce, tx_hash = self._broadcast(lane, entries, spec["build"](entries), entry["gas"], fees, nonce=entry["nonce"])
+        except Exception as e:
+            # "nonce too low" means something was mined at this nonce; the next check resolves it
+            log.warning("Rebroadcast failed", extra={"sender": lane.address, "nonce": entry["nonce"], "error": str(e)})
+            return
+        self.outbox.mark_sent([e["id"] for e in entries], lane.address, nonce, tx_hash, entry["gas"], fees)
+        self._count("rebroadcast")
+        log.info("Rebroadcast", extra={"sender": lane.address, "nonce": nonce, "fees": fees, "tx_hash": tx_hash})
+
+    def drain(self):
+        """One pass: confirm or bump in-flight txs, then send whatever is due"""
+        if not len(self.pool):
+            return
+        self._send_due(self._check_in_flight())
@@ -18,6 +18,7 @@ import TwitterModal from "../components/TwitterModal";
 import { TwitterLoadingSpinner, TwitterPostSkeleton, TwitterEmptyState } from "../components/TwitterLoading";
 import EnhancedReputationDashboard from "../components/EnhancedReputationDashboard";
 import EnhancedGovernancePanel from "../components/EnhancedGovernancePanel";
+import { AgentAPI } from "../utils/agentApi";
 import "./globals-twitter.css";
 
 // Extend Window interface for ethereum
@@ -211,12 +212,40 @@ export default function Home() {
     }
   };
 
+  // Pages of the agent's indexed post mirror; null when the agent can't be reached
+  const loadMirroredPosts = async () => {
+    const mirrored: any[] = [];
+    let cursor = null;
+    do {
+      const page = await AgentAPI.getPosts({ limit: 200, cursor });
+      if (page.error) return null;
+      mirrored.push(...page.posts);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return mirrored;
+  };
+
   const loadPosts = async (contract: any) => {
     try {
-      const totalPosts = await contract.totalPosts();
+      const totalPosts = (await contract.totalPosts()).toNumber();
       const loadedPosts = [];
 
-      for (let i = totalPosts.toNumber(); i >= 1; i--) {
+      const mirrored = await loadMirroredPosts();
+      const known = new Set<number>();
+      for (const post of mirrored || []) {
+        known.add(post.id);
+        loadedPosts.push({
+          id: post.id,
+          author: post.author,
+          content: post.content,
+          flagged: post.flagged,
+          timestamp: post.timestamp
+        });
+      }
+
+      // getPost one id at a time only for posts the mirror doesn't have (yet)
+      for (let i = totalPosts; i >= 1; i--) {
+        if (known.has(i)) continue;
         try {
           const post = await contract.getPost(i);
           loadedPosts.push({
@@ -230,6 +259,7 @@ export default function Home() {
           console.error(`Error loading post ${i}:`, err);
         }
       }
+      loadedPosts.sort((a, b) => Number(b.id) - Number(a.id));
 
       setPosts(loadedPosts);
       
@@ -102,4 +102,67 @@ export class AgentAPI {
       return { error: error.message };
     }
   }
+
+  static async getReputations(addresses) {
+    if (!AGENT_URL) return { error: 'Agent URL not configured' };
+    
+    try {
+      const response = await fetch(`${AGENT_URL}/reputation/bulk`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ addresses }),
+        signal: AbortSignal.timeout(10000)
+      });
+      
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      
+      return await response.json();
+    } catch (error) {
+      return { error: error.message };
+    }
+  }
+
+  static async getFeed(limit = 20, cursor = null) {
+    if (!AGENT_URL) return { error: 'Agent URL not configured' };
+    
+    try {
+      const params = new URLSearchParams({ limit: String(limit) });
+      if (cursor) params.set('cursor', cursor);
+      
+      const response = await fetch(`${AGENT_URL}/feed?${params}`, {
+        method: 'GET',
+        headers: { 'Content-Type': 'application/json' },
+        signal: AbortSignal.timeout(5000)
+      });
+      
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      
+      return await response.json();
+    } catch (error) {
+      return { error: error.message };
+    }
+  }
+
+  static async getPosts({ limit = 50, cursor = null, author = null, flagged = null } = {}) {
+    if (!AGENT_URL) return { error: 'Agent URL not configured' };
+    
+    try {
+      const params = new URLSearchParams({ limit: String(limit) });
+      if (cursor) params.set('cursor', cursor);
+      if (flagged !== null) params.set('flagged', String(flagged));
+      const path = author ? `/users/${author}/posts` : '/posts';
+      
+      const response = await fetch(`${AGENT_URL}${path}?${params}`, {
+        method: 'GET',
+        headers: { 'Content-Type': 'application/json' },
+        signal: AbortSignal.timeout(5000)
+      });
+      
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      
+      return await response.json();
+    } catch (error) {
+      return { error: error.message };
+    }
+  }
 }
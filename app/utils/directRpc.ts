@@ -1,3 +1,5 @@
+import { AgentAPI } from './agentApi';
+
 // Direct RPC calls without ethers.js to avoid ENS issues
 export class DirectRpcProvider {
   private rpcUrl: string;
@@ -134,6 +136,16 @@ export class AbiCoder {
   }
 }
 
+export interface DirectPost {
+  id: bigint;
+  author: string;
+  content: string;
+  flagged: boolean;
+  timestamp?: bigint;
+  likes?: bigint;
+  replies?: bigint;
+}
+
 // Contract wrapper
 export class DirectContract {
   private provider: DirectRpcProvider;
@@ -150,15 +162,37 @@ export class DirectContract {
     return AbiCoder.decodeUint256(result);
   }
 
-  async getPost(id: bigint): Promise<{
-    id: bigint;
-    author: string;
-    content: string;
-    flagged: boolean;
-    timestamp?: bigint;
-    likes?: bigint;
-    replies?: bigint;
-  }> {
+  // Newest-first page of posts (cursor = last id seen). Served by the agent's
+  // indexed post mirror; getPost reads over RPC only when the agent is unreachable.
+  async listPosts(limit: number = 50, cursor: string | null = null): Promise<{ posts: DirectPost[]; nextCursor: string | null }> {
+    const page = await AgentAPI.getPosts({ limit, cursor });
+    if (!page.error) {
+      return {
+        posts: page.posts.map((post: any) => ({
+          id: BigInt(post.id),
+          author: post.author,
+          content: post.content,
+          flagged: post.flagged,
+          timestamp: BigInt(post.timestamp),
+          likes: BigInt(post.likes),
+          replies: BigInt(post.replies),
+        })),
+        nextCursor: page.next_cursor,
+      };
+    }
+
+    console.warn('Agent post mirror unavailable, reading posts over RPC:', page.error);
+    const end = cursor ? BigInt(cursor) - 1n : await this.totalPosts();
+    const ids: bigint[] = [];
+    for (let id = end; id > 0n && ids.length < limit; id--) {
+      ids.push(id);
+    }
+    const posts = await Promise.all(ids.map((id) => this.getPost(id)));
+    const last = ids[ids.length - 1];
+    return { posts, nextCursor: ids.length === limit && last > 1n ? last.toString() : null };
+  }
+
+  async getPost(id: bigint): Promise<DirectPost> {
     const data = AbiCoder.encodeFunctionCall('getPost(uint256)') + 
                  AbiCoder.encodeUint256(id).slice(2);
     const result = await this.provider.callContract(this.address, data);
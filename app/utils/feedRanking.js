@@ -1,4 +1,8 @@
 import { ethers } from 'ethers';
+import { AgentAPI } from './agentApi';
+
+// The agent caps bulk reputation requests at this many addresses
+const MAX_BULK_ADDRESSES = 500;
 
 export class FeedRankingSystem {
   constructor(contracts) {
@@ -9,11 +13,34 @@ export class FeedRankingSystem {
       engagement: 0.2,      // 20% weight for likes/replies
       safety: 0.1          // 10% weight for safety score
     };
+    // address (lowercase) => reputation score, filled by prefetchReputations
+    this.reputationScores = new Map();
+  }
+
+  // Resolve every author's reputation with one bulk agent request instead of
+  // one contract call per post
+  async prefetchReputations(addresses) {
+    const unique = [...new Set(
+      addresses
+        .filter(address => address && address.startsWith('0x'))
+        .map(address => address.toLowerCase())
+    )].filter(address => !this.reputationScores.has(address));
+    
+    for (let i = 0; i < unique.length; i += MAX_BULK_ADDRESSES) {
+      const result = await AgentAPI.getReputations(unique.slice(i, i + MAX_BULK_ADDRESSES));
+      if (result.error || !result.reputations) return; // fall back to per-address reads
+      
+      for (const [address, reputation] of Object.entries(result.reputations)) {
+        this.reputationScores.set(address.toLowerCase(), reputation.current_score);
+      }
+    }
   }
 
   async rankPosts(posts) {
     if (!posts || posts.length === 0) return [];
 
+    await this.prefetchReputations(posts.map(post => post.author));
+
     // Calculate scores for all posts
     const scoredPosts = await Promise.all(
       posts.map(async (post) => {
@@ -58,6 +85,9 @@ export class FeedRankingSystem {
       // Ensure address is valid and not ENS
       if (!userAddress || !userAddress.startsWith('0x')) return 0;
       
+      const cached = this.reputationScores.get(userAddress.toLowerCase());
+      if (cached !== undefined) return cached;
+      
       const score = await this.contracts.reputationSystem.getReputationScore(userAddress);
       return parseInt(score.toString());
     } catch (error) {
@@ -171,6 +201,7 @@ export class FeedRankingSystem {
   // Get trending posts (high engagement, recent)
   async getTrendingPosts(posts, timeWindow = 24) {
     const cutoffTime = Date.now() - (timeWindow * 60 * 60 * 1000);
+    await this.prefetchReputations(posts.map(post => post.author));
     
     const recentPosts = posts.filter(post => {
       const postTime = typeof post.timestamp === 'number' 
@@ -200,6 +231,7 @@ export class FeedRankingSystem {
 
   // Get posts from high-reputation users
   async getHighQualityFeed(posts) {
+    await this.prefetchReputations(posts.map(post => post.author));
     const qualityPosts = await Promise.all(
       posts.map(async (post) => {
         const reputationScore = await this.getReputationScore(post.author);
@@ -108,6 +108,25 @@ contract GovernanceSystem is Ownable {
         require(!appeal.resolved, "Appeal already resolved");
         require(block.timestamp > appeal.votingEnds, "Voting period not ended");
         
+        _resolveAppeal(appealId);
+    }
+    
+    // Resolve many appeals in one transaction. Appeals that don't exist, are already
+    // resolved or are still open are skipped instead of reverting the whole batch.
+    function resolveAppeals(uint256[] calldata appealIds) external returns (uint256 resolvedCount) {
+        for (uint256 i = 0; i < appealIds.length; i++) {
+            Appeal storage appeal = appeals[appealIds[i]];
+            if (appeal.appellant == address(0) || appeal.resolved || block.timestamp <= appeal.votingEnds) {
+                continue;
+            }
+            _resolveAppeal(appealIds[i]);
+            resolvedCount++;
+        }
+    }
+    
+    function _resolveAppeal(uint256 appealId) internal {
+        Appeal storage appeal = appeals[appealId];
+        
         // Check if quorum is met
         uint256 eligibleVoters = getEligibleVoterCount();
         uint256 requiredQuorum = (eligibleVoters * quorumPercentage) / 100;
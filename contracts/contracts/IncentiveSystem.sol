@@ -37,8 +37,12 @@ contract IncentiveSystem is Ownable {
     mapping(address => uint256) public totalRewardsEarned;
     mapping(address => uint256) public lastProcessedPost;
     
+    // Accounts allowed to pay out post rewards on users' behalf (e.g. the moderation agent)
+    mapping(address => bool) public distributors;
+    
     event RewardClaimed(address indexed user, uint256 amount, string reason);
     event EngagementReward(address indexed user, uint256 amount, uint256 postId);
+    event DistributorSet(address indexed distributor, bool allowed);
     
     constructor(
         address _solToken,
@@ -51,12 +55,28 @@ contract IncentiveSystem is Ownable {
     }
     
     function claimPostRewards() external {
-        address user = msg.sender;
-        require(canClaimReward(user), "Cannot claim reward yet");
-        
+        require(canClaimReward(msg.sender), "Cannot claim reward yet");
+        _processPostRewards(msg.sender);
+    }
+    
+    // Pay out post rewards for many users in one transaction. Users who can't
+    // claim yet are skipped instead of reverting the whole batch.
+    function distributePostRewards(address[] calldata users) external returns (uint256 rewardedCount) {
+        require(distributors[msg.sender], "Not authorized distributor");
+        
+        for (uint256 i = 0; i < users.length; i++) {
+            if (!canClaimReward(users[i])) {
+                continue;
+            }
+            if (_processPostRewards(users[i]) > 0) {
+                rewardedCount++;
+            }
+        }
+    }
+    
+    function _processPostRewards(address user) internal returns (uint256 rewardAmount) {
         uint256[] memory userPosts = socialPosts.getUserPosts(user);
         uint256 lastProcessed = lastProcessedPost[user];
-        uint256 rewardAmount = 0;
         uint256 processedCount = 0;
         
         // Process new posts since last claim
@@ -178,6 +198,11 @@ contract IncentiveSystem is Ownable {
     }
     
     // Admin functions
+    function setDistributor(address distributor, bool allowed) external onlyOwner {
+        distributors[distributor] = allowed;
+        emit DistributorSet(distributor, allowed);
+    }
+    
     function setRewardRates(
         uint256 _baseRewardPerPost,
         uint256 _tierMultiplier,
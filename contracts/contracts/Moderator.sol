@@ -10,6 +10,7 @@ contract Moderator is Ownable {
     
     event AgentSet(address indexed agent, bool allowed);
     event PostFlagged(uint256 indexed id, address indexed agent, uint256 scoreBp, string model);
+    event FlagFailed(uint256 indexed id, address indexed agent, string reason);
     
     constructor(address socialAddress, address initialOwner) Ownable(initialOwner) {
         social = ISocialPosts(socialAddress);
@@ -26,4 +27,22 @@ contract Moderator is Ownable {
         social.flagFromModerator(id);
         emit PostFlagged(id, msg.sender, scoreBp, model);
     }
+    
+    // Flag many posts in one transaction. A post that cannot be flagged (e.g. already
+    // flagged) emits FlagFailed instead of reverting the whole batch.
+    function flagPosts(uint256[] calldata ids, uint256[] calldata scoresBp, string calldata model) external returns (uint256 flagged) {
+        require(agents[msg.sender], "Not authorized agent");
+        require(ids.length == scoresBp.length, "Length mismatch");
+        
+        for (uint256 i = 0; i < ids.length; i++) {
+            try social.flagFromModerator(ids[i]) {
+                emit PostFlagged(ids[i], msg.sender, scoresBp[i], model);
+                flagged++;
+            } catch Error(string memory reason) {
+                emit FlagFailed(ids[i], msg.sender, reason);
+            } catch {
+                emit FlagFailed(ids[i], msg.sender, "");
+            }
+        }
+    }
 }
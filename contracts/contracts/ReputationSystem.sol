@@ -76,6 +76,17 @@ contract ReputationSystem is Ownable {
     }
     
     function updateReputation(address user) external {
+        _updateReputation(user);
+    }
+    
+    // Refresh many users in one transaction
+    function updateReputationBatch(address[] calldata users) external {
+        for (uint256 i = 0; i < users.length; i++) {
+            _updateReputation(users[i]);
+        }
+    }
+    
+    function _updateReputation(address user) internal {
         uint256 newScore = calculateReputation(user);
         uint256 oldTier = userReputations[user].tier;
         uint256 newTier = getTierFromScore(newScore);
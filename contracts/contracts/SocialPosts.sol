@@ -99,6 +99,35 @@ contract SocialPosts is ISocialPosts, Ownable {
         return (post.id, post.author, post.content, post.flagged, post.timestamp, post.likes, post.replies);
     }
     
+    // Up to `count` posts from startId onwards in one call; ids past totalPosts are left out
+    function getPostsRange(uint256 startId, uint256 count) external view returns (Post[] memory page) {
+        if (startId == 0) startId = 1;
+        if (startId > totalPosts || count == 0) return new Post[](0);
+        uint256 endId = startId + count - 1;
+        if (endId > totalPosts) endId = totalPosts;
+        
+        page = new Post[](endId - startId + 1);
+        for (uint256 i = 0; i < page.length; i++) {
+            page[i] = posts[startId + i];
+        }
+    }
+    
+    // Flagged bits for posts startId .. startId + count - 1: bit (i % 256) of word (i / 256) is post startId + i
+    function getPostsFlagged(uint256 startId, uint256 count) external view returns (uint256[] memory words) {
+        if (startId == 0) startId = 1;
+        if (startId > totalPosts || count == 0) return new uint256[](0);
+        uint256 endId = startId + count - 1;
+        if (endId > totalPosts) endId = totalPosts;
+        
+        uint256 n = endId - startId + 1;
+        words = new uint256[]((n + 255) / 256);
+        for (uint256 i = 0; i < n; i++) {
+            if (posts[startId + i].flagged) {
+                words[i / 256] |= 1 << (i % 256);
+            }
+        }
+    }
+    
     function getUserPosts(address user) external view returns (uint256[] memory) {
         return userPosts[user];
     }